@@ -1,3 +1,4 @@
+import asyncio
 import hashlib
 import logging
 import os
@@ -8,16 +9,29 @@ from telegram.ext import ApplicationBuilder, InlineQueryHandler, MessageHandler,
 
 from bootstrap import keys
 from core.config import Config
+from core.domain.entity import MediaType
 from core.pipeline import Pipeline
 from core.ports import DelegatingParser, Parser
 from infra.analytics.analytics import Analytics
 from infra.analytics.ga import GoogleAnalytics
+from infra.files.bandwidth import BandwidthScheduler
+from infra.files.cache import MediaCache
 from infra.files.downloader import MediaDownloader
 from infra.files.resolver import FileResolver
 from infra.files.storage import LocalStorage
 from infra.files.validator import RemoteFileValidator
+from infra.http.session import SharedSession
+from infra.media.images import PhotoOptimizer
 from infra.media.processor import VideoProcessor
-from platforms.telegram import DOWNLOAD_FILE_SIZE_LIMIT, INLINE_FILE_SIZE_LIMIT
+from infra.media.transcoder import VideoTranscoder
+from infra.media.workers import MediaWorkerPool
+from platforms.telegram import (
+    DOWNLOAD_FILE_SIZE_LIMIT,
+    INLINE_FILE_SIZE_LIMIT,
+    PHOTO_MAX_SIDE,
+    URL_FILE_SIZE_LIMIT,
+    URL_PHOTO_SIZE_LIMIT,
+)
 from platforms.telegram.inline_query import (
     InlineQueryHandler as TelegaInlineQueryHandler,
 )
@@ -28,6 +42,11 @@ from platforms.telegram.message import (
     TelegramDelivery as TelegaDelivery,
 )
 from platforms.telegram.renderer import MessageRenderer
+from platforms.telegram.scheduler import SendScheduler
+from platforms.telegram.tasks import DeliveryTasks
+from platforms.telegram.updates import ChatOrderedUpdateProcessor
+from platforms.telegram.upload import StreamingUploader
+from platforms.telegram.webhook import WebhookServer
 from shared import info
 
 
@@ -89,31 +108,50 @@ def _analytics(container: Container) -> Analytics:
         config.secret,
         f"{os.name}:{info.name()}:{info.version()}",
         lambda x: hashlib.sha256((str(x) + config.user_identifier_salt).encode()).hexdigest(),
+        session=container.get(keys.HTTP_SESSION),
     )
 
 
-def _files_media_downloader(_: Container) -> MediaDownloader:
+def _http_session(_: Container) -> SharedSession:
+    """Pooled aiohttp session shared by file I/O and analytics; closed on shutdown."""
+    return SharedSession()
+
+
+def _files_media_downloader(container: Container) -> MediaDownloader:
     """MediaDownloader with per-platform streaming cap and timeout."""
     return MediaDownloader(
         f"{os.name}:{info.name()}:{info.version()} (like TwitterBot)",
         timeout=300,
         max_bytes=DOWNLOAD_FILE_SIZE_LIMIT,
+        session=container.get(keys.HTTP_SESSION),
+        connections=container.config.files.download_connections,
+        scheduler=container.get(keys.FILES_BANDWIDTH_SCHEDULER),
     )
 
 
-def _files_download_validator(_: Container) -> RemoteFileValidator:
+def _files_bandwidth_scheduler(container: Container) -> BandwidthScheduler | None:
+    """Global download rate cap with per-user fair share; None when unlimited."""
+    rate = container.config.files.bandwidth_limit
+    if rate <= 0:
+        return None
+    return BandwidthScheduler(rate)
+
+
+def _files_download_validator(container: Container) -> RemoteFileValidator:
     """RemoteFileValidator for full-size downloads (2 GB limit)."""
     return RemoteFileValidator(
         f"{os.name}:{info.name()}:{info.version()} (like TwitterBot)",
         DOWNLOAD_FILE_SIZE_LIMIT,
+        session=container.get(keys.HTTP_SESSION),
     )
 
 
-def _files_inline_validator(_: Container) -> RemoteFileValidator:
+def _files_inline_validator(container: Container) -> RemoteFileValidator:
     """RemoteFileValidator for inline-query downloads (20 MB limit)."""
     return RemoteFileValidator(
         f"{os.name}:{info.name()}:{info.version()} (like TwitterBot)",
         INLINE_FILE_SIZE_LIMIT,
+        session=container.get(keys.HTTP_SESSION),
     )
 
 
@@ -123,17 +161,82 @@ def _files_file_resolver(container: Container) -> FileResolver:
         container.get(keys.FILES_DOWNLOAD_VALIDATOR),
         container.get(keys.FILES_MEDIA_DOWNLOADER),
         container.get(keys.FILES_LOCAL_STORAGE),
+        head_check=container.config.files.head_check,
+        cache=container.get(keys.FILES_MEDIA_CACHE),
+        memory_threshold=container.config.files.memory_threshold,
+        passthrough_min_bytes=container.config.files.passthrough_min_bytes,
+        remote_hosts=container.config.files.url_hosts,
     )
 
 
+def _files_media_cache(container: Container) -> MediaCache | None:
+    """Size-bounded media cache; lives in the tempdir unless FILES_CACHE_DIR is set."""
+    config = container.config.files
+    if config.cache_max_bytes <= 0:
+        logging.info("Media cache disabled")
+        return None
+    root = Path(config.cache_dir or Path(container.get(keys.TEMPDIR).name) / ".media-cache")
+    cache = MediaCache(root, config.cache_max_bytes)
+    cache.janitor()
+    return cache
+
+
 def _files_local_storage(container: Container) -> LocalStorage:
     """Storage for downloaded files."""
     return LocalStorage(Path(container.get(keys.TEMPDIR).name))
 
 
 def _media_video_processor(container: Container) -> VideoProcessor:
-    """Video processor with its own storage."""
-    return VideoProcessor(container.get(keys.FILES_LOCAL_STORAGE))
+    """Video processor with its own storage and the shared session for remote probes."""
+    return VideoProcessor(
+        container.get(keys.FILES_LOCAL_STORAGE),
+        f"{os.name}:{info.name()}:{info.version()} (like TwitterBot)",
+        session=container.get(keys.HTTP_SESSION),
+        pool=container.get(keys.MEDIA_WORKER_POOL),
+        transcoder=container.get(keys.MEDIA_TRANSCODER),
+    )
+
+
+def _media_transcoder(container: Container) -> VideoTranscoder | None:
+    """Re-encodes videos over the upload limit or in unplayable codecs; None when disabled."""
+    config = container.config.media
+    if not config.transcode:
+        return None
+    return VideoTranscoder(
+        container.get(keys.MEDIA_TRANSCODE_POOL),
+        config.upload_limit,
+        timeout=config.transcode_timeout,
+    )
+
+
+def _media_photo_optimizer(container: Container) -> PhotoOptimizer | None:
+    """Downscales and re-encodes photos before upload; None when disabled."""
+    if not container.config.media.photo_optimize:
+        return None
+    return PhotoOptimizer(
+        container.get(keys.MEDIA_WORKER_POOL),
+        PHOTO_MAX_SIDE,
+        cache=container.get(keys.FILES_MEDIA_CACHE),
+    )
+
+
+def _media_worker_pool(container: Container) -> MediaWorkerPool:
+    """Shared ffmpeg/ffprobe process pool bounding concurrency and run time."""
+    return MediaWorkerPool(
+        max_workers=container.config.media.ffmpeg_workers,
+        timeout=container.config.media.ffmpeg_timeout,
+    )
+
+
+def _media_transcode_pool(container: Container) -> MediaWorkerPool:
+    """
+    Separate pool for transcodes, which run for minutes; sharing the slots of
+    the short probe and remux jobs would stall every other delivery.
+    """
+    return MediaWorkerPool(
+        max_workers=container.config.media.transcode_workers,
+        timeout=container.config.media.transcode_timeout,
+    )
 
 
 def _parser_delegating(container: Container) -> Parser:
@@ -153,6 +256,24 @@ def _app(container: Container) -> None:
     if container.config.telegram.base_url:
         logging.info(f"Using custom Telegram API base URL: {container.config.telegram.base_url}")
         builder.base_url(container.config.telegram.base_url)
+    if container.config.telegram.local_mode:
+        logging.info("Using local Bot API server mode: files are passed by path")
+        builder.local_mode(True)
+    if processor := container.get(keys.TELEGA_UPDATE_PROCESSOR):
+        logging.info("Processing up to %d updates concurrently", processor.limit)
+        builder.concurrent_updates(processor)
+
+    async def _post_stop(_) -> None:
+        # Finish in-flight replies while the bot can still send them.
+        await container.get(keys.TELEGA_DELIVERY_TASKS).drain(
+            container.config.telegram.drain_timeout
+        )
+
+    async def _post_shutdown(_) -> None:
+        await container.get(keys.HTTP_SESSION).close()
+
+    builder.post_stop(_post_stop)
+    builder.post_shutdown(_post_shutdown)
     application = builder.build()
 
     application.add_handler(
@@ -165,6 +286,18 @@ def _app(container: Container) -> None:
         )
     )
 
+    config = container.config.telegram
+    if config.webhook_url:
+        logging.info("Starting Telegram bot webhook")
+        server = WebhookServer(
+            application,
+            config.webhook_url,
+            config.webhook_secret,
+            listen=config.webhook_listen,
+            port=config.webhook_port,
+        )
+        return asyncio.run(server.serve())
+
     logging.info("Starting Telegram bot polling")
 
     return application.run_polling()
@@ -188,23 +321,73 @@ def _pipeline(container: Container) -> Pipeline:
         container.get(keys.PARSER_DELEGATING),
         container.get(keys.FILES_FILE_RESOLVER),
         container.get(keys.MEDIA_VIDEO_PROCESSOR),
+        remote_probe=container.config.files.remote_probe,
+        faststart=container.config.media.faststart,
+        photo_processor=container.get(keys.MEDIA_PHOTO_OPTIMIZER),
+        gif_to_mp4=container.config.media.gif_to_mp4,
+        url_size_limits={
+            MediaType.PHOTO: URL_PHOTO_SIZE_LIMIT,
+            MediaType.VIDEO: URL_FILE_SIZE_LIMIT,
+        },
     )
 
 
 def _telega_delivery(container: Container) -> TelegaDelivery:
     """Telegram-specific delivery using shared renderer."""
-    return TelegaDelivery(container.get(keys.TELEGA_MESSAGE_RENDERER))
+    return TelegaDelivery(
+        container.get(keys.TELEGA_MESSAGE_RENDERER),
+        uploader=container.get(keys.TELEGA_STREAMING_UPLOADER),
+        resolver=container.get(keys.FILES_FILE_RESOLVER),
+        local_mode=container.config.telegram.local_mode,
+        scheduler=container.get(keys.TELEGA_SEND_SCHEDULER),
+    )
+
+
+def _telega_streaming_uploader(container: Container) -> StreamingUploader | None:
+    """Direct Bot API uploader for passthrough videos; None when passthrough is off."""
+    if container.config.files.passthrough_min_bytes <= 0:
+        return None
+    return StreamingUploader(
+        container.config.telegram.bot_token,
+        container.config.telegram.base_url,
+        session=container.get(keys.HTTP_SESSION),
+    )
+
+
+def _telega_send_scheduler(container: Container) -> SendScheduler | None:
+    """Paces replies to Telegram's global and per-chat flood limits; None when disabled."""
+    config = container.config.telegram
+    if config.send_rate <= 0:
+        return None
+    return SendScheduler(config.send_rate, config.chat_send_rate)
 
 
 def _telega_message_handler(container: Container) -> TelegaMessageHandler:
     """TelegaMessageHandler constructed from container services."""
+    processor = container.get(keys.TELEGA_UPDATE_PROCESSOR)
     return TelegaMessageHandler(
         container.get(keys.PIPELINE),
         container.get(keys.TELEGA_DELIVERY),
         container.get(keys.ANALYTICS),
+        tasks=container.get(keys.TELEGA_DELIVERY_TASKS),
+        scheduler=container.get(keys.TELEGA_SEND_SCHEDULER),
+        updates=processor.stats if processor else None,
     )
 
 
+def _telega_delivery_tasks(container: Container) -> DeliveryTasks:
+    """Tracks background deliveries, caps how many run at once and drains them on shutdown."""
+    return DeliveryTasks(container.config.telegram.max_deliveries)
+
+
+def _telega_update_processor(container: Container) -> ChatOrderedUpdateProcessor | None:
+    """Runs updates of different chats in parallel; None processes them one at a time."""
+    limit = container.config.telegram.concurrent_updates
+    if limit <= 1:
+        return None
+    return ChatOrderedUpdateProcessor(limit)
+
+
 def _telega_message_renderer(_: Container) -> MessageRenderer:
     """Shared MessageRenderer instance."""
     return MessageRenderer()
@@ -217,12 +400,19 @@ def load_container(config):
 
     container.register(keys.TEMPDIR, _tempdir)
     container.register(keys.ANALYTICS, _analytics)
+    container.register(keys.HTTP_SESSION, _http_session)
     container.register(keys.FILES_MEDIA_DOWNLOADER, _files_media_downloader)
     container.register(keys.FILES_DOWNLOAD_VALIDATOR, _files_download_validator)
     container.register(keys.FILES_INLINE_VALIDATOR, _files_inline_validator)
     container.register(keys.FILES_FILE_RESOLVER, _files_file_resolver)
     container.register(keys.FILES_LOCAL_STORAGE, _files_local_storage)
+    container.register(keys.FILES_MEDIA_CACHE, _files_media_cache)
+    container.register(keys.FILES_BANDWIDTH_SCHEDULER, _files_bandwidth_scheduler)
     container.register(keys.MEDIA_VIDEO_PROCESSOR, _media_video_processor)
+    container.register(keys.MEDIA_WORKER_POOL, _media_worker_pool)
+    container.register(keys.MEDIA_TRANSCODER, _media_transcoder)
+    container.register(keys.MEDIA_TRANSCODE_POOL, _media_transcode_pool)
+    container.register(keys.MEDIA_PHOTO_OPTIMIZER, _media_photo_optimizer)
     container.register(keys.PIPELINE, _pipeline)
     container.register(keys.PARSER_DELEGATING, _parser_delegating)
 
@@ -234,6 +424,10 @@ def load_container(config):
 
     container.register(keys.TELEGA_INLINE_QUERY_HANDLER, _telega_inline_query_handler)
     container.register(keys.TELEGA_DELIVERY, _telega_delivery)
+    container.register(keys.TELEGA_STREAMING_UPLOADER, _telega_streaming_uploader)
+    container.register(keys.TELEGA_SEND_SCHEDULER, _telega_send_scheduler)
+    container.register(keys.TELEGA_DELIVERY_TASKS, _telega_delivery_tasks)
+    container.register(keys.TELEGA_UPDATE_PROCESSOR, _telega_update_processor)
     container.register(keys.TELEGA_MESSAGE_HANDLER, _telega_message_handler)
     container.register(keys.TELEGA_MESSAGE_RENDERER, _telega_message_renderer)
     container.register(keys.APP, _app)
@@ -7,12 +7,19 @@ Parser keys are auto-generated as ``parser_{name}`` from the registry.
 # Infrastructure
 TEMPDIR = "tempdir"
 ANALYTICS = "analytics"
+HTTP_SESSION = "http_session"
 FILES_MEDIA_DOWNLOADER = "files_media_downloader"
 FILES_FILE_RESOLVER = "files_file_resolver"
 FILES_LOCAL_STORAGE = "files_local_storage"
+FILES_MEDIA_CACHE = "files_media_cache"
+FILES_BANDWIDTH_SCHEDULER = "files_bandwidth_scheduler"
 FILES_DOWNLOAD_VALIDATOR = "files_download_validator"
 FILES_INLINE_VALIDATOR = "files_inline_validator"
 MEDIA_VIDEO_PROCESSOR = "media_video_processor"
+MEDIA_WORKER_POOL = "media_worker_pool"
+MEDIA_TRANSCODER = "media_transcoder"
+MEDIA_TRANSCODE_POOL = "media_transcode_pool"
+MEDIA_PHOTO_OPTIMIZER = "media_photo_optimizer"
 
 # Parsers
 PARSER_DELEGATING = "parser_delegating"
@@ -24,6 +31,10 @@ PIPELINE = "pipeline"
 # Telegram
 TELEGA_INLINE_QUERY_HANDLER = "telega_inline_query_handler"
 TELEGA_DELIVERY = "telega_delivery"
+TELEGA_STREAMING_UPLOADER = "telega_streaming_uploader"
+TELEGA_SEND_SCHEDULER = "telega_send_scheduler"
+TELEGA_DELIVERY_TASKS = "telega_delivery_tasks"
+TELEGA_UPDATE_PROCESSOR = "telega_update_processor"
 TELEGA_MESSAGE_HANDLER = "telega_message_handler"
 TELEGA_MESSAGE_RENDERER = "telega_message_renderer"
 
@@ -6,6 +6,7 @@ from .domain import (
     MediaType,
     Photo,
     Video,
+    VideoVariant,
 )
 from .exceptions import (
     InvalidUrlError,
@@ -30,4 +31,5 @@ __all__ = [
     "ParserNotFoundError",
     "Photo",
     "Video",
+    "VideoVariant",
 ]
@@ -9,6 +9,20 @@ class TelegramConfig:
     def __init__(self):
         self.bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
         self.base_url = os.getenv("TELEGRAM_BASE_URL")
+        self.local_mode = os.getenv("TELEGRAM_LOCAL_MODE", "false") == "true"
+        # Outbound Bot API calls per second, overall and per chat; 0 disables pacing.
+        self.send_rate = float(os.getenv("TELEGRAM_SEND_RATE", "30"))
+        self.chat_send_rate = float(os.getenv("TELEGRAM_CHAT_SEND_RATE", "1"))
+        self.concurrent_updates = int(os.getenv("TELEGRAM_CONCURRENT_UPDATES", "32"))
+        self.max_deliveries = int(os.getenv("TELEGRAM_MAX_DELIVERIES", "8"))
+        self.drain_timeout = float(os.getenv("TELEGRAM_DRAIN_TIMEOUT", "30"))
+        # Public HTTPS URL Telegram pushes updates to; long polling is used when unset.
+        self.webhook_url = os.getenv("TELEGRAM_WEBHOOK_URL")
+        self.webhook_secret = os.getenv("TELEGRAM_WEBHOOK_SECRET") or None
+        self.webhook_listen = os.getenv("TELEGRAM_WEBHOOK_LISTEN", "0.0.0.0")
+        self.webhook_port = int(os.getenv("TELEGRAM_WEBHOOK_PORT", "8080"))
+        if self.webhook_url:
+            self._required = (*self._required, "webhook_secret")
 
 
 class InstagramConfig:
@@ -66,6 +80,42 @@ class TumblrConfig:
         self.api_key = os.getenv("TUMBLR_API_KEY")
 
 
+class FilesConfig:
+    _required = ()
+
+    def __init__(self):
+        self.head_check = os.getenv("FILES_HEAD_CHECK", "false") == "true"
+        self.cache_dir = os.getenv("FILES_CACHE_DIR")
+        self.cache_max_bytes = int(os.getenv("FILES_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+        self.download_connections = int(os.getenv("FILES_DOWNLOAD_CONNECTIONS", "4"))
+        self.bandwidth_limit = int(os.getenv("FILES_BANDWIDTH_LIMIT", "0"))
+        self.memory_threshold = int(os.getenv("FILES_MEMORY_THRESHOLD", str(1024 * 1024)))
+        self.passthrough_min_bytes = int(os.getenv("FILES_PASSTHROUGH_MIN_BYTES", "0"))
+        self.remote_probe = os.getenv("FILES_REMOTE_PROBE", "true") == "true"
+        self.url_hosts = tuple(
+            host.strip()
+            for host in os.getenv("FILES_URL_HOSTS", "pbs.twimg.com,video.twimg.com").split(",")
+            if host.strip()
+        )
+
+
+class MediaConfig:
+    _required = ()
+
+    def __init__(self, local_mode: bool = False):
+        self.ffmpeg_workers = int(os.getenv("MEDIA_FFMPEG_WORKERS", "2"))
+        self.ffmpeg_timeout = int(os.getenv("MEDIA_FFMPEG_TIMEOUT", "120"))
+        self.faststart = os.getenv("MEDIA_FASTSTART", "true") == "true"
+        self.transcode = os.getenv("MEDIA_TRANSCODE", "true") == "true"
+        self.transcode_timeout = int(os.getenv("MEDIA_TRANSCODE_TIMEOUT", "1800"))
+        self.transcode_workers = int(os.getenv("MEDIA_TRANSCODE_WORKERS", "1"))
+        # A local Bot API server accepts uploads of up to 2000 MB instead of 50 MB.
+        default_upload_limit = (2000 if local_mode else 50) * 1024 * 1024
+        self.upload_limit = int(os.getenv("MEDIA_UPLOAD_LIMIT", str(default_upload_limit)))
+        self.photo_optimize = os.getenv("MEDIA_PHOTO_OPTIMIZE", "true") == "true"
+        self.gif_to_mp4 = os.getenv("MEDIA_GIF_TO_MP4", "true") == "true"
+
+
 class Config:
     """Holds the entire configuration for all services."""
 
@@ -82,6 +132,8 @@ class Config:
         self.tumblr = TumblrConfig()
         self.vk = VKConfig()
         self.youtube = YouTubeConfig()
+        self.files = FilesConfig()
+        self.media = MediaConfig(self.telegram.local_mode)
 
     def validate(self) -> Self:
         missing = []
@@ -94,6 +146,8 @@ class Config:
             "vk",
             "youtube",
             "tumblr",
+            "files",
+            "media",
         ):
             val = getattr(self, name)
             required = getattr(val, "_required", ())
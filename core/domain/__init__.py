@@ -1,5 +1,6 @@
 from .entity import (
     GIF,
+    ByteStream,
     Content,
     Entity,
     FileInfo,
@@ -7,8 +8,10 @@ from .entity import (
     MediaType,
     Photo,
     PipelineResult,
+    RemoteProbe,
     Video,
     VideoMeta,
+    VideoVariant,
 )
 
 __all__ = [
@@ -20,6 +23,9 @@ __all__ = [
     "Content",
     "MediaType",
     "FileInfo",
+    "ByteStream",
     "VideoMeta",
+    "RemoteProbe",
+    "VideoVariant",
     "PipelineResult",
 ]
@@ -1,5 +1,8 @@
+import asyncio
+import dataclasses
 import enum
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
@@ -35,37 +38,106 @@ class Link:
 
 @dataclass
 class Photo(Entity):
-    """Represents a photo with resource and thumbnail URLs, and an optional caption."""
+    """
+    Represents a photo with resource and thumbnail URLs, and an optional caption.
+
+    Parsers fill width and height when the source reports them.
+    """
 
     resource_url: str
     thumbnail_url: str | None = None
     caption: str | None = None
+    width: int | None = None
+    height: int | None = None
 
     @staticmethod
     def type() -> MediaType:
         return MediaType.PHOTO
 
 
+@dataclass
+class VideoVariant:
+    """One encoding of a video: URL plus bitrate (bits/s), byte size and dimensions if known."""
+
+    url: str
+    bitrate: int | None = None
+    size: int | None = None
+    width: int | None = None
+    height: int | None = None
+
+    def estimated_size(self, duration: int | None) -> int | None:
+        """Reported byte size, else one derived from bitrate and duration (seconds)."""
+        if self.size is not None:
+            return self.size
+        if self.bitrate and duration:
+            return self.bitrate * duration // 8
+        return None
+
+
 @dataclass
 class Video(Entity):
-    """Represents a video with a resource URL, MIME type, and thumbnail URL."""
+    """
+    Represents a video with a resource URL, MIME type, and thumbnail URL.
+
+    Parsers fill width, height and duration (seconds) when the source reports
+    them, which spares ffprobe later. When the source offers several encodings
+    they are listed in `variants`, best first, with `resource_url` pointing at
+    the first one; `best_variant` sets `size` to the chosen variant's reported
+    byte size, which then replaces the remote size check.
+    """
 
     resource_url: str
     mime_type: str
     thumbnail_url: str
+    width: int | None = None
+    height: int | None = None
+    duration: int | None = None
+    size: int | None = None
+    variants: list[VideoVariant] = field(default_factory=list)
 
     @staticmethod
     def type() -> MediaType:
         return MediaType.VIDEO
 
+    def best_variant(self, max_bytes: int | None) -> "Video":
+        """
+        This video pointed at the best variant no larger than `max_bytes`.
+
+        Sizes estimated from bitrate and duration only rank the variants;
+        those of unknown size count as fitting. When none fits, the smallest
+        is chosen. `size` is set only from a reported size, so an estimate
+        never stands in for the remote size check.
+        """
+        if not self.variants or max_bytes is None:
+            return self
+        sizes = [v.estimated_size(self.duration) for v in self.variants]
+        fitting = [i for i, size in enumerate(sizes) if size is None or size <= max_bytes]
+        if fitting:
+            chosen = self.variants[fitting[0]]
+        else:
+            chosen = self.variants[min(range(len(sizes)), key=lambda i: sizes[i])]
+        size = chosen.size
+        if chosen.url == self.resource_url:
+            return dataclasses.replace(self, size=size if size is not None else self.size)
+        return dataclasses.replace(
+            self,
+            resource_url=chosen.url,
+            width=chosen.width,
+            height=chosen.height,
+            size=size,
+        )
+
 
 @dataclass
 class GIF(Entity):
-    """Represents a GIF with a resource URL, MIME type, and thumbnail URL."""
+    """Represents a GIF with a resource URL, MIME type, thumbnail URL and optional metadata."""
 
     resource_url: str
     mime_type: str
     thumbnail_url: str
+    width: int | None = None
+    height: int | None = None
+    duration: int | None = None
 
     @staticmethod
     def type() -> MediaType:
@@ -88,16 +160,6 @@ class Content(Entity):
         return MediaType.CONTENT
 
 
-@dataclass(frozen=True)
-class FileInfo:
-    """Immutable file metadata."""
-
-    path: Path
-    size: int
-    mime_type: str | None = None
-    original_url: str | None = None
-
-
 @dataclass
 class VideoMeta:
     """Stores metadata for a video."""
@@ -107,6 +169,64 @@ class VideoMeta:
     duration: int | None = None
 
 
+@dataclass
+class RemoteProbe:
+    """
+    What a Range probe learned about a remote video before downloading it.
+
+    `meta` is None when the moov box could not be read. `needs_transcode`
+    tells that the file will be re-encoded, so it has to be downloaded
+    rather than passed through.
+    """
+
+    meta: VideoMeta | None
+    size: int | None = None
+    needs_transcode: bool = False
+
+
+class ByteStream(ABC):
+    """A one-shot remote byte stream that is consumed without being stored locally."""
+
+    size: int | None = None
+    mime_type: str | None = None
+
+    @abstractmethod
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        pass
+
+
+@dataclass(frozen=True)
+class FileInfo:
+    """
+    Immutable file metadata.
+
+    `data` holds the payload when it was kept in memory, `stream` when it is
+    passed through without touching the disk; `path` is then only nominal.
+    The same holds for `remote` files: nothing was downloaded and the
+    platform is to fetch `original_url` itself.
+    """
+
+    path: Path
+    size: int
+    mime_type: str | None = None
+    original_url: str | None = None
+    video_meta: VideoMeta | None = None
+    data: bytes | None = field(default=None, repr=False)
+    stream: ByteStream | None = field(default=None, repr=False)
+    remote: bool = False
+
+    async def release(self) -> None:
+        """Close the passthrough stream or remove the downloaded file."""
+        if self.stream is not None:
+            await self.stream.close()
+        elif not self.remote and self.data is None:
+            await asyncio.to_thread(self.path.unlink, True)
+
+
 @dataclass
 class PipelineResult:
     content: Content
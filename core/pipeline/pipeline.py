@@ -1,24 +1,71 @@
 import asyncio
+import dataclasses
 import logging
+import os
+from collections.abc import Awaitable
 
-from core.domain.entity import PipelineResult, Video
+from core.domain.entity import (
+    GIF,
+    Content,
+    Entity,
+    FileInfo,
+    MediaType,
+    Photo,
+    PipelineResult,
+    RemoteProbe,
+    Video,
+    VideoMeta,
+)
 from core.exceptions import InvalidUrlError
-from core.ports import FileResolver, Parser, VideoProcessor
+from core.ports import FileResolver, Parser, PhotoProcessor, VideoProcessor
 from shared.urls import is_valid_url
 
 
 class Pipeline:
-    """validate -> route -> parse -> resolve files -> process video"""
+    """
+    validate -> route -> parse -> resolve files -> process video
+
+    Video dimensions and duration reported by parsers replace the ffprobe
+    run (fields they leave out are still probed), and the byte size of a
+    chosen video variant replaces the remote size check. With
+    `remote_probe`, videos the parser did not fully describe are probed with
+    Range requests before they are resolved: the probed size refuses
+    oversized files without downloading them, a video that will have to be
+    transcoded is downloaded instead of streamed, and the metadata spares
+    the local probe. Downloaded videos are then transcoded when the video
+    processor finds them undeliverable, or, with `faststart`, remuxed when
+    their moov box trails the media data. Videos with several variants are
+    resolved at the best one that fits the resolver's size limit. Photos are
+    handed to the optional `photo_processor` to be shrunk. With
+    `gif_to_mp4`, animated GIFs are downloaded rather than streamed and
+    re-encoded as MP4 first, so they are probed and delivered like videos.
+
+    `url_size_limits` maps media types to the largest file the platform can
+    fetch by URL itself; the resolver may then skip the download and return
+    a `remote` FileInfo, which is neither probed locally nor processed.
+    """
+
+    GIF_MIME = "image/gif"
 
     def __init__(
         self,
         parser: Parser,
         file_resolver: FileResolver,
         video_processor: VideoProcessor,
+        remote_probe: bool = False,
+        faststart: bool = False,
+        photo_processor: PhotoProcessor | None = None,
+        gif_to_mp4: bool = False,
+        url_size_limits: dict[MediaType, int] | None = None,
     ):
         self.parser = parser
         self.file_resolver = file_resolver
         self.video_processor = video_processor
+        self.remote_probe = remote_probe
+        self.faststart = faststart
+        self.photo_processor = photo_processor
+        self.gif_to_mp4 = gif_to_mp4
+        self.url_size_limits = url_size_limits or {}
 
     async def run(self, url: str) -> PipelineResult:
         if not is_valid_url(url):
@@ -29,34 +76,231 @@ class Pipeline:
         if not content.media:
             return PipelineResult(content=content)
 
-        resolve_tasks = [self.file_resolver.resolve(m.resource_url) for m in content.media]
-        raw_results = await asyncio.gather(*resolve_tasks, return_exceptions=True)
+        max_bytes = self.file_resolver.max_bytes
+        content = dataclasses.replace(
+            content,
+            media=[m.best_variant(max_bytes) if isinstance(m, Video) else m for m in content.media],
+        )
+
+        probes = await self._probe_remote(content) if self.remote_probe else {}
+        return await self._resolve(content, probes)
+
+    async def _probe_remote(self, content: Content) -> dict[str, RemoteProbe]:
+        """Range-probe the videos the parser did not fully describe, all at once."""
+        videos = [
+            m
+            for m in content.media
+            if isinstance(m, Video)
+            and not (m.width and m.height and m.duration)
+            and m.mime_type != self.GIF_MIME
+        ]
+        results = await asyncio.gather(
+            *[self.video_processor.probe_remote(m.resource_url) for m in videos],
+            return_exceptions=True,
+        )
+        probes = {}
+        for media, probe in zip(videos, results):
+            if isinstance(probe, Exception):
+                logging.warning("Remote video probe failed for %s: %s", media.resource_url, probe)
+            elif probe is not None:
+                probes[media.resource_url] = probe
+        return probes
+
+    async def _resolve(self, content: Content, probes: dict[str, RemoteProbe]) -> PipelineResult:
+        # Every file resolved or produced on the way is held until the result
+        # is returned; should a step fail or the run be cancelled, they are
+        # all released instead of leaking open streams and temporary files.
+        held: list[FileInfo] = []
+        try:
+            return await self._resolve_held(content, probes, held)
+        except BaseException:
+            for fi in held:
+                await fi.release()
+            raise
 
-        successful_pairs = []
-        for media, res in zip(content.media, raw_results):
-            if isinstance(res, Exception):
-                logging.warning("Failed to resolve %s: %s", media.resource_url, res)
-                continue
-            successful_pairs.append((media, res))
+    async def _resolve_held(
+        self, content: Content, probes: dict[str, RemoteProbe], held: list[FileInfo]
+    ) -> PipelineResult:
+        resolved = await _gather_all(
+            *[self._resolve_one(m, probes.get(m.resource_url), held) for m in content.media]
+        )
+        successful_pairs = [(m, fi) for m, fi in zip(content.media, resolved) if fi is not None]
 
         if not successful_pairs:
             return PipelineResult(content=content)
 
+        if self.gif_to_mp4:
+            successful_pairs = await _gather_all(
+                *[_hold(held, self._convert_gif(media, fi)) for media, fi in successful_pairs]
+            )
+
         video_meta = {}
         for media, fi in successful_pairs:
-            if isinstance(media, Video):
-                try:
-                    meta = await self.video_processor.process_video(fi.path)
+            # Animations converted to MP4 are probed like videos for delivery.
+            if isinstance(media, Video) or (isinstance(media, GIF) and fi.mime_type == "video/mp4"):
+                meta = await self._video_meta(media, fi, probes.get(media.resource_url))
+                if meta is not None:
                     video_meta[media.resource_url] = meta
-                except Exception as e:
-                    logging.warning(
-                        "Failed to process video %s: %s",
-                        media.resource_url,
-                        e,
-                    )
+
+        successful_pairs = await _gather_all(
+            *[
+                _hold(held, self._prepare(media, fi, video_meta.get(media.resource_url)))
+                for media, fi in successful_pairs
+            ]
+        )
 
         return PipelineResult(
             content=content,
-            resolved_media=successful_pairs,
+            resolved_media=list(successful_pairs),
             video_meta=video_meta,
         )
+
+    async def _resolve_one(
+        self, media: Entity, probe: RemoteProbe | None, held: list[FileInfo]
+    ) -> FileInfo | None:
+        """
+        Resolve one media file; None when it cannot be. Photos are never
+        probed, so small ones can stay in memory; videos may be streamed
+        straight through to delivery unless a probe found they have to be
+        transcoded. A probed size is exact and replaces the remote size
+        check, refusing oversized files before download.
+        """
+        size = media.size if isinstance(media, Video) else None
+        if probe is not None and probe.size is not None:
+            size = probe.size
+        try:
+            fi = await self.file_resolver.resolve(
+                media.resource_url,
+                buffered=isinstance(media, Photo),
+                streamable=isinstance(media, Video)
+                and not self._converts(media)
+                and not (probe is not None and probe.needs_transcode),
+                size=size,
+                remote_max_bytes=self._url_size_limit(media),
+            )
+        except Exception as e:
+            logging.warning("Failed to resolve %s: %s", media.resource_url, e)
+            return None
+        held.append(fi)
+        return fi
+
+    async def _video_meta(
+        self, media: Video | GIF, fi: FileInfo, probe: RemoteProbe | None
+    ) -> VideoMeta | None:
+        """
+        Metadata for delivery, taken from the parser, the moov box read from
+        the cache or stream head, the remote probe and finally the local file,
+        stopping at the first source that leaves nothing unknown. Fields a
+        source lacks (e.g. a duration parsers seldom report) are filled in from
+        the later ones.
+        """
+        meta = None
+        if media.width and media.height:
+            meta = VideoMeta(width=media.width, height=media.height, duration=media.duration)
+        meta = _merge_meta(meta, fi.video_meta)
+        if _complete(meta):
+            return meta
+
+        remote = probe.meta if probe is not None else None
+        meta = _merge_meta(meta, remote)
+        local = fi.stream is None and not fi.remote
+        if _complete(meta) or not local:
+            # A partial answer still beats nothing for a stream that cannot be probed.
+            if remote is not None:
+                await self.file_resolver.remember_video_meta(media.resource_url, remote)
+            return meta
+
+        try:
+            probed = await self.video_processor.process_video(fi.path)
+        except Exception as e:
+            logging.warning("Failed to process video %s: %s", media.resource_url, e)
+            return meta
+        await self.file_resolver.remember_video_meta(media.resource_url, probed)
+        return _merge_meta(probed, meta)
+
+    async def _prepare(
+        self, media: Entity, fi: FileInfo, meta: VideoMeta | None
+    ) -> tuple[Entity, FileInfo]:
+        """
+        Shrink a photo, or transcode a downloaded video if it cannot be
+        delivered as is, else faststart it.
+        """
+        if fi.remote:
+            return media, fi
+        if isinstance(media, Photo) and self.photo_processor is not None:
+            try:
+                optimized = await self.photo_processor.optimize(media.resource_url, fi)
+            except Exception as e:
+                logging.warning("Failed to optimize photo %s: %s", media.resource_url, e)
+                optimized = None
+            return media, optimized or fi
+        if not isinstance(media, Video) or fi.stream is not None or fi.data is not None:
+            return media, fi
+        transcoded = None
+        if (fi.mime_type or media.mime_type).startswith("video/"):
+            transcoded = await self.video_processor.transcode(fi.path, meta)
+        if transcoded is not None:
+            fi = dataclasses.replace(fi, path=transcoded, mime_type="video/mp4")
+        elif not (self.faststart and await self.video_processor.faststart(fi.path)):
+            return media, fi
+        size = await asyncio.to_thread(os.path.getsize, fi.path)
+        return media, dataclasses.replace(fi, size=size)
+
+    def _url_size_limit(self, media: Entity) -> int | None:
+        # A GIF URL is not accepted where a video is expected; keep GIFs local.
+        if getattr(media, "mime_type", None) == self.GIF_MIME:
+            return None
+        return self.url_size_limits.get(media.type())
+
+    def _converts(self, media: Entity) -> bool:
+        return self.gif_to_mp4 and getattr(media, "mime_type", None) == self.GIF_MIME
+
+    async def _convert_gif(self, media: Entity, fi: FileInfo) -> tuple[Entity, FileInfo]:
+        if not self._converts(media) or fi.stream is not None or fi.data is not None:
+            return media, fi
+        converted = await self.video_processor.convert_gif(fi.path)
+        if converted is None:
+            return media, fi
+        size = await asyncio.to_thread(os.path.getsize, converted)
+        return media, dataclasses.replace(fi, path=converted, size=size, mime_type="video/mp4")
+
+
+async def _gather_all(*aws: Awaitable) -> list:
+    """
+    `asyncio.gather` that lets no awaitable outlive it: when one fails or the
+    gather is cancelled, the others are cancelled and waited for first.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def _hold(
+    held: list[FileInfo], step: Awaitable[tuple[Entity, FileInfo]]
+) -> tuple[Entity, FileInfo]:
+    """Await a pipeline step and add the file it yields to `held`."""
+    media, fi = await step
+    held.append(fi)
+    return media, fi
+
+
+def _complete(meta: VideoMeta | None) -> bool:
+    return meta is not None and None not in (meta.width, meta.height, meta.duration)
+
+
+def _merge_meta(meta: VideoMeta | None, fallback: VideoMeta | None) -> VideoMeta | None:
+    """`meta` with its unknown fields taken from `fallback`."""
+    if meta is None:
+        return fallback
+    if fallback is None or _complete(meta):
+        return meta
+    return VideoMeta(
+        width=meta.width if meta.width is not None else fallback.width,
+        height=meta.height if meta.height is not None else fallback.height,
+        duration=meta.duration if meta.duration is not None else fallback.duration,
+    )
@@ -1,6 +1,14 @@
 from .delivery import Delivery
-from .infra import FileResolver, VideoProcessor
+from .infra import FileResolver, PhotoProcessor, VideoProcessor
 from .parser import DelegatingParser, Parser
 from .renderer import Renderer
 
-__all__ = ["Parser", "DelegatingParser", "Renderer", "Delivery", "FileResolver", "VideoProcessor"]
+__all__ = [
+    "Parser",
+    "DelegatingParser",
+    "Renderer",
+    "Delivery",
+    "FileResolver",
+    "VideoProcessor",
+    "PhotoProcessor",
+]
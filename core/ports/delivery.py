@@ -8,3 +8,11 @@ class Delivery(ABC):
 
     @abstractmethod
     async def send(self, target, result: PipelineResult) -> None: ...
+
+    async def discard(self, result: PipelineResult) -> None:
+        """
+        Release what `result` holds without sending it: close passthrough
+        streams and remove downloaded files. Harmless after `send`.
+        """
+        for _, fi in result.resolved_media:
+            await fi.release()
@@ -1,14 +1,37 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
 
-from core.domain.entity import FileInfo, VideoMeta
+from core.domain.entity import FileInfo, RemoteProbe, VideoMeta
 
 
 class FileResolver(ABC):
     """Contract: validate, download and store a remote file, return FileInfo."""
 
+    @property
+    def max_bytes(self) -> int | None:
+        """Largest file the resolver accepts, when limited; used to pick video variants."""
+        return None
+
     @abstractmethod
-    async def resolve(self, url: str) -> FileInfo: ...
+    async def resolve(
+        self,
+        url: str,
+        buffered: bool = False,
+        streamable: bool = False,
+        size: int | None = None,
+        remote_max_bytes: int | None = None,
+    ) -> FileInfo:
+        """
+        `buffered` lets small payloads stay in memory (FileInfo.data) instead of on
+        disk; `streamable` lets large ones be relayed unstored (FileInfo.stream).
+        A `size` already reported by the source replaces the remote size check.
+        With `remote_max_bytes`, files up to that size may be left on the server
+        for the platform to fetch by URL (FileInfo.remote).
+        """
+
+    async def remember_video_meta(self, url: str, video_meta: VideoMeta) -> None:
+        """Optionally keep probed metadata so a later resolve can return it."""
+        return None
 
 
 class VideoProcessor(ABC):
@@ -16,3 +39,27 @@ class VideoProcessor(ABC):
 
     @abstractmethod
     async def process_video(self, video_path: Path) -> VideoMeta: ...
+
+    async def probe_remote(self, url: str) -> RemoteProbe | None:
+        """Optionally read metadata and size from the remote file before it is downloaded."""
+        return None
+
+    async def transcode(self, video_path: Path, meta: VideoMeta | None) -> Path | None:
+        """Optionally re-encode a file that cannot be delivered as is; returns the new file."""
+        return None
+
+    async def convert_gif(self, path: Path) -> Path | None:
+        """Optionally re-encode an animated GIF as MP4; returns the new file."""
+        return None
+
+    async def faststart(self, video_path: Path) -> bool:
+        """Optionally rewrite the file in place for progressive playback; True if changed."""
+        return False
+
+
+class PhotoProcessor(ABC):
+    """Contract: shrink a downloaded photo before it is uploaded."""
+
+    @abstractmethod
+    async def optimize(self, url: str, file_info: FileInfo) -> FileInfo | None:
+        """Return a replacement file for the photo, or None to send it unchanged."""
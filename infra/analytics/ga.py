@@ -4,6 +4,7 @@ from collections.abc import Callable
 import aiohttp
 
 from infra.analytics.analytics import Analytics, Events
+from infra.http.session import SharedSession, open_session
 
 
 class GoogleAnalytics(Analytics):
@@ -17,12 +18,14 @@ class GoogleAnalytics(Analytics):
         secret: str,
         user_agent: str,
         mask_identifier: Callable[[int], str],
+        session: SharedSession | None = None,
     ) -> None:
         """Initializes the GA instance."""
         self.measurement_id = measurement_id
         self.secret = secret
         self.user_agent = user_agent
         self.mask_identifier = mask_identifier
+        self.session = session
 
     async def log(self, events: Events) -> None:
         """Logs events to GA asynchronously."""
@@ -50,7 +53,7 @@ class GoogleAnalytics(Analytics):
             "measurement_id": self.measurement_id,
             "api_secret": self.secret,
         }
-        async with aiohttp.ClientSession() as session:
+        async with open_session(self.session) as session:
             try:
                 async with session.post(
                     "https://www.google-analytics.com/mp/collect",
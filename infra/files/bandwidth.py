@@ -0,0 +1,115 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import defaultdict, deque
+from collections.abc import Hashable
+from contextvars import ContextVar
+
+# Who the current download is for (e.g. a Telegram user id); set by platform handlers.
+download_owner: ContextVar[Hashable | None] = ContextVar("download_owner", default=None)
+
+
+class BandwidthScheduler:
+    """
+    Global byte-rate limiter shared by all downloads, with per-owner fair share.
+
+    A token bucket caps the aggregate rate at `rate` bytes/s. Waiting chunks are
+    granted in weighted-fair-queuing order: every owner's chunks get increasing
+    virtual finish tags, so one owner with many large downloads cannot starve
+    others. Chunks of files known to be at most `small_bytes` are granted ahead
+    of everything else so small media finish fast.
+    """
+
+    def __init__(
+        self,
+        rate: int,
+        burst: int | None = None,
+        small_bytes: int = 5 * 1024 * 1024,
+        window: float = 5.0,
+    ):
+        self.rate = rate
+        self.burst = burst or rate
+        self.small_bytes = small_bytes
+        self.window = window
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._virtual = 0.0
+        self._finish: dict[Hashable, float] = {}
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._history: dict[Hashable, deque] = defaultdict(deque)
+
+    async def acquire(
+        self,
+        owner: Hashable | None,
+        nbytes: int,
+        size_hint: int | None = None,
+        weight: float = 1.0,
+    ) -> None:
+        """Wait until `nbytes` may be consumed on behalf of `owner`."""
+        small = size_hint is not None and size_hint <= self.small_bytes
+        start = max(self._virtual, self._finish.get(owner, 0.0))
+        finish = start + nbytes / weight
+        self._finish[owner] = finish
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (0 if small else 1, finish, next(self._seq), nbytes, future))
+        self._dispatch()
+        await future
+        self._record(owner, nbytes)
+
+    def throughput(self) -> dict[Hashable, float]:
+        """Current bytes/s per owner over the last `window` seconds."""
+        now = time.monotonic()
+        result = {}
+        for owner in list(self._history):
+            history = self._prune(owner, now)
+            if history:
+                result[owner] = sum(n for _, n in history) / self.window
+        return result
+
+    def _dispatch(self) -> None:
+        self._refill()
+        while self._heap:
+            _, finish, _, nbytes, future = self._heap[0]
+            if future.done():
+                heapq.heappop(self._heap)
+                continue
+            needed = min(nbytes, self.burst)
+            if self._tokens < needed:
+                if self._timer is None:
+                    delay = (needed - self._tokens) / self.rate
+                    self._timer = asyncio.get_running_loop().call_later(delay, self._wake)
+                return
+            heapq.heappop(self._heap)
+            self._tokens -= nbytes
+            self._virtual = max(self._virtual, finish)
+            future.set_result(None)
+
+        # Owners with nothing queued restart from the current virtual time.
+        if not self._heap:
+            self._finish.clear()
+
+    def _wake(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _record(self, owner: Hashable | None, nbytes: int) -> None:
+        now = time.monotonic()
+        self._history[owner].append((now, nbytes))
+        self._prune(owner, now)
+
+    def _prune(self, owner: Hashable | None, now: float) -> deque:
+        history = self._history[owner]
+        while history and history[0][0] < now - self.window:
+            history.popleft()
+        if not history:
+            del self._history[owner]
+        return history
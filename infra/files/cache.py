@@ -0,0 +1,215 @@
+import asyncio
+import dataclasses
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import shutil
+import time
+import urllib.parse
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from core.domain.entity import FileInfo, VideoMeta
+
+
+@dataclass
+class CacheEntry:
+    """Metadata stored next to a cached file."""
+
+    key: str
+    size: int
+    original_url: str
+    mime_type: str | None = None
+    video_meta: VideoMeta | None = None
+
+
+class MediaCache:
+    """
+    Size-bounded on-disk cache of downloaded media, keyed by URL hash.
+
+    Each entry is a data file ``<key>.bin`` with a ``<key>.json`` sidecar holding
+    its CacheEntry. Cached files are handed out as hard links (or copies when
+    the storage lives on another filesystem), so deleting the handed-out path
+    after delivery leaves the cache intact; downloads replace the file at
+    their destination rather than write through it. Least recently used entries are
+    evicted once the total size exceeds `max_bytes`. Payloads kept in memory
+    (FileInfo.data) are not cached: writing and re-linking them would cost the
+    file-system I/O that keeping them in memory avoids.
+    """
+
+    DATA_SUFFIX = ".bin"
+    META_SUFFIX = ".json"
+    TEMP_SUFFIX = ".tmp"
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    async def get(self, url: str, dest: Path) -> FileInfo | None:
+        """Materialize the cached file for `url` at `dest`; None on a miss."""
+        key = self.key(url)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        try:
+            await asyncio.to_thread(self._link, self._data_path(key), dest)
+        except OSError:
+            logging.warning("Cached file unavailable, dropping entry: %s", url, exc_info=True)
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        logging.debug("Media cache hit: %s", url)
+        return FileInfo(
+            path=dest,
+            size=entry.size,
+            mime_type=entry.mime_type,
+            original_url=url,
+            video_meta=entry.video_meta,
+        )
+
+    async def put(self, url: str, file_info: FileInfo) -> None:
+        """Add a downloaded file to the cache and evict entries over budget."""
+        if file_info.data is not None or file_info.size > self.max_bytes:
+            return
+
+        key = self.key(url)
+        entry = CacheEntry(
+            key=key,
+            size=file_info.size,
+            original_url=url,
+            mime_type=file_info.mime_type
+            or mimetypes.guess_type(urllib.parse.urlparse(url).path)[0],
+            video_meta=file_info.video_meta,
+        )
+
+        try:
+            await asyncio.to_thread(self._link, file_info.path, self._data_path(key))
+            await asyncio.to_thread(self._write_meta, entry)
+        except OSError:
+            logging.warning("Failed to cache %s", url, exc_info=True)
+            self._remove(key)
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.total_bytes -= previous.size
+        self._entries[key] = entry
+        self.total_bytes += entry.size
+
+        self._evict()
+
+    async def set_video_meta(self, url: str, video_meta: VideoMeta) -> None:
+        """Attach probed video metadata to an existing entry."""
+        entry = self._entries.get(self.key(url))
+        if entry is None:
+            return
+        entry.video_meta = video_meta
+        try:
+            await asyncio.to_thread(self._write_meta, entry)
+        except OSError:
+            logging.warning("Failed to store video metadata for %s", url, exc_info=True)
+
+    def janitor(self) -> None:
+        """
+        Rebuild the index from disk at startup.
+
+        Removes orphaned data files, sidecars without data and leftovers of
+        interrupted writes, then evicts down to the budget by modification time.
+        Only names the cache writes itself (``<sha256>`` plus one of its
+        suffixes) are touched; anything else in the directory is left alone.
+        """
+        found = []
+        for path in self.root.iterdir():
+            if not self._owns(path):
+                continue
+            if path.suffix == self.META_SUFFIX:
+                entry = self._read_meta(path)
+                data = self._data_path(path.stem)
+                if entry is None or not data.exists():
+                    path.unlink(missing_ok=True)
+                    continue
+                found.append((data.stat().st_mtime, entry))
+            elif path.suffix == self.DATA_SUFFIX:
+                if not path.with_suffix(self.META_SUFFIX).exists():
+                    path.unlink(missing_ok=True)
+            else:
+                path.unlink(missing_ok=True)
+
+        self._entries.clear()
+        self.total_bytes = 0
+        for _, entry in sorted(found, key=lambda x: x[0]):
+            self._entries[entry.key] = entry
+            self.total_bytes += entry.size
+
+        self._evict()
+        logging.info(
+            "Media cache ready: %d entries, %d bytes in %s",
+            len(self._entries),
+            self.total_bytes,
+            self.root,
+        )
+
+    def _evict(self) -> None:
+        while self.total_bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            logging.debug("Evicting cached media: %s", key)
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+        self._data_path(key).unlink(missing_ok=True)
+        self._meta_path(key).unlink(missing_ok=True)
+
+    def _owns(self, path: Path) -> bool:
+        suffixes = (self.DATA_SUFFIX, self.META_SUFFIX, self.TEMP_SUFFIX)
+        return (
+            path.suffix in suffixes
+            and len(path.stem) == 64
+            and all(c in "0123456789abcdef" for c in path.stem)
+            and path.is_file()
+        )
+
+    def _data_path(self, key: str) -> Path:
+        return self.root / f"{key}{self.DATA_SUFFIX}"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / f"{key}{self.META_SUFFIX}"
+
+    def _write_meta(self, entry: CacheEntry) -> None:
+        tmp = self.root / f"{entry.key}{self.TEMP_SUFFIX}"
+        tmp.write_text(json.dumps(dataclasses.asdict(entry)))
+        os.replace(tmp, self._meta_path(entry.key))
+
+    @staticmethod
+    def _read_meta(path: Path) -> CacheEntry | None:
+        try:
+            data = json.loads(path.read_text())
+            video_meta = data.pop("video_meta", None)
+            return CacheEntry(**data, video_meta=VideoMeta(**video_meta) if video_meta else None)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def _link(src: Path, dest: Path) -> None:
+        """Hard-link `src` to `dest` (replacing it), copying across filesystems."""
+        dest.unlink(missing_ok=True)
+        try:
+            os.link(src, dest)
+        except OSError:
+            shutil.copyfile(src, dest)
+        # Touch the source so janitor ordering follows recent use.
+        os.utime(src, (time.time(), time.time()))
@@ -14,3 +14,9 @@ class FileDownloadError(FileError):
     """Raised on failures while downloading a file (HTTP/network/IO)."""
 
     pass
+
+
+class RangeNotHonoredError(FileDownloadError):
+    """Raised when a server answers a Range request with the wrong bytes or a full body."""
+
+    pass
@@ -1,48 +1,178 @@
+import urllib.parse
 from pathlib import Path
 
+from core.domain.entity import VideoMeta
 from core.ports import FileResolver as FileResolverPort
+from infra.media.mp4 import read_meta_from_head
 
+from .cache import MediaCache
 from .downloader import MediaDownloader
 from .entity import FileInfo
+from .exception import FileTooLargeError
 from .storage import LocalStorage
 from .validator import RemoteFileValidator
 
 
 class FileResolver(FileResolverPort):
-    """Validate remote files, download them into local storage and return FileInfo."""
+    """
+    Validate remote files, download them into local storage and return FileInfo.
+
+    With `head_check` disabled the separate HEAD/Range size probe is skipped:
+    the validator's limit is enforced by the download itself, from the GET
+    response Content-Length and then per chunk, saving one or two round-trips.
+    The probe is also skipped whenever the caller already knows the size.
+
+    With a `cache`, repeat URLs are served from local disk instead of the network;
+    small payloads kept in memory are not cached and never touch the disk.
+
+    Buffered resolves keep payloads up to `memory_threshold` bytes in memory
+    (FileInfo.data) and only spill larger ones to storage.
+
+    Streamable resolves of files of at least `passthrough_min_bytes` are not
+    stored at all: FileInfo.stream relays the response body to the consumer
+    and metadata is read from a leading moov atom when present.
+
+    Files on `remote_hosts` (a host or any of its subdomains) that are known
+    to be within the caller's `remote_max_bytes` are not downloaded at all;
+    the returned FileInfo is marked `remote` so the platform fetches the URL.
+    """
+
+    MOOV_PEEK_BYTES = 512 * 1024
 
     def __init__(
         self,
         validator: RemoteFileValidator,
         downloader: MediaDownloader,
         storage: LocalStorage,
+        head_check: bool = True,
+        cache: MediaCache | None = None,
+        memory_threshold: int = 0,
+        passthrough_min_bytes: int = 0,
+        remote_hosts: tuple[str, ...] = (),
     ):
         self.validator = validator
         self.downloader = downloader
         self.storage = storage
+        self.head_check = head_check
+        self.cache = cache
+        self.memory_threshold = memory_threshold
+        self.passthrough_min_bytes = passthrough_min_bytes
+        self.remote_hosts = tuple(h.lower() for h in remote_hosts)
+
+    @property
+    def max_bytes(self) -> int:
+        return self.validator.max_bytes
 
-    async def resolve(self, url: str) -> FileInfo:
+    async def resolve(
+        self,
+        url: str,
+        buffered: bool = False,
+        streamable: bool = False,
+        size: int | None = None,
+        remote_max_bytes: int | None = None,
+    ) -> FileInfo:
         """
         Validate URL and size, download to storage and return FileInfo.
 
         Args:
             url: Remote file URL.
+            buffered: Allow keeping a small payload in memory instead of on disk.
+            streamable: Allow passing a large payload through without storing it.
+            size: Byte size already known (e.g. of a chosen video variant);
+                checked locally instead of with a HEAD request.
+            remote_max_bytes: Largest file the platform fetches by URL itself;
+                such files on `remote_hosts` are not downloaded.
 
         Returns:
-            FileInfo with local path, size (bytes), and original URL.
+            FileInfo with local path, size (bytes), and original URL; cache hits
+            also carry the stored mime type and video metadata, in-memory
+            downloads carry their bytes in `data`, passthrough ones a `stream`,
+            and files left for the platform to fetch are marked `remote`.
 
         Raises:
             Propagates validation or download exceptions.
         """
-        await self.validator.validate_size(url)
-
         filename = self.downloader.safe_filename(url)
-        path: Path = self.storage.get_path(filename)
 
-        size = await self.downloader.download(url, str(path))
+        if remote_max_bytes is not None and self._is_remote_host(url):
+            if size is None:
+                size = await self.validator.remote_size(url)
+            if size is not None and size <= remote_max_bytes:
+                return FileInfo(
+                    path=self.storage.root / filename,
+                    size=size,
+                    original_url=url,
+                    remote=True,
+                )
+
+        if self.cache is not None:
+            cached = await self.cache.get(url, self.storage.get_path(filename))
+            if cached:
+                return cached
+
+        max_bytes = None
+        if size is not None:
+            if size > self.validator.max_bytes:
+                raise FileTooLargeError(f"Remote file too large: {url}")
+            max_bytes = self.validator.max_bytes
+        elif self.head_check:
+            await self.validator.validate_size(url)
+        else:
+            max_bytes = self.validator.max_bytes
+
+        if streamable and self.passthrough_min_bytes > 0:
+            file_info = await self._resolve_stream(url, filename, max_bytes)
+            if file_info.stream is not None:
+                return file_info
+        elif buffered and self.memory_threshold > 0:
+            async with self.storage.spool(filename, self.memory_threshold) as spool:
+                size = await self.downloader.download_spooled(url, spool, max_bytes=max_bytes)
+            file_info = FileInfo(
+                path=spool.path or self.storage.root / filename,
+                size=size,
+                original_url=url,
+                data=spool.data,
+            )
+        else:
+            path: Path = self.storage.get_path(filename)
+            size = await self.downloader.download(url, str(path), max_bytes=max_bytes)
+            file_info = FileInfo(
+                path=path,
+                size=size,
+                original_url=url,
+            )
+
+        if self.cache is not None:
+            await self.cache.put(url, file_info)
+        return file_info
+
+    async def _resolve_stream(self, url: str, filename: str, max_bytes: int | None) -> FileInfo:
+        """Pass large payloads through; drain smaller ones into storage as usual."""
+        stream = await self.downloader.open_stream(url, max_bytes=max_bytes)
+        try:
+            if stream.size is None or stream.size < self.passthrough_min_bytes:
+                path: Path = self.storage.get_path(filename)
+                size = await stream.save(path)
+                return FileInfo(path=path, size=size, original_url=url)
+
+            head = await stream.peek(self.MOOV_PEEK_BYTES)
+        except BaseException:
+            await stream.close()
+            raise
 
         return FileInfo(
-            path=path,
-            size=size,
+            path=self.storage.root / filename,
+            size=stream.size,
+            mime_type=stream.mime_type,
             original_url=url,
+            video_meta=read_meta_from_head(head),
+            stream=stream,
         )
+
+    def _is_remote_host(self, url: str) -> bool:
+        host = (urllib.parse.urlparse(url).hostname or "").lower()
+        return any(host == h or host.endswith("." + h) for h in self.remote_hosts)
+
+    async def remember_video_meta(self, url: str, video_meta: VideoMeta) -> None:
+        if self.cache is not None:
+            await self.cache.set_video_meta(url, video_meta)
@@ -1,6 +1,10 @@
+import asyncio
+import io
 import logging
 from pathlib import Path
 
+import aiofiles
+
 
 class LocalStorage:
     """Map relative names to filesystem paths under a root directory."""
@@ -14,3 +18,69 @@ class LocalStorage:
         path.parent.mkdir(parents=True, exist_ok=True)
         logging.debug("Resolved path in local storage: %s", path)
         return path
+
+    def spool(self, relative_name: str, max_memory: int) -> "SpooledFile":
+        """Writable buffer kept in memory until it grows past `max_memory` bytes."""
+        return SpooledFile(self, relative_name, max_memory)
+
+
+class SpooledFile:
+    """
+    Async file-like sink that keeps small payloads in memory.
+
+    Writes go to an in-memory buffer; once it exceeds `max_memory` the buffer
+    is flushed to a file under the storage root and later writes go to disk.
+    After writing, exactly one of `data` (in memory) or `path` (spilled) is set.
+    """
+
+    def __init__(self, storage: LocalStorage, relative_name: str, max_memory: int):
+        self.storage = storage
+        self.relative_name = relative_name
+        self.max_memory = max_memory
+        self.path: Path | None = None
+        self._buffer: io.BytesIO | None = io.BytesIO()
+        self._fd = None
+
+    @property
+    def data(self) -> bytes | None:
+        return self._buffer.getvalue() if self._buffer is not None else None
+
+    async def write(self, chunk: bytes) -> int:
+        if self._fd is not None:
+            return await self._fd.write(chunk)
+        written = self._buffer.write(chunk)
+        if self._buffer.tell() > self.max_memory:
+            await self._spill()
+        return written
+
+    async def seek(self, offset: int) -> int:
+        if self._fd is not None:
+            return await self._fd.seek(offset)
+        return self._buffer.seek(offset)
+
+    async def discard(self) -> None:
+        """Drop buffered data and remove the spilled file, if any."""
+        await self.close()
+        self._buffer = None
+        if self.path is not None:
+            await asyncio.to_thread(self.path.unlink, True)
+
+    async def close(self) -> None:
+        if self._fd is not None:
+            await self._fd.close()
+            self._fd = None
+
+    async def __aenter__(self) -> "SpooledFile":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def _spill(self) -> None:
+        self.path = self.storage.get_path(self.relative_name)
+        logging.debug("Spilling buffered download to disk: %s", self.path)
+        # A fresh inode, so a cached file linked at this path is left alone.
+        await asyncio.to_thread(self.path.unlink, True)
+        self._fd = await aiofiles.open(self.path, "wb")
+        await self._fd.write(self._buffer.getvalue())
+        self._buffer = None
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import os
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager
+from pathlib import Path
+
+from core.domain.entity import ByteStream
+
+from .writer import open_writer, temp_path
+
+_EOF = None
+
+
+class MediaStream(ByteStream):
+    """
+    Remote response body relayed through a bounded in-memory chunk buffer.
+
+    A producer task reads the HTTP response and blocks once `buffer_chunks`
+    chunks are waiting, so memory stays bounded while a consumer (an upload)
+    drains it. Until the consumer starts, a full buffer simply waits, since an
+    upload may be queued behind other sends; once it reads, the producer gives
+    up if it stalls longer than `stall_timeout` seconds. Chunks can be peeked
+    (e.g. to read a leading moov atom) without being lost for the consumer.
+    A stream that is never consumed must be closed.
+    """
+
+    def __init__(
+        self,
+        open_response: Callable[[], AbstractAsyncContextManager],
+        buffer_chunks: int,
+        chunk_size: int,
+        stall_timeout: float = 60,
+    ):
+        self._open_response = open_response
+        self._queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=buffer_chunks)
+        self._chunk_size = chunk_size
+        self._stall_timeout = stall_timeout
+        self._head: list[bytes] = []
+        self._ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._error: BaseException | None = None
+        self._eof = False
+        self._consumed = False
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> "MediaStream":
+        """Start the producer and wait for response headers (size, mime type)."""
+        self._task = asyncio.create_task(self._produce())
+        await self._ready
+        return self
+
+    async def peek(self, nbytes: int) -> bytes:
+        """Return up to `nbytes` leading bytes; they are still yielded on iteration."""
+        buffered = sum(len(c) for c in self._head)
+        while not self._eof and buffered < nbytes:
+            chunk = await self._next()
+            if chunk is _EOF:
+                self._eof = True
+                break
+            self._head.append(chunk)
+            buffered += len(chunk)
+        return b"".join(self._head)[:nbytes]
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        if self._consumed:
+            raise RuntimeError("MediaStream can only be consumed once")
+        self._consumed = True
+
+        head, self._head = self._head, []
+        for chunk in head:
+            yield chunk
+        if self._eof:
+            return
+        while (chunk := await self._next()) is not _EOF:
+            yield chunk
+
+    async def save(self, path) -> int:
+        """
+        Drain the stream into a file and return the number of bytes written.
+
+        The file is written under a temporary name and moved into place when
+        complete, so nothing linked at `path` is written through.
+        """
+        written = 0
+        tmp = temp_path(path)
+        try:
+            async with open_writer(tmp) as fd:
+                async for chunk in self:
+                    await fd.write(chunk)
+                    written += len(chunk)
+            await asyncio.to_thread(os.replace, tmp, path)
+        except BaseException:
+            await asyncio.to_thread(Path(tmp).unlink, True)
+            raise
+        return written
+
+    async def close(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def _next(self) -> bytes | None:
+        chunk = await self._queue.get()
+        if chunk is _EOF and self._error is not None:
+            raise self._error
+        return chunk
+
+    async def _put(self, chunk: bytes | None) -> None:
+        if not self._consumed:
+            await self._queue.put(chunk)
+        else:
+            await asyncio.wait_for(self._queue.put(chunk), self._stall_timeout)
+
+    async def _produce(self) -> None:
+        try:
+            async with self._open_response() as (resp, on_chunk):
+                self.size = resp.content_length
+                self.mime_type = resp.content_type
+                self._ready.set_result(None)
+                async for chunk in resp.content.iter_chunked(self._chunk_size):
+                    if not chunk:
+                        break
+                    await on_chunk(chunk)
+                    await self._put(chunk)
+            await self._put(_EOF)
+        except Exception as e:
+            logging.warning("Streaming download failed: %s", e)
+            if not self._ready.done():
+                self._ready.set_exception(e)
+                return
+            self._error = e
+            # Make room for the end marker; the partial data is useless now.
+            while self._queue.full():
+                self._queue.get_nowait()
+            self._queue.put_nowait(_EOF)
@@ -1,5 +1,7 @@
 import aiohttp
 
+from infra.http.session import SharedSession, open_session
+
 from .exception import FileTooLargeError
 
 
@@ -11,10 +13,17 @@ class RemoteFileValidator:
     to parse Content-Range when Content-Length is missing.
     """
 
-    def __init__(self, user_agent: str, max_bytes: int, timeout: int = 60):
+    def __init__(
+        self,
+        user_agent: str,
+        max_bytes: int,
+        timeout: int = 60,
+        session: SharedSession | None = None,
+    ):
         self.headers = {"User-Agent": user_agent}
         self.max_bytes = max_bytes
         self.timeout = timeout
+        self.session = session
 
     async def validate_size(self, url: str) -> None:
         """
@@ -24,22 +33,28 @@ class RemoteFileValidator:
         size is known and exceeds max_bytes. If size cannot be determined,
         the method returns silently.
         """
-        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        size = await self.remote_size(url)
+        if size is not None and size > self.max_bytes:
+            raise FileTooLargeError(f"Remote file too large: {url}")
 
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            size = await self._get_size_via_head(session, url)
+    async def remote_size(self, url: str) -> int | None:
+        """Byte size of the remote file via HEAD then Range, or None if unknown."""
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
 
-            if size is None:
-                size = await self._get_size_via_range(session, url)
+        async with open_session(self.session) as session:
+            size = await self._get_size_via_head(session, url, timeout)
 
             if size is None:
-                return
+                size = await self._get_size_via_range(session, url, timeout)
 
-            if size > self.max_bytes:
-                raise FileTooLargeError(f"Remote file too large: {url}")
+            return size
 
-    async def _get_size_via_head(self, session: aiohttp.ClientSession, url: str) -> int | None:
-        async with session.head(url, headers=self.headers, allow_redirects=True) as resp:
+    async def _get_size_via_head(
+        self, session: aiohttp.ClientSession, url: str, timeout: aiohttp.ClientTimeout
+    ) -> int | None:
+        async with session.head(
+            url, headers=self.headers, allow_redirects=True, timeout=timeout
+        ) as resp:
             if resp.status >= 400:
                 return None
 
@@ -49,11 +64,13 @@ class RemoteFileValidator:
             except ValueError:
                 return None
 
-    async def _get_size_via_range(self, session: aiohttp.ClientSession, url: str) -> int | None:
+    async def _get_size_via_range(
+        self, session: aiohttp.ClientSession, url: str, timeout: aiohttp.ClientTimeout
+    ) -> int | None:
         headers = dict(self.headers)
         headers["Range"] = "bytes=0-0"
 
-        async with session.get(url, headers=headers, allow_redirects=True) as resp:
+        async with session.get(url, headers=headers, allow_redirects=True, timeout=timeout) as resp:
             if resp.status not in (200, 206):
                 return None
 
@@ -0,0 +1,64 @@
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import aiohttp
+
+
+class SharedSession:
+    """
+    Lazily create one aiohttp.ClientSession shared by file I/O and analytics.
+
+    The session is created on first use (it must be bound to the running event
+    loop) with a tuned TCPConnector, so repeated requests to the same host
+    reuse DNS results and keep-alive connections instead of paying a fresh
+    lookup and TLS handshake every time.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        ttl_dns_cache: int = 300,
+        keepalive_timeout: float = 30,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self._session: aiohttp.ClientSession | None = None
+
+    def get(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it if missing or closed."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.ttl_dns_cache,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            logging.debug(
+                "Created shared HTTP session: limit=%d, limit_per_host=%d",
+                self.limit,
+                self.limit_per_host,
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared session and its pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logging.debug("Closed shared HTTP session")
+        self._session = None
+
+
+@asynccontextmanager
+async def open_session(shared: SharedSession | None) -> AsyncIterator[aiohttp.ClientSession]:
+    """Yield the shared session, or a throwaway one when no shared session is configured."""
+    if shared is not None:
+        yield shared.get()
+        return
+
+    async with aiohttp.ClientSession() as session:
+        yield session
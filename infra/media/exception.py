@@ -0,0 +1,16 @@
+class MediaError(Exception):
+    """Base class for media processing errors."""
+
+    pass
+
+
+class MediaTimeoutError(MediaError):
+    """Raised when an ffmpeg/ffprobe job exceeds its timeout and is killed."""
+
+    pass
+
+
+class MediaProcessError(MediaError):
+    """Raised when an ffmpeg/ffprobe job exits with a non-zero status."""
+
+    pass
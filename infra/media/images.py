@@ -0,0 +1,183 @@
+import asyncio
+import dataclasses
+import logging
+import os
+import struct
+from collections import OrderedDict
+from pathlib import Path
+
+from core.ports import PhotoProcessor
+from infra.files.cache import MediaCache
+from infra.files.entity import FileInfo
+from infra.media.mp4 import read_head
+from infra.media.workers import MediaWorkerPool
+
+# JPEG start-of-frame markers (baseline, progressive, lossless, ...); not DHT/JPG/DAC
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def image_size(head: bytes) -> tuple[int, int] | None:
+    """
+    (width, height) read from the leading bytes of a JPEG, PNG or WebP image.
+
+    None for other formats or when the dimensions are not inside `head`.
+    """
+    if head.startswith(b"\x89PNG\r\n\x1a\n") and len(head) >= 24:
+        return struct.unpack_from(">II", head, 16)
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP" and len(head) >= 30:
+        return _webp_size(head)
+    if head.startswith(b"\xff\xd8"):
+        return _jpeg_size(head)
+    return None
+
+
+def _webp_size(head: bytes) -> tuple[int, int] | None:
+    chunk = head[12:16]
+    if chunk == b"VP8X":
+        width = int.from_bytes(head[24:27], "little") + 1
+        height = int.from_bytes(head[27:30], "little") + 1
+        return width, height
+    if chunk == b"VP8 ":
+        width, height = struct.unpack_from("<HH", head, 26)
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(head) >= 25:
+        bits = int.from_bytes(head[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    return None
+
+
+def _jpeg_size(head: bytes) -> tuple[int, int] | None:
+    pos = 2
+    while pos + 4 <= len(head):
+        if head[pos] != 0xFF:
+            return None
+        marker = head[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        (length,) = struct.unpack_from(">H", head, pos + 2)
+        if marker in _SOF_MARKERS:
+            if pos + 9 > len(head):
+                return None
+            height, width = struct.unpack_from(">HH", head, pos + 5)
+            return width, height
+        pos += 2 + length
+    return None
+
+
+class PhotoOptimizer(PhotoProcessor):
+    """
+    Downscale and re-encode photos before they are uploaded to Telegram.
+
+    Telegram recompresses photos to JPEG of at most `max_side` pixels anyway,
+    so larger or heavier originals are scaled down and re-encoded as JPEG by
+    ffmpeg on the media worker pool. The result is kept only when it saves
+    at least `min_saving` of the original bytes. Optimized files go to the
+    media `cache` under a key derived from the source URL; URLs that were not
+    worth optimizing are remembered in memory so they are not tried again.
+    """
+
+    HEAD_BYTES = 64 * 1024
+    SKIP_MEMORY = 1024
+
+    def __init__(
+        self,
+        pool: MediaWorkerPool,
+        max_side: int,
+        cache: MediaCache | None = None,
+        min_bytes: int = 1024 * 1024,
+        min_saving: float = 0.1,
+        quality: int = 3,
+    ):
+        self.pool = pool
+        self.max_side = max_side
+        self.cache = cache
+        self.min_bytes = min_bytes
+        self.min_saving = min_saving
+        self.quality = quality
+        self._skipped: OrderedDict[str, None] = OrderedDict()
+
+    async def optimize(self, url: str, file_info: FileInfo) -> FileInfo | None:
+        """
+        Return a smaller JPEG of the photo in `file_info`, or None to send it as is.
+
+        The optimized file replaces the original on disk; an in-memory payload
+        is written out first so ffmpeg can read it.
+        """
+        if url in self._skipped:
+            return None
+
+        key = f"{url}#photo-{self.max_side}-q{self.quality}"
+        target = file_info.path.with_name(f"{file_info.path.stem}.photo.jpg")
+        if self.cache is not None:
+            cached = await self.cache.get(key, target)
+            if cached is not None:
+                await self._discard(file_info)
+                return dataclasses.replace(cached, original_url=url)
+
+        if file_info.data is not None:
+            head = file_info.data[: self.HEAD_BYTES]
+        else:
+            head = await asyncio.to_thread(read_head, file_info.path, self.HEAD_BYTES)
+        size = image_size(head)
+        oversized = size is not None and max(size) > self.max_side
+        if not oversized and file_info.size < self.min_bytes:
+            self._skip(url)
+            return None
+
+        # ffmpeg reads files; spill an in-memory payload just for the encode.
+        spilled = file_info.data is not None
+        if spilled:
+            await asyncio.to_thread(file_info.path.write_bytes, file_info.data)
+        try:
+            await self.pool.ffmpeg(*self._args(file_info.path, target))
+            optimized = await asyncio.to_thread(os.path.getsize, target)
+        except Exception as e:
+            logging.warning("Photo optimization failed for %s: %s", url, e)
+            optimized = None
+        finally:
+            if spilled:
+                await asyncio.to_thread(file_info.path.unlink, True)
+
+        if optimized is None or optimized > file_info.size * (1 - self.min_saving):
+            if optimized is not None:
+                logging.debug("Re-encoding %s saves too little (%d bytes)", url, optimized)
+                self._skip(url)
+            await asyncio.to_thread(target.unlink, True)
+            return None
+
+        logging.debug("Optimized photo %s: %d -> %d bytes", url, file_info.size, optimized)
+        await self._discard(file_info)
+        result = FileInfo(path=target, size=optimized, mime_type="image/jpeg", original_url=url)
+        if self.cache is not None:
+            await self.cache.put(key, result)
+        return result
+
+    def _args(self, source: Path, output: Path) -> list[str]:
+        side = self.max_side
+        return [
+            "-i",
+            str(source),
+            "-frames:v",
+            "1",
+            "-vf",
+            f"scale='min({side},iw)':'min({side},ih)':force_original_aspect_ratio=decrease",
+            "-q:v",
+            str(self.quality),
+            "-f",
+            "mjpeg",
+            str(output),
+        ]
+
+    def _skip(self, url: str) -> None:
+        self._skipped[url] = None
+        while len(self._skipped) > self.SKIP_MEMORY:
+            self._skipped.popitem(last=False)
+
+    @staticmethod
+    async def _discard(file_info: FileInfo) -> None:
+        if file_info.data is None:
+            await asyncio.to_thread(file_info.path.unlink, True)
@@ -0,0 +1,247 @@
+import os
+import struct
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+from infra.media.entity import VideoMeta
+
+# Refuse to load absurdly large movie headers into memory
+MAX_MOOV_BYTES = 64 * 1024 * 1024
+
+# Boxes an ISO-BMFF (MP4/MOV) file may start with; anything else is another format
+_LEADING_BOXES = {b"ftyp", b"styp", b"moov", b"mdat", b"free", b"skip", b"wide", b"pnot"}
+
+
+def iter_boxes(
+    data: bytes, start: int = 0, end: int | None = None
+) -> Iterator[tuple[bytes, int, int]]:
+    """
+    Yield (type, payload_start, box_end) for ISO-BMFF boxes in data[start:end].
+
+    Stops at the first box that is malformed or extends past `end`.
+    """
+    end = len(data) if end is None else end
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, pos)
+        header = 8
+        if size == 1:
+            if pos + 16 > end:
+                return
+            (size,) = struct.unpack_from(">Q", data, pos + 8)
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            return
+        yield box_type, pos + header, pos + size
+        pos += size
+
+
+def find_moov(data: bytes) -> tuple[int, int] | None:
+    """Return (payload_start, end) of a complete top-level moov box in `data`."""
+    for box_type, payload, box_end in iter_boxes(data):
+        if box_type == b"moov":
+            return payload, box_end
+    return None
+
+
+def parse_moov(data: bytes, start: int, end: int) -> VideoMeta | None:
+    """
+    Read width, height and duration from a moov payload.
+
+    Duration comes from mvhd, dimensions from the first video track header
+    (handler ``vide``); tracks of other kinds are used only when no video
+    track reports a size (audio tracks report 0x0).
+    """
+    duration = None
+    video_dims = other_dims = None
+    for box_type, payload, box_end in iter_boxes(data, start, end):
+        if box_type == b"mvhd" and duration is None:
+            duration = _parse_mvhd(data, payload, box_end)
+        elif box_type == b"trak":
+            dims, handler = _parse_trak(data, payload, box_end)
+            if dims and handler == b"vide":
+                video_dims = video_dims or dims
+            elif dims:
+                other_dims = other_dims or dims
+
+    width, height = video_dims or other_dims or (None, None)
+    if width is None and duration is None:
+        return None
+    return VideoMeta(width=width, height=height, duration=duration)
+
+
+def read_meta_from_head(data: bytes) -> VideoMeta | None:
+    """Metadata from the leading bytes of a file, if its moov box is fully inside them."""
+    moov = find_moov(data)
+    if moov is None:
+        return None
+    return parse_moov(data, *moov)
+
+
+def box_header(header: bytes, pos: int, file_size: int) -> tuple[bytes, int, int] | None:
+    """
+    Decode the box header read at offset `pos` into (type, header_size, size).
+
+    `header` holds up to 16 bytes from `pos`. Returns None for malformed boxes
+    and, at offset 0, for files that do not look like ISO-BMFF at all.
+    """
+    if len(header) < 8:
+        return None
+    size, box_type = struct.unpack_from(">I4s", header)
+    header_size = 8
+    if size == 1:
+        if len(header) < 16:
+            return None
+        (size,) = struct.unpack_from(">Q", header, 8)
+        header_size = 16
+    elif size == 0:
+        size = file_size - pos
+    if size < header_size or (pos == 0 and box_type not in _LEADING_BOXES):
+        return None
+    return box_type, header_size, size
+
+
+def read_meta(path: Path | str, max_moov_bytes: int = MAX_MOOV_BYTES) -> VideoMeta | None:
+    """
+    Metadata of a local MP4/MOV file, or None when it cannot be read this way.
+
+    Walks the top-level box headers with seeks and reads only the moov box,
+    wherever it is, so a multi-gigabyte file costs a handful of small reads.
+    Returns None for files that are not ISO-BMFF, have no moov, or have a
+    moov larger than `max_moov_bytes`.
+    """
+    payload = _read_moov(path, max_moov_bytes)
+    return parse_moov(payload, 0, len(payload)) if payload is not None else None
+
+
+def video_codec(path: Path | str) -> str | None:
+    """
+    Sample entry type of the first video track of a local MP4/MOV (e.g. "avc1", "hvc1").
+
+    None when the file is not ISO-BMFF or has no readable video track.
+    """
+    payload = _read_moov(path, MAX_MOOV_BYTES)
+    return moov_codec(payload, 0, len(payload)) if payload is not None else None
+
+
+def moov_codec(data: bytes, start: int, end: int) -> str | None:
+    """Sample entry type of the first video track in the moov payload data[start:end]."""
+    payload = data[start:end]
+    for box_type, trak, trak_end in iter_boxes(payload):
+        if box_type != b"trak":
+            continue
+        _, handler = _parse_trak(payload, trak, trak_end)
+        if handler != b"vide":
+            continue
+        stsd = _descend(payload, trak, trak_end, (b"mdia", b"minf", b"stbl", b"stsd"))
+        # version/flags(4) entry_count(4), then the first entry: size(4) type(4)
+        if stsd is not None and stsd[0] + 16 <= stsd[1]:
+            return payload[stsd[0] + 12 : stsd[0] + 16].decode("latin-1")
+    return None
+
+
+def moov_at_end(path: Path | str) -> bool:
+    """True if a local MP4/MOV keeps its media data (mdat) before the moov box."""
+    seen_mdat = False
+    with open(path, "rb") as f:
+        for box_type, *_ in _iter_file_boxes(f):
+            if box_type == b"mdat":
+                seen_mdat = True
+            elif box_type == b"moov":
+                return seen_mdat
+    return False
+
+
+def read_head(path: Path | str, nbytes: int) -> bytes:
+    """The first `nbytes` of a local file (fewer if it is shorter), e.g. to sniff its format."""
+    with open(path, "rb") as f:
+        return f.read(nbytes)
+
+
+def _read_moov(path: Path | str, max_moov_bytes: int) -> bytes | None:
+    with open(path, "rb") as f:
+        for box_type, pos, header_size, size in _iter_file_boxes(f):
+            if box_type == b"moov":
+                if size > max_moov_bytes:
+                    return None
+                f.seek(pos + header_size)
+                payload = f.read(size - header_size)
+                return payload if len(payload) == size - header_size else None
+    return None
+
+
+def _descend(data: bytes, start: int, end: int, path: tuple[bytes, ...]) -> tuple[int, int] | None:
+    """(payload_start, end) of the box reached by following `path` from data[start:end]."""
+    for name in path:
+        for box_type, payload, box_end in iter_boxes(data, start, end):
+            if box_type == name:
+                start, end = payload, box_end
+                break
+        else:
+            return None
+    return start, end
+
+
+def _iter_file_boxes(f: BinaryIO) -> Iterator[tuple[bytes, int, int, int]]:
+    """Yield (type, offset, header_size, size) of top-level boxes; stops at malformed data."""
+    file_size = os.fstat(f.fileno()).st_size
+    pos = 0
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        box = box_header(f.read(16), pos, file_size)
+        if box is None:
+            return
+        box_type, header_size, size = box
+        yield box_type, pos, header_size, size
+        pos += size
+
+
+def _parse_trak(data: bytes, start: int, end: int) -> tuple[tuple[int, int] | None, bytes | None]:
+    """Return the track's display size and media handler type (e.g. b"vide", b"soun")."""
+    dims = handler = None
+    for box_type, payload, box_end in iter_boxes(data, start, end):
+        if box_type == b"tkhd":
+            dims = _parse_tkhd(data, payload, box_end)
+        elif box_type == b"mdia":
+            for child_type, child, child_end in iter_boxes(data, payload, box_end):
+                # version/flags(4) pre_defined(4) handler_type(4)
+                if child_type == b"hdlr" and child + 12 <= child_end:
+                    handler = data[child + 8 : child + 12]
+    return dims, handler
+
+
+def _parse_mvhd(data: bytes, start: int, end: int) -> int | None:
+    version = data[start] if start < end else None
+    if version == 1 and start + 32 <= end:
+        timescale, length = struct.unpack_from(">IQ", data, start + 20)
+    elif version == 0 and start + 20 <= end:
+        timescale, length = struct.unpack_from(">II", data, start + 12)
+    else:
+        return None
+    # Fragmented files leave the duration at 0 (or all ones) in mvhd.
+    if not timescale or not length or length in (0xFFFFFFFF, 0xFFFFFFFFFFFFFFFF):
+        return None
+    return int(round(length / timescale))
+
+
+def _parse_tkhd(data: bytes, start: int, end: int) -> tuple[int, int] | None:
+    version = data[start] if start < end else None
+    if version == 1:
+        offset = start + 4 + 8 + 8 + 4 + 4 + 8
+    elif version == 0:
+        offset = start + 4 + 4 + 4 + 4 + 4 + 4
+    else:
+        return None
+    # reserved(8) layer(2) alternate_group(2) volume(2) reserved(2) matrix(36)
+    offset += 8 + 2 + 2 + 2 + 2 + 36
+    if offset + 8 > end:
+        return None
+    width, height = struct.unpack_from(">II", data, offset)
+    # 16.16 fixed point
+    width, height = width >> 16, height >> 16
+    if not width or not height:
+        return None
+    return width, height
@@ -1,23 +1,121 @@
 import asyncio
 import logging
+import os
+import re
+import struct
 from pathlib import Path
 
-import ffmpeg
+import aiohttp
 
+from core.domain.entity import RemoteProbe
 from core.ports import VideoProcessor as VideoProcessorPort
 from infra.files.storage import LocalStorage
+from infra.http.session import SharedSession, open_session
 from infra.media.entity import VideoMeta
+from infra.media.mp4 import (
+    MAX_MOOV_BYTES,
+    box_header,
+    moov_at_end,
+    moov_codec,
+    parse_moov,
+    read_head,
+    read_meta,
+)
+from infra.media.transcoder import VideoTranscoder
+from infra.media.workers import MediaWorkerPool
 
 
 class VideoProcessor(VideoProcessorPort):
-    """Utilities to probe video info (dimensions, duration)."""
+    """
+    Utilities to probe video info (dimensions, duration).
 
-    def __init__(self, storage: LocalStorage):
+    MP4/MOV files are read in-process from their moov box; ffprobe is only
+    spawned, through the bounded worker `pool`, for other containers or when
+    some field could not be read.
+    `probe_remote` reads the same box straight from the server with Range
+    requests before the file is downloaded, along with its size, and tells
+    whether the `transcoder`, if any, will have to re-encode it.
+    """
+
+    GIF_MAGIC = (b"GIF87a", b"GIF89a")
+
+    PROBE_CHUNK_BYTES = 64 * 1024
+
+    def __init__(
+        self,
+        storage: LocalStorage,
+        user_agent: str | None = None,
+        session: SharedSession | None = None,
+        timeout: int = 30,
+        pool: MediaWorkerPool | None = None,
+        transcoder: VideoTranscoder | None = None,
+    ):
         self.storage = storage
+        self.pool = pool or MediaWorkerPool()
+        self.transcoder = transcoder
+        self.headers = {"User-Agent": user_agent} if user_agent else {}
+        self.session = session
+        self.timeout = timeout
+
+    async def probe_remote(self, url: str) -> RemoteProbe | None:
+        """
+        Read size and metadata of a remote video via Range requests, without downloading it.
+
+        Fetches the head of the file and follows top-level box headers to the
+        moov box, so a moov at the end costs one more request. The size comes
+        from Content-Range; `meta` is None when the file is not ISO-BMFF or
+        its moov cannot be read. Returns None when the server ignores ranges
+        or any request fails.
+        """
+        try:
+            async with open_session(self.session) as session:
+                reader = _RangeReader(session, url, self.headers, self.timeout)
+                if not await reader.load(0, self.PROBE_CHUNK_BYTES):
+                    return None
+                moov = await self._walk_remote(reader)
+        except (aiohttp.ClientError, TimeoutError, ValueError, asyncio.IncompleteReadError) as e:
+            logging.debug("Remote probe failed for %s: %s", url, e)
+            return None
+
+        meta = parse_moov(moov, 0, len(moov)) if moov is not None else None
+        codec = moov_codec(moov, 0, len(moov)) if moov is not None else None
+        return RemoteProbe(
+            meta=meta,
+            size=reader.total,
+            needs_transcode=self.transcoder is not None
+            and self.transcoder.reason(reader.total, codec) is not None,
+        )
+
+    async def _walk_remote(self, reader: "_RangeReader") -> bytes | None:
+        """The moov payload of the remote file, or None if it cannot be found."""
+        pos = 0
+        while pos + 8 <= reader.total:
+            header = await reader.read(pos, min(16, reader.total - pos), self.PROBE_CHUNK_BYTES)
+            box = box_header(header, pos, reader.total)
+            if box is None:
+                return None
+            box_type, header_size, size = box
+            if box_type == b"moov":
+                if size > MAX_MOOV_BYTES:
+                    return None
+                payload = await reader.read(pos + header_size, size - header_size)
+                if len(payload) != size - header_size:
+                    return None
+                return payload
+            pos += size
+        return None
 
     async def process_video(self, video_path: Path) -> VideoMeta:
         try:
-            probe = await asyncio.to_thread(ffmpeg.probe, video_path)
+            meta = await asyncio.to_thread(read_meta, video_path)
+        except (OSError, struct.error):
+            logging.debug("MP4 metadata read failed for %s", video_path, exc_info=True)
+            meta = None
+        if meta is not None and None not in (meta.width, meta.height, meta.duration):
+            return meta
+
+        try:
+            probe = await self.pool.probe(video_path)
         except Exception:
             logging.exception("ffprobe failed for %s", video_path)
             return VideoMeta(width=None, height=None, duration=None)
@@ -25,6 +123,102 @@ class VideoProcessor(VideoProcessorPort):
         width, height, duration = self._parse_probe(probe)
         return VideoMeta(width=width, height=height, duration=duration)
 
+    async def transcode(self, video_path: Path, meta: VideoMeta | None) -> Path | None:
+        if self.transcoder is None:
+            return None
+        return await self.transcoder.transcode_if_needed(video_path, meta)
+
+    async def faststart(self, video_path: Path) -> bool:
+        """
+        Move a trailing moov box to the front so playback can start while downloading.
+
+        Lossless stream-copy remux (``-movflags +faststart``) run through the
+        worker pool; the file is replaced in place. Returns True if it was
+        rewritten, False when it already was streamable, is not an MP4/MOV,
+        or the remux failed (the original file is kept).
+        """
+        try:
+            needed = await asyncio.to_thread(moov_at_end, video_path)
+        except (OSError, struct.error):
+            needed = False
+        if not needed:
+            return False
+
+        muxer = "mov" if video_path.suffix.lower() == ".mov" else "mp4"
+        tmp = video_path.with_name(f".faststart-{video_path.name}")
+        try:
+            await self.pool.ffmpeg(
+                "-i",
+                str(video_path),
+                "-map",
+                "0:v",
+                "-map",
+                "0:a?",
+                "-c",
+                "copy",
+                "-movflags",
+                "+faststart",
+                "-f",
+                muxer,
+                str(tmp),
+            )
+            await asyncio.to_thread(os.replace, tmp, video_path)
+        except Exception as e:
+            logging.warning("Faststart remux failed for %s: %s", video_path, e)
+            await asyncio.to_thread(tmp.unlink, True)
+            return False
+        logging.debug("Remuxed %s for streaming", video_path)
+        return True
+
+    async def convert_gif(self, path: Path) -> Path | None:
+        """
+        Re-encode an animated GIF as silent H.264 MP4 next to it.
+
+        Returns the ``.mp4`` file (the GIF is removed), or None when the file
+        is not a GIF or the conversion failed (the GIF is kept).
+        """
+        try:
+            magic = await asyncio.to_thread(read_head, path, 6)
+        except OSError:
+            return None
+        if magic not in self.GIF_MAGIC:
+            return None
+
+        tmp = path.with_name(f".gif-{path.stem}.mp4")
+        target = path.with_suffix(".mp4")
+        try:
+            await self.pool.ffmpeg(
+                "-i",
+                str(path),
+                "-map",
+                "0:v:0",
+                "-c:v",
+                "libx264",
+                "-preset",
+                "veryfast",
+                "-crf",
+                "23",
+                "-pix_fmt",
+                "yuv420p",
+                # yuv420p needs even dimensions
+                "-vf",
+                "scale=trunc(iw/2)*2:trunc(ih/2)*2",
+                "-an",
+                "-movflags",
+                "+faststart",
+                "-f",
+                "mp4",
+                str(tmp),
+            )
+            await asyncio.to_thread(os.replace, tmp, target)
+        except Exception as e:
+            logging.warning("GIF conversion failed for %s: %s", path, e)
+            await asyncio.to_thread(tmp.unlink, True)
+            return None
+        if target != path:
+            await asyncio.to_thread(path.unlink, True)
+        return target
+
     @staticmethod
     def _parse_probe(
         probe: dict,
@@ -57,3 +251,50 @@ class VideoProcessor(VideoProcessorPort):
                     pass
 
         return width, height, duration
+
+
+class _RangeReader:
+    """Ranged reads of one remote file through a single cached window."""
+
+    CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+    def __init__(self, session: aiohttp.ClientSession, url: str, headers: dict, timeout: int):
+        self.session = session
+        self.url = url
+        self.headers = headers
+        self.timeout = timeout
+        self.total: int | None = None
+        self._start = 0
+        self._window = b""
+
+    async def load(self, start: int, length: int) -> bool:
+        """Fetch `length` bytes from `start` into the window; False if ranges are unsupported."""
+        end = start + length - 1
+        if self.total is not None:
+            end = min(end, self.total - 1)
+        headers = {**self.headers, "Range": f"bytes={start}-{end}"}
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with self.session.get(self.url, headers=headers, timeout=timeout) as resp:
+            # Anything but 206 would be the whole body; leave it unread.
+            if resp.status != 206:
+                return False
+            match = self.CONTENT_RANGE.fullmatch(resp.headers.get("Content-Range", ""))
+            if match is None:
+                return False
+            first, last, total = map(int, match.groups())
+            if first != start or last < first:
+                return False
+            # Never read past the requested range, whatever the server sends.
+            self.total = total
+            self._start = start
+            self._window = await resp.content.readexactly(min(last, end) - start + 1)
+        return True
+
+    async def read(self, start: int, length: int, prefetch: int = 0) -> bytes:
+        """Return bytes [start, start + length), fetching at least `prefetch` on a miss."""
+        offset = start - self._start
+        if offset < 0 or offset + length > len(self._window):
+            if not await self.load(start, max(length, prefetch)):
+                return b""
+            offset = 0
+        return self._window[offset : offset + length]
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import os
+import struct
+from collections.abc import Callable
+from pathlib import Path
+
+from infra.media.entity import VideoMeta
+from infra.media.mp4 import video_codec
+from infra.media.workers import MediaWorkerPool
+
+# Sample entries Telegram clients play inline (H.264)
+PLAYABLE_CODECS = {"avc1", "avc3"}
+
+
+class VideoTranscoder:
+    """
+    Re-encode videos Telegram cannot take as they are.
+
+    A file is transcoded only when it is larger than `max_bytes` or is not an
+    H.264 MP4/MOV (e.g. VP9 WebM, HEVC). The output is H.264/AAC MP4 with
+    faststart, encoded at constant quality but capped at the bitrate that
+    makes `duration` seconds fit into `max_bytes`. Jobs run on `pool`, which
+    should be kept apart from the one for short probe and remux jobs. Odd
+    dimensions are rounded down to even ones, which libx264 requires for
+    yuv420p. Progress is only logged.
+    """
+
+    # Leave room for container overhead and rate-control overshoot.
+    SIZE_MARGIN = 0.92
+
+    def __init__(
+        self,
+        pool: MediaWorkerPool,
+        max_bytes: int,
+        timeout: float = 1800,
+        audio_kbps: int = 128,
+        min_video_kbps: int = 200,
+        crf: int = 23,
+        preset: str = "veryfast",
+    ):
+        self.pool = pool
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.audio_kbps = audio_kbps
+        self.min_video_kbps = min_video_kbps
+        self.crf = crf
+        self.preset = preset
+
+    async def transcode_if_needed(self, path: Path, meta: VideoMeta | None) -> Path | None:
+        """
+        Transcode `path` when it cannot be delivered as is.
+
+        Returns the new ``.mp4`` file (the source is removed) or None when the
+        file is fine as it is or cannot be made to fit (the source is kept).
+        """
+        reason = await self._reason(path)
+        if reason is None:
+            return None
+
+        duration = meta.duration if meta else None
+        if not duration:
+            logging.warning("Cannot transcode %s (%s): duration unknown", path.name, reason)
+            return None
+        video_kbps = self.video_kbps(duration)
+        if video_kbps < self.min_video_kbps:
+            logging.warning(
+                "Cannot transcode %s (%s): %ds does not fit in %d bytes",
+                path.name,
+                reason,
+                duration,
+                self.max_bytes,
+            )
+            return None
+
+        output = path.with_name(f".transcode-{path.stem}.mp4")
+        logging.info("Transcoding %s (%s) at up to %d kbit/s", path.name, reason, video_kbps)
+        try:
+            await self.pool.ffmpeg(
+                *self._args(path, output, video_kbps),
+                timeout=self.timeout,
+                on_line=self._progress_reader(path, duration),
+            )
+            size = await asyncio.to_thread(os.path.getsize, output)
+            if size > self.max_bytes:
+                raise ValueError(f"output is {size} bytes, over the {self.max_bytes} limit")
+        except Exception as e:
+            logging.warning("Transcoding %s failed: %s", path.name, e)
+            await asyncio.to_thread(output.unlink, True)
+            return None
+
+        target = path.with_suffix(".mp4")
+        await asyncio.to_thread(os.replace, output, target)
+        if target != path:
+            await asyncio.to_thread(path.unlink, True)
+        return target
+
+    def video_kbps(self, duration: int) -> int:
+        """Video bitrate cap so `duration` seconds plus audio stay under `max_bytes`."""
+        total_kbps = self.max_bytes * 8 * self.SIZE_MARGIN / duration / 1000
+        return int(total_kbps - self.audio_kbps)
+
+    def reason(self, size: int, codec: str | None) -> str | None:
+        """Why a file of `size` bytes with video `codec` needs transcoding; None if it does not."""
+        if size > self.max_bytes:
+            return f"{size} bytes"
+        if codec is None:
+            return "not an MP4"
+        if codec not in PLAYABLE_CODECS:
+            return f"codec {codec}"
+        return None
+
+    async def _reason(self, path: Path) -> str | None:
+        size = await asyncio.to_thread(os.path.getsize, path)
+        if size > self.max_bytes:
+            return self.reason(size, None)
+        try:
+            codec = await asyncio.to_thread(video_codec, path)
+        except (OSError, struct.error):
+            codec = None
+        return self.reason(size, codec)
+
+    def _args(self, source: Path, output: Path, video_kbps: int) -> list[str]:
+        return [
+            "-i",
+            str(source),
+            "-map",
+            "0:v:0",
+            "-map",
+            "0:a:0?",
+            "-c:v",
+            "libx264",
+            "-preset",
+            self.preset,
+            "-crf",
+            str(self.crf),
+            "-maxrate",
+            f"{video_kbps}k",
+            "-bufsize",
+            f"{video_kbps * 2}k",
+            "-vf",
+            "scale=trunc(iw/2)*2:trunc(ih/2)*2",
+            "-pix_fmt",
+            "yuv420p",
+            "-c:a",
+            "aac",
+            "-b:a",
+            f"{self.audio_kbps}k",
+            "-movflags",
+            "+faststart",
+            "-progress",
+            "pipe:1",
+            "-nostats",
+            "-f",
+            "mp4",
+            str(output),
+        ]
+
+    @staticmethod
+    def _progress_reader(path: Path, duration: int) -> Callable[[bytes], None]:
+        """Log ffmpeg ``-progress`` lines every 25% of `duration`."""
+        next_log = 0.25
+
+        def on_line(line: bytes) -> None:
+            nonlocal next_log
+            key, _, value = line.decode(errors="replace").strip().partition("=")
+            if key != "out_time_us" or not value.isdigit():
+                return
+            fraction = min(1.0, int(value) / (duration * 1_000_000))
+            if fraction >= next_log:
+                logging.info("Transcoding %s: %d%%", path.name, fraction * 100)
+                next_log = int(fraction * 4) / 4 + 0.25
+
+        return on_line
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from .exception import MediaProcessError, MediaTimeoutError
+
+
+@dataclass
+class WorkerPoolStats:
+    """Counters of a MediaWorkerPool; times are in seconds."""
+
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    wait_seconds: float = 0.0
+    run_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+
+class MediaWorkerPool:
+    """
+    Bounded pool of ffmpeg/ffprobe subprocesses.
+
+    At most `max_workers` processes run at once; further jobs wait in FIFO
+    order. A job running longer than its timeout is killed and raises
+    MediaTimeoutError, so a malformed file cannot hold a slot forever.
+    Queue depth, wait and run times are tracked in `stats`.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        timeout: float = 60,
+        ffmpeg_bin: str = "ffmpeg",
+        ffprobe_bin: str = "ffprobe",
+    ):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.ffmpeg_bin = ffmpeg_bin
+        self.ffprobe_bin = ffprobe_bin
+        self.stats = WorkerPoolStats()
+        self._slots = asyncio.Semaphore(max_workers)
+
+    async def run(
+        self,
+        args: list[str],
+        timeout: float | None = None,
+        on_line: Callable[[bytes], None] | None = None,
+    ) -> bytes:
+        """
+        Run a command in a worker slot and return its stdout.
+
+        With `on_line`, stdout is instead handed over line by line as it is
+        produced (e.g. ffmpeg ``-progress pipe:1``) and b"" is returned.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        queued_at = time.monotonic()
+        self.stats.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.stats.queued -= 1
+
+        waited = time.monotonic() - queued_at
+        self.stats.wait_seconds += waited
+        self.stats.max_wait_seconds = max(self.stats.max_wait_seconds, waited)
+        self.stats.running += 1
+        started = time.monotonic()
+        try:
+            return await self._execute(args, timeout, on_line)
+        finally:
+            elapsed = time.monotonic() - started
+            self.stats.running -= 1
+            self.stats.run_seconds += elapsed
+            self._slots.release()
+            logging.debug(
+                "%s finished: waited %.3fs, ran %.3fs", Path(args[0]).name, waited, elapsed
+            )
+
+    async def ffmpeg(
+        self,
+        *args: str,
+        timeout: float | None = None,
+        on_line: Callable[[bytes], None] | None = None,
+    ) -> bytes:
+        """Run ffmpeg with `args` (non-interactive, overwriting outputs)."""
+        return await self.run(
+            [self.ffmpeg_bin, "-nostdin", "-hide_banner", "-v", "error", "-y", *args],
+            timeout,
+            on_line,
+        )
+
+    async def probe(self, path: Path | str, timeout: float | None = None) -> dict:
+        """Return ffprobe's JSON description of `path`, like ``ffmpeg.probe``."""
+        output = await self.run(
+            [
+                self.ffprobe_bin,
+                "-v",
+                "error",
+                "-print_format",
+                "json",
+                "-show_format",
+                "-show_streams",
+                str(path),
+            ],
+            timeout,
+        )
+        return json.loads(output)
+
+    async def _execute(
+        self, args: list[str], timeout: float, on_line: Callable[[bytes], None] | None
+    ) -> bytes:
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+
+        async def read_stdout() -> bytes:
+            if on_line is None:
+                return await proc.stdout.read()
+            async for line in proc.stdout:
+                on_line(line)
+            return b""
+
+        async def communicate() -> tuple[bytes, bytes]:
+            stdout, stderr, _ = await asyncio.gather(read_stdout(), proc.stderr.read(), proc.wait())
+            return stdout, stderr
+
+        try:
+            stdout, stderr = await asyncio.wait_for(communicate(), timeout)
+        except TimeoutError:
+            self.stats.timed_out += 1
+            await self._kill(proc)
+            raise MediaTimeoutError(f"{Path(args[0]).name} timed out after {timeout}s") from None
+        except BaseException:
+            await self._kill(proc)
+            raise
+
+        if proc.returncode != 0:
+            self.stats.failed += 1
+            message = stderr.decode(errors="replace").strip()[-500:]
+            raise MediaProcessError(
+                f"{Path(args[0]).name} exited with {proc.returncode}: {message}"
+            )
+        self.stats.completed += 1
+        return stdout
+
+    @staticmethod
+    async def _kill(proc: asyncio.subprocess.Process) -> None:
+        if proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+            await proc.wait()
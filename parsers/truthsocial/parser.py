@@ -11,6 +11,7 @@ from core import (
     ParseError,
     Photo,
     Video,
+    VideoVariant,
 )
 from core import (
     Parser as BaseParser,
@@ -81,13 +82,7 @@ class Parser(BaseParser):
                         )
                     )
                 case "video" | "gifv":
-                    media.append(
-                        Video(
-                            resource_url=attachment["url"],
-                            mime_type="video/mp4",
-                            thumbnail_url=attachment.get("preview_url"),
-                        )
-                    )
+                    media.append(self._video(attachment))
 
         return Content(
             author=author,
@@ -98,6 +93,35 @@ class Parser(BaseParser):
             media=media,
         )
 
+    @staticmethod
+    def _video(attachment: dict) -> Video:
+        """
+        Video from a Mastodon-style attachment.
+
+        `meta.original` carries dimensions, duration and bitrate; the bitrate
+        lets an oversized video be rejected before it is downloaded.
+        """
+        original = (attachment.get("meta") or {}).get("original") or {}
+        duration = original.get("duration")
+        duration = round(duration) if duration else None
+        variants = [
+            VideoVariant(
+                url=attachment["url"],
+                bitrate=original.get("bitrate"),
+                width=original.get("width"),
+                height=original.get("height"),
+            )
+        ]
+        return Video(
+            resource_url=attachment["url"],
+            mime_type="video/mp4",
+            thumbnail_url=attachment.get("preview_url"),
+            width=original.get("width"),
+            height=original.get("height"),
+            duration=duration,
+            variants=variants,
+        )
+
     @staticmethod
     def format_counter(number):
         if number >= 1_000_000:
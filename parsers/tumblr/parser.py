@@ -1,3 +1,5 @@
+import html
+import json
 import re
 from datetime import UTC, datetime
 
@@ -26,7 +28,10 @@ class Parser(BaseParser):
 
     VIDEO_SOURCE_PATTERN = re.compile(r'<source\s+src="([^"]+)"\s+type="([^"]+)"')
     VIDEO_POSTER_PATTERN = re.compile(r'<video[^>]+poster="([^"]+)"')
-    IMG_PATTERN = re.compile(r'<img[^>]+src="([^"]+)"')
+    IMG_PATTERN = re.compile(r'<img[^>]+src="([^"]+)"[^>]*>')
+    ORIG_WIDTH_PATTERN = re.compile(r'data-orig-width="(\d+)"')
+    ORIG_HEIGHT_PATTERN = re.compile(r'data-orig-height="(\d+)"')
+    NPF_PATTERN = re.compile(r"data-npf='([^']+)'")
     HTML_TAGS_PATTERN = re.compile(r"<[^>]+>")
 
     MIME_GIF = "image/gif"
@@ -126,49 +131,105 @@ class Parser(BaseParser):
             original_size = photo.get("original_size", {})
             if url := original_size.get("url"):
                 thumb_url = photo.get("alt_sizes", [{}])[0].get("url")
-                media.append(self._create_media_object(url, thumb_url))
+                media.append(
+                    self._create_media_object(
+                        url,
+                        thumb_url,
+                        original_size.get("width"),
+                        original_size.get("height"),
+                    )
+                )
         return media
 
-    def _extract_videos_from_html(self, html: str) -> list:
+    def _extract_videos_from_html(self, body: str) -> list:
         media = []
-        video_matches = self.VIDEO_SOURCE_PATTERN.findall(html)
+        video_matches = list(self.VIDEO_SOURCE_PATTERN.finditer(body))
         if not video_matches:
             return media
 
-        poster_match = self.VIDEO_POSTER_PATTERN.search(html)
+        poster_match = self.VIDEO_POSTER_PATTERN.search(body)
         poster_url = poster_match.group(1) if poster_match else None
 
-        for video_url, mime_type in video_matches:
+        for match in video_matches:
+            video_url, mime_type = match.groups()
+            width, height = self._npf_dimensions(self._enclosing_figure(body, match.start()))
             media.append(
                 Video(
                     resource_url=video_url,
                     mime_type=mime_type,
                     thumbnail_url=poster_url,
-                    # todo: possible to set height, width
+                    width=width,
+                    height=height,
                 )
             )
         return media
 
-    def _extract_images_from_html(self, html: str) -> list:
+    def _extract_images_from_html(self, body: str) -> list:
         media = []
-        img_urls = self.IMG_PATTERN.findall(html)
 
         seen = set()
-        for img_url in img_urls:
+        for match in self.IMG_PATTERN.finditer(body):
+            img_url = match.group(1)
             if img_url not in seen:
                 seen.add(img_url)
-                media.append(self._create_media_object(img_url, img_url))
+                width = self.ORIG_WIDTH_PATTERN.search(match.group(0))
+                height = self.ORIG_HEIGHT_PATTERN.search(match.group(0))
+                media.append(
+                    self._create_media_object(
+                        img_url,
+                        img_url,
+                        int(width.group(1)) if width else None,
+                        int(height.group(1)) if height else None,
+                    )
+                )
         return media
 
-    def _create_media_object(self, resource_url: str, thumbnail_url: str) -> Photo | Video:
+    @staticmethod
+    def _enclosing_figure(body: str, pos: int) -> str:
+        """
+        The still open ``<figure`` element around `pos`, up to `pos`.
+
+        That figure carries the NPF block with the video size; an earlier
+        figure that is already closed belongs to other media.
+        """
+        start = body.rfind("<figure", 0, pos)
+        if start == -1 or "</figure>" in body[start:pos]:
+            return ""
+        return body[start:pos]
+
+    def _npf_dimensions(self, figure: str) -> tuple[int | None, int | None]:
+        match = self.NPF_PATTERN.search(figure)
+        if not match:
+            return None, None
+        try:
+            block = json.loads(html.unescape(match.group(1)))
+        except ValueError:
+            return None, None
+        video = block.get("media") if isinstance(block, dict) else None
+        if isinstance(video, list):
+            video = video[0] if video else None
+        if not isinstance(video, dict):
+            return None, None
+        return video.get("width"), video.get("height")
+
+    def _create_media_object(
+        self,
+        resource_url: str,
+        thumbnail_url: str,
+        width: int | None = None,
+        height: int | None = None,
+    ) -> Photo | Video:
         if resource_url.lower().endswith(".gif"):
             return Video(
                 resource_url=resource_url,
                 mime_type=self.MIME_GIF,
                 thumbnail_url=thumbnail_url,
-                # todo: possible to set height, width
+                width=width,
+                height=height,
             )
-        return Photo(resource_url=resource_url, thumbnail_url=thumbnail_url)
+        return Photo(
+            resource_url=resource_url, thumbnail_url=thumbnail_url, width=width, height=height
+        )
 
     @staticmethod
     def format_counter(number: int) -> str:
@@ -11,6 +11,7 @@ from core import (
     ParseError,
     Photo,
     Video,
+    VideoVariant,
 )
 from core import (
     Parser as BaseParser,
@@ -70,20 +71,29 @@ class Parser(BaseParser):
 
         media = []
         for item in tweet["media_extended"]:
+            size = item.get("size") or {}
             match item["type"]:
                 case "image" | "photo":
                     media.append(
                         Photo(
                             resource_url=item["url"],
                             thumbnail_url=item["thumbnail_url"],
+                            width=size.get("width"),
+                            height=size.get("height"),
                         )
                     )
                 case "video" | "gif":
+                    millis = item.get("duration_millis")
+                    variants = self._variants(item)
                     media.append(
                         Video(
-                            resource_url=item["url"],
+                            resource_url=variants[0].url if variants else item["url"],
                             mime_type="video/mp4",
                             thumbnail_url=item["thumbnail_url"],
+                            width=size.get("width"),
+                            height=size.get("height"),
+                            duration=round(millis / 1000) if millis is not None else None,
+                            variants=variants,
                         )
                     )
 
@@ -96,6 +106,16 @@ class Parser(BaseParser):
             media=media,
         )
 
+    @staticmethod
+    def _variants(item: dict) -> list[VideoVariant]:
+        """MP4 variants of a video, highest bitrate first; HLS playlists are skipped."""
+        variants = [
+            VideoVariant(url=v["url"], bitrate=v.get("bitrate"))
+            for v in item.get("variants") or []
+            if v.get("content_type") == "video/mp4" and v.get("url")
+        ]
+        return sorted(variants, key=lambda v: v.bitrate or 0, reverse=True)
+
     @staticmethod
     def format_counter(number):
         if number >= 1_000_000:
@@ -1,3 +1,12 @@
 MEDIA_GROUP_CHUNK_SIZE = 10
 INLINE_FILE_SIZE_LIMIT = 20 * 1024 * 1024
 DOWNLOAD_FILE_SIZE_LIMIT = 2 * 1024 * 1024 * 1024
+# Largest files the Bot API fetches by URL itself
+URL_PHOTO_SIZE_LIMIT = 5 * 1024 * 1024
+URL_FILE_SIZE_LIMIT = 20 * 1024 * 1024
+# Telegram keeps photos at most this many pixels on the longer side.
+PHOTO_MAX_SIDE = 2560
+# Telegram accepts at most 50 results per answerInlineQuery; a smaller first
+# page keeps the initial answer fast, later pages are fetched via next_offset.
+INLINE_QUERY_PAGE_SIZE = 10
+INLINE_QUERY_CONTENT_CACHE_SIZE = 128
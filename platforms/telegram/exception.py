@@ -2,3 +2,15 @@ class FactoryNotFoundError(Exception):
     """Exception raised when a factory is not found."""
 
     pass
+
+
+class UploadError(Exception):
+    """Exception raised when the Bot API rejects a streamed upload."""
+
+    pass
+
+
+class DeliveryRefusedError(RuntimeError):
+    """Exception raised when a delivery is refused because the bot is shutting down."""
+
+    pass
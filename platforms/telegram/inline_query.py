@@ -1,5 +1,6 @@
 import asyncio
 import logging
+from collections import OrderedDict
 from urllib.parse import urlparse
 
 from telegram import (
@@ -15,10 +16,11 @@ from telegram import (
 from telegram.constants import ParseMode
 
 from core import InvalidUrlError, Parser, ParserNotFoundError
-from core.domain.entity import Content, MediaType
+from core.domain.entity import Content, MediaType, Video
 from infra.analytics.analytics import Analytics, Event, Events
 from infra.files.exception import FileTooLargeError
 from infra.files.validator import RemoteFileValidator
+from platforms.telegram import INLINE_QUERY_CONTENT_CACHE_SIZE, INLINE_QUERY_PAGE_SIZE
 from platforms.telegram.i18n import t
 from platforms.telegram.renderer import MessageRenderer
 from shared.htmls import strip_tags
@@ -33,6 +35,7 @@ class InlineQueryHandler:
     Responsibilities:
     - Validate query text as a URL and parse it into Content.
     - Validate remote media sizes and assemble InlineQueryResult items (media + fallback article).
+    - Paginate media through next_offset; later pages reuse the parsed Content.
     - Answer the inline query and record analytics events.
 
     Side effects: returns inline results to Telegram; may omit media that exceed limits.
@@ -44,6 +47,8 @@ class InlineQueryHandler:
         renderer: MessageRenderer,
         file_validator: RemoteFileValidator,
         analytics: Analytics,
+        page_size: int = INLINE_QUERY_PAGE_SIZE,
+        cache_size: int = INLINE_QUERY_CONTENT_CACHE_SIZE,
     ):
         """
         Store parser, renderer, remote file validator and analytics references.
@@ -52,6 +57,9 @@ class InlineQueryHandler:
         self.renderer = renderer
         self.file_validator = file_validator
         self.analytics = analytics
+        self.page_size = page_size
+        self.cache_size = cache_size
+        self._content_cache: OrderedDict[str, Content] = OrderedDict()
 
     async def handle(self, update: Update, _) -> None:
         """
@@ -60,7 +68,8 @@ class InlineQueryHandler:
         Behavior notes:
         - Skips empty queries.
         - Returns a single error article on invalid URL, unsupported host, or exceptions.
-        - Always logs page views and exceptions to analytics; method returns None.
+        - Follow-up pages (non-empty offset) reuse cached Content and skip the page view.
+        - Logs page views and exceptions to analytics; method returns None.
         """
         inline_query = update.inline_query
         query = inline_query.query or ""
@@ -88,12 +97,17 @@ class InlineQueryHandler:
             return
 
         hostname = urlparse(query).netloc
+        offset = self._parse_offset(inline_query.offset)
         try:
             logging.info("Processing valid URL from hostname: %s", hostname)
-            events.add(Event("page_view").add("page_location", query))
-            content = await asyncio.to_thread(self.parser.parse, query)
-            logging.debug("Successfully parsed entity for query: %s", query)
-            await self._send_content(inline_query, content, locale)
+            content = self._content_cache.get(query) if offset else None
+            if content is None:
+                if not offset:
+                    events.add(Event("page_view").add("page_location", query))
+                content = await asyncio.to_thread(self.parser.parse, query)
+                logging.debug("Successfully parsed entity for query: %s", query)
+                self._remember_content(query, content)
+            await self._send_content(inline_query, content, locale, offset)
         except ParserNotFoundError as e:
             logging.warning("Parser not found for hostname: %s", hostname)
             events.add(
@@ -120,32 +134,47 @@ class InlineQueryHandler:
                 locale,
             )
         finally:
-            await self.analytics.log(events)
+            if events:
+                await self.analytics.log(events)
 
     async def _send_content(
-        self, inline_query: InlineQuery, content: Content, locale: str | None = None
+        self,
+        inline_query: InlineQuery,
+        content: Content,
+        locale: str | None = None,
+        offset: int = 0,
     ) -> None:
         """
-        Build and answer inline query results from parsed content.
+        Build and answer one page of inline query results from parsed content.
 
         Key points:
         - Use renderer to create visible text and description.
-        - Asynchronously validate remote media before including them.
-        - Add a fallback Article that sends the rendered message text.
-        - Answers the inline query (real-time, cache_time=0).
+        - Only the media of the requested page are validated and built; videos
+          use their best variant under the inline size limit.
+        - Add a fallback Article that sends the rendered message text (first page only).
+        - Answers the inline query (real-time, cache_time=0) with next_offset
+          pointing at the next page, or empty when no media remain.
         """
         text = self.renderer.render(content)
         raw_text = strip_tags(text)
 
         results = []
+        media_page = [
+            m.best_variant(self.file_validator.max_bytes) if isinstance(m, Video) else m
+            for m in (content.media or [])[offset : offset + self.page_size]
+        ]
+        next_offset = ""
+        if content.media and offset + self.page_size < len(content.media):
+            next_offset = str(offset + self.page_size)
 
-        if content.media and len(content.media) > 0:
+        if media_page:
             result = None
+            caption = self.renderer.render_with_link(content, max_length=1024)
 
-            validate_tasks = [asyncio.create_task(self._validate_media(m)) for m in content.media]
+            validate_tasks = [asyncio.create_task(self._validate_media(m)) for m in media_page]
             allowed_flags = await asyncio.gather(*validate_tasks)
 
-            allowed_media = [m for m, ok in zip(content.media, allowed_flags) if ok]
+            allowed_media = [m for m, ok in zip(media_page, allowed_flags) if ok]
 
             for media in allowed_media:
                 # Fields shared across all inline result types
@@ -154,7 +183,7 @@ class InlineQueryHandler:
                     "title": t("send_media", locale).replace(
                         "{type}", t(f"media_label_{media.type().value}", locale)
                     ),
-                    "caption": self.renderer.render_with_link(content, max_length=1024),
+                    "caption": caption,
                     "parse_mode": ParseMode.HTML,
                 }
 
@@ -186,7 +215,7 @@ class InlineQueryHandler:
 
                 results.append(result)
 
-        if content.text or 0 == len(results):
+        if not offset and (content.text or not results):
             results.insert(
                 0,
                 InlineQueryResultArticle(
@@ -201,7 +230,21 @@ class InlineQueryHandler:
                 ),
             )
 
-        await inline_query.answer(results, cache_time=0)
+        await inline_query.answer(results, cache_time=0, next_offset=next_offset)
+
+    def _remember_content(self, query: str, content: Content) -> None:
+        """Keep parsed Content for follow-up pages, evicting the oldest entries."""
+        self._content_cache[query] = content
+        self._content_cache.move_to_end(query)
+        while len(self._content_cache) > self.cache_size:
+            self._content_cache.popitem(last=False)
+
+    @staticmethod
+    def _parse_offset(offset) -> int:
+        """Telegram sends back our own next_offset; anything else means the first page."""
+        if isinstance(offset, str) and offset.isdigit():
+            return int(offset)
+        return 0
 
     @staticmethod
     async def _send_error(
@@ -239,9 +282,15 @@ class InlineQueryHandler:
         """
         Check if a remote media item is acceptable for inline results.
 
-        Returns True if size checks pass; False for known oversize.
+        Returns True if size checks pass; False for known oversize. The size
+        of a chosen video variant is checked locally instead of remotely.
         On unexpected validation errors, returns True to avoid losing content.
         """
+        if isinstance(media, Video) and media.size is not None:
+            if media.size > self.file_validator.max_bytes:
+                logging.info("Media skipped due to size limit: %s", media.resource_url)
+                return False
+            return True
         try:
             await self.file_validator.validate_size(media.resource_url)
             return True
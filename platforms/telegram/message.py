@@ -1,6 +1,8 @@
 import asyncio
 import logging
+import time
 from io import BufferedReader
+from pathlib import Path
 from urllib.parse import urlparse
 
 from telegram import (
@@ -11,16 +13,32 @@ from telegram import (
     Update,
 )
 from telegram.constants import ChatAction, ChatType, ParseMode
+from telegram.error import BadRequest
 from telegram.ext import ContextTypes
 
 from core.domain.entity import GIF, Entity, FileInfo, Photo, PipelineResult, Video, VideoMeta
 from core.exceptions import InvalidUrlError, ParserNotFoundError
 from core.pipeline import Pipeline
+from core.ports import FileResolver
 from core.ports.delivery import Delivery
 from infra.analytics.analytics import Analytics, Event, Events
+from infra.files.bandwidth import download_owner
 from platforms.telegram import MEDIA_GROUP_CHUNK_SIZE
+from platforms.telegram.exception import DeliveryRefusedError
 from platforms.telegram.i18n import t
 from platforms.telegram.renderer import MessageRenderer
+from platforms.telegram.scheduler import SendScheduler
+from platforms.telegram.tasks import DeliveryTasks
+from platforms.telegram.updates import UpdateProcessorStats
+from platforms.telegram.upload import StreamingUploader
+
+# BadRequest messages meaning Telegram could not fetch a media URL itself.
+URL_FETCH_ERRORS = ("failed to get http url content", "wrong file identifier/http url")
+
+
+def _url_fetch_failed(error: BadRequest) -> bool:
+    message = error.message.lower()
+    return any(text in message for text in URL_FETCH_ERRORS)
 
 
 def _log_task_exception(task: asyncio.Task) -> None:
@@ -32,33 +50,67 @@ class TelegramDelivery(Delivery):
     """
     Send PipelineResult to Telegram: render caption, open files, separate
     GIFs from photo/video, chunk into media groups, and call the transport.
+
+    Passthrough videos (FileInfo.stream) cannot go through python-telegram-bot,
+    which buffers uploads, so they are sent one by one via `uploader`.
+
+    Animations that are MP4 files (e.g. GIFs converted by the pipeline) join
+    the media groups as silent videos whenever there is something to group
+    them with; a lone animation is still sent with `reply_animation`.
+
+    Remote files (FileInfo.remote) are sent by URL for Telegram to fetch. If
+    Telegram fails to fetch one of a media group, the remote files are
+    downloaded with `resolver` and the group is uploaded again, unless none
+    of them could be downloaded. Other rejections are not retried.
+
+    In `local_mode` (a self-hosted Bot API server sharing our filesystem),
+    files on disk are passed as ``file://`` paths rather than uploaded, so
+    the server reads them in place.
+
+    With a `scheduler`, every Bot API call is paced by it: text replies take
+    priority over uploads and flood waits (RetryAfter) are retried.
     """
 
     def __init__(
         self,
         renderer: MessageRenderer,
         chunk_size: int = MEDIA_GROUP_CHUNK_SIZE,
+        uploader: StreamingUploader | None = None,
+        resolver: FileResolver | None = None,
+        local_mode: bool = False,
+        scheduler: SendScheduler | None = None,
     ):
         self.renderer = renderer
         self.chunk_size = chunk_size
+        self.uploader = uploader
+        self.resolver = resolver
+        self.local_mode = local_mode
+        self.scheduler = scheduler
 
     async def send(self, target, result: PipelineResult) -> None:
         kwargs = {"parse_mode": ParseMode.HTML, "do_quote": True}
-        text = self.renderer.render_with_link(result.content)
-        media_caption = self.renderer.render_with_link(result.content, max_length=1024)
-
-        if not result.resolved_media:
-            await target.reply_text(text, disable_web_page_preview=True, **kwargs)
-            return
-
         all_files_to_close = []
         all_files_to_remove = []
+        streamed = [(m, fi) for m, fi in result.resolved_media if fi.stream is not None]
+        local = [(m, fi) for m, fi in result.resolved_media if fi.stream is None]
+        groupable = sum(
+            isinstance(m, (Photo, Video)) or self._is_mp4_animation(m, fi) for m, fi in local
+        )
 
         try:
+            text = self.renderer.render_with_link(result.content)
+            media_caption = self.renderer.render_with_link(result.content, max_length=1024)
+
+            if not result.resolved_media:
+                await self._reply_text(target, text, kwargs)
+                return
+
             prepared = await asyncio.gather(
                 *[
-                    self._prepare_media(media, fi, result.video_meta)
-                    for media, fi in result.resolved_media
+                    self._prepare_media(
+                        media, fi, result.video_meta, group_animations=groupable > 1
+                    )
+                    for media, fi in local
                 ],
                 return_exceptions=True,
             )
@@ -66,7 +118,7 @@ class TelegramDelivery(Delivery):
             regular_media = []
             gif_inputs = []
 
-            for item in prepared:
+            for (media, fi), item in zip(local, prepared):
                 if isinstance(item, Exception):
                     logging.warning("Failed to prepare media: %s", item)
                     continue
@@ -78,10 +130,14 @@ class TelegramDelivery(Delivery):
                 if isinstance(media_input, InputMediaAnimation):
                     gif_inputs.append(media_input)
                 else:
-                    regular_media.append(media_input)
+                    regular_media.append((media_input, media, fi))
+
+            if streamed and self.uploader is None:
+                logging.warning("No streaming uploader, skipping %d videos", len(streamed))
+                streamed = []
 
-            if not regular_media and not gif_inputs:
-                await target.reply_text(text, disable_web_page_preview=True, **kwargs)
+            if not regular_media and not streamed and not gif_inputs:
+                await self._reply_text(target, text, kwargs)
                 return
 
             caption_sent = False
@@ -89,26 +145,63 @@ class TelegramDelivery(Delivery):
             for i in range(0, len(regular_media), self.chunk_size):
                 chunk = regular_media[i : i + self.chunk_size]
                 is_last_regular = i + self.chunk_size >= len(regular_media)
-                use_caption = is_last_regular and not gif_inputs
+                use_caption = is_last_regular and not streamed and not gif_inputs
+                caption = media_caption if use_caption else None
                 try:
-                    await target.reply_media_group(
-                        chunk,
-                        caption=media_caption if use_caption else None,
-                        **kwargs,
-                    )
+                    try:
+                        await self._send_group(target, chunk, caption, kwargs)
+                    except BadRequest as e:
+                        if (
+                            self.resolver is None
+                            or not any(fi.remote for *_, fi in chunk)
+                            or not _url_fetch_failed(e)
+                        ):
+                            raise
+                        logging.info("Telegram rejected media URLs (%s), uploading instead", e)
+                        chunk = await self._download_remote(
+                            chunk, result.video_meta, all_files_to_close, all_files_to_remove
+                        )
+                        if not chunk:
+                            raise
+                        await self._send_group(target, chunk, caption, kwargs)
                     if use_caption:
                         caption_sent = True
                 except Exception as e:
                     logging.error("Failed to send media chunk: %s", e)
 
+            for idx, (media, fi) in enumerate(streamed):
+                use_caption = idx == len(streamed) - 1 and not gif_inputs
+                try:
+                    # The stream is consumed by the first attempt and cannot be resent.
+                    await self._call(
+                        target,
+                        lambda: self.uploader.send_video(
+                            target.chat_id,
+                            target.message_id,
+                            fi.stream,
+                            fi.path.name,
+                            meta=result.video_meta.get(media.resource_url) or fi.video_meta,
+                            caption=media_caption if use_caption else None,
+                            parse_mode=ParseMode.HTML,
+                        ),
+                        retries=0,
+                    )
+                    if use_caption:
+                        caption_sent = True
+                except Exception as e:
+                    logging.error("Failed to stream video: %s", e)
+
             for idx, gif_input in enumerate(gif_inputs):
                 is_last_gif = idx == len(gif_inputs) - 1
                 use_caption = is_last_gif and not caption_sent
                 try:
-                    await target.reply_animation(
-                        gif_input.media,
-                        caption=media_caption if use_caption else None,
-                        **kwargs,
+                    await self._call(
+                        target,
+                        lambda: target.reply_animation(
+                            gif_input.media,
+                            caption=media_caption if use_caption else None,
+                            **kwargs,
+                        ),
                     )
                     if use_caption:
                         caption_sent = True
@@ -116,6 +209,10 @@ class TelegramDelivery(Delivery):
                     logging.error("Failed to send GIF: %s", e)
 
         finally:
+            for _, fi in result.resolved_media:
+                if fi.stream is not None:
+                    await fi.stream.close()
+
             for fh in all_files_to_close:
                 try:
                     await asyncio.to_thread(fh.close)
@@ -129,30 +226,108 @@ class TelegramDelivery(Delivery):
                 except Exception as e:
                     logging.exception("Failed to remove file %s: %s", path, e)
 
+    async def _call(
+        self,
+        target,
+        call,
+        priority: int = SendScheduler.UPLOAD,
+        retries: int | None = None,
+    ) -> None:
+        """Run a Bot API call for `target`'s chat, through the scheduler if there is one."""
+        if self.scheduler is None:
+            await call()
+        else:
+            await self.scheduler.run(target.chat_id, call, priority, retries)
+
+    async def _reply_text(self, target, text: str, kwargs: dict) -> None:
+        await self._call(
+            target,
+            lambda: target.reply_text(text, disable_web_page_preview=True, **kwargs),
+            SendScheduler.TEXT,
+        )
+
+    async def _send_group(
+        self,
+        target,
+        chunk: list[tuple[InputMedia, Entity, FileInfo]],
+        caption: str | None,
+        kwargs: dict,
+    ) -> None:
+        media = [c[0] for c in chunk]
+        await self._call(target, lambda: target.reply_media_group(media, caption=caption, **kwargs))
+
+    async def _download_remote(
+        self,
+        chunk: list[tuple[InputMedia, Entity, FileInfo]],
+        video_meta: dict[str, VideoMeta],
+        files_to_close: list[BufferedReader],
+        files_to_remove: list[Path],
+    ) -> list[tuple[InputMedia, Entity, FileInfo]]:
+        """Replace the remote items of a media group with downloaded files."""
+
+        async def download(item):
+            media_input, media, fi = item
+            if not fi.remote:
+                return item
+            fi = await self.resolver.resolve(fi.original_url, buffered=isinstance(media, Photo))
+            media_input, to_close, to_remove = await self._prepare_media(media, fi, video_meta)
+            files_to_close.extend(to_close)
+            files_to_remove.extend(to_remove)
+            return media_input, media, fi
+
+        downloaded = await asyncio.gather(
+            *[download(item) for item in chunk], return_exceptions=True
+        )
+        items = []
+        for item in downloaded:
+            if isinstance(item, Exception):
+                logging.warning("Failed to download media for upload: %s", item)
+                continue
+            items.append(item)
+        return items
+
     async def _prepare_media(
         self,
         media: Entity,
         file_info: FileInfo,
         video_meta: dict[str, VideoMeta],
-    ) -> tuple[InputMedia, list[BufferedReader], list] | None:
+        group_animations: bool = False,
+    ) -> tuple[InputMedia, list[BufferedReader], list[Path]] | None:
         files_to_close = []
         files_to_remove = []
 
-        file_handler = await asyncio.to_thread(lambda: open(file_info.path, "rb"))
-        files_to_close.append(file_handler)
-        files_to_remove.append(file_info.path)
+        if file_info.remote:
+            # Telegram fetches the URL itself.
+            file_handler = file_info.original_url
+        elif file_info.data is not None:
+            # Kept in memory by the resolver: upload straight from the buffer.
+            file_handler = file_info.data
+        elif self.local_mode:
+            # python-telegram-bot turns a path into a file:// URI for InputMedia.
+            file_handler = file_info.path.absolute()
+            files_to_remove.append(file_info.path)
+        else:
+            file_handler = await asyncio.to_thread(lambda: open(file_info.path, "rb"))
+            files_to_close.append(file_handler)
+            files_to_remove.append(file_info.path)
 
         if isinstance(media, Photo):
-            return InputMediaPhoto(file_handler), files_to_close, files_to_remove
+            return (
+                InputMediaPhoto(file_handler, filename=file_info.path.name),
+                files_to_close,
+                files_to_remove,
+            )
 
-        if isinstance(media, GIF):
+        if isinstance(media, GIF) and not (
+            group_animations and self._is_mp4_animation(media, file_info)
+        ):
             return (
                 InputMediaAnimation(file_handler),
                 files_to_close,
                 files_to_remove,
             )
 
-        if isinstance(media, Video):
+        if isinstance(media, (Video, GIF)):
             meta = video_meta.get(media.resource_url)
             return (
                 InputMediaVideo(
@@ -169,11 +344,24 @@ class TelegramDelivery(Delivery):
 
         return None
 
+    @staticmethod
+    def _is_mp4_animation(media: Entity, file_info: FileInfo) -> bool:
+        return isinstance(media, GIF) and (file_info.mime_type or media.mime_type) == "video/mp4"
+
 
 class MessageHandler:
     """
     Handle private Telegram messages: validate, run neutral pipeline,
     and dispatch result to TelegramDelivery.
+
+    Deliveries run in the background; with `tasks` they are tracked and
+    capped, and `handle` waits for a free slot before returning. Their wait
+    and the number in flight are logged to analytics with each message, and
+    a delivery refused during shutdown is discarded without a reply. Given
+    the `updates` stats of the update processor, the number of updates
+    running and waiting is logged as well. With a
+    `scheduler`, the typing action and error replies are paced by it at text
+    priority, like the delivery's own calls.
     """
 
     def __init__(
@@ -182,11 +370,17 @@ class MessageHandler:
         delivery: Delivery,
         analytics: Analytics,
         platform: str = "telegram",
+        tasks: DeliveryTasks | None = None,
+        scheduler: SendScheduler | None = None,
+        updates: UpdateProcessorStats | None = None,
     ):
         self.pipeline = pipeline
         self.delivery = delivery
         self.analytics = analytics
         self.platform = platform
+        self.tasks = tasks
+        self.scheduler = scheduler
+        self.updates = updates
 
     async def handle(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         message = update.message
@@ -202,22 +396,51 @@ class MessageHandler:
 
         locale = update.effective_user.language_code if update.effective_user else None
         events = Events(message.from_user.id, self.platform, "message")
+        if self.updates is not None:
+            events.add(
+                Event("updates")
+                .add("running", self.updates.running)
+                .add("waiting", self.updates.waiting)
+            )
 
-        asyncio.create_task(
-            context.bot.send_chat_action(update.effective_chat.id, ChatAction.TYPING)
+        chat_id = update.effective_chat.id
+        # Only worth showing now; a flood wait is not retried.
+        typing = asyncio.create_task(
+            self._call(
+                chat_id,
+                lambda: context.bot.send_chat_action(chat_id, ChatAction.TYPING),
+                retries=0,
+            )
         )
+        typing.add_done_callback(_log_task_exception)
 
         kwargs = {"parse_mode": ParseMode.HTML, "do_quote": True}
 
+        owner_token = download_owner.set(message.from_user.id)
         try:
             result = await self.pipeline.run(text)
             events.add(Event("page_view").add("page_location", text))
-            task = asyncio.create_task(self.delivery.send(message, result))
-            task.add_done_callback(_log_task_exception)
+            if self.tasks is not None:
+                queued_at = time.monotonic()
+                await self.tasks.spawn(
+                    self.delivery.send(message, result), lambda: self.delivery.discard(result)
+                )
+                events.add(
+                    Event("delivery")
+                    .add("wait_msec", round((time.monotonic() - queued_at) * 1000))
+                    .add("in_flight", self.tasks.stats.in_flight)
+                    .add("waiting", self.tasks.stats.waiting)
+                )
+            else:
+                task = asyncio.create_task(self.delivery.send(message, result))
+                task.add_done_callback(_log_task_exception)
+        except DeliveryRefusedError:
+            # Shutting down; the files were released and no reply is due.
+            logging.info("Dropped delivery during shutdown: %s", text)
         except InvalidUrlError as e:
             logging.warning("Invalid URL received: %s", text)
             events.add(Event("exception").add("description", str(e)).add("type", type(e).__name__))
-            await message.reply_text(t("invalid_url_reply", locale), **kwargs)
+            await self._reply_text(message, t("invalid_url_reply", locale), kwargs)
         except ParserNotFoundError as e:
             hostname = urlparse(text).netloc
             logging.warning("Parser not found for hostname: %s", hostname)
@@ -227,10 +450,22 @@ class MessageHandler:
                 .add("type", type(e).__name__)
                 .add("hostname", hostname)
             )
-            await message.reply_text(t("no_parser_reply", locale), **kwargs)
+            await self._reply_text(message, t("no_parser_reply", locale), kwargs)
         except Exception as e:
             logging.error("Exception while processing text: %s", text, exc_info=True)
             events.add(Event("exception").add("description", str(e)).add("type", type(e).__name__))
-            await message.reply_text(t("exception_reply", locale), **kwargs)
+            await self._reply_text(message, t("exception_reply", locale), kwargs)
+        finally:
+            download_owner.reset(owner_token)
 
         await self.analytics.log(events)
+
+    async def _call(self, chat_id: int, call, retries: int | None = None) -> None:
+        """Run a Bot API call for `chat_id` at text priority, through the scheduler if any."""
+        if self.scheduler is None:
+            await call()
+        else:
+            await self.scheduler.run(chat_id, call, SendScheduler.TEXT, retries)
+
+    async def _reply_text(self, message, text: str, kwargs: dict) -> None:
+        await self._call(message.chat_id, lambda: message.reply_text(text, **kwargs))
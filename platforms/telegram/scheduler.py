@@ -0,0 +1,161 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import warnings
+from collections.abc import Awaitable, Callable, Hashable
+from datetime import timedelta
+from typing import TypeVar
+
+from telegram.error import RetryAfter
+from telegram.warnings import PTBDeprecationWarning
+
+T = TypeVar("T")
+
+
+class _TokenBucket:
+    """Refilling budget of calls; `paused_until` holds it empty after a flood wait."""
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+        self.paused_until = 0.0
+
+    def ready_at(self, now: float) -> float:
+        """Earliest monotonic time a call can be taken from the bucket."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        ready = now if self.tokens >= 1 else now + (1 - self.tokens) / self.rate
+        return max(ready, self.paused_until)
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def idle(self, now: float) -> bool:
+        """Whether the bucket has refilled completely and is not paused."""
+        self.ready_at(now)
+        return self.tokens >= self.burst and self.paused_until <= now
+
+
+class SendScheduler:
+    """
+    Pace outbound Bot API calls to stay within Telegram's flood limits.
+
+    Token buckets cap the aggregate rate at `rate` calls/s and every chat at
+    `chat_rate` calls/s with bursts of `chat_burst`. Waiting calls are granted
+    by priority — short text replies (TEXT) ahead of media uploads (UPLOAD) —
+    and then in arrival order; a chat that is out of budget does not hold up
+    the others. A RetryAfter from Telegram pauses the chat for the requested
+    time and the call is queued again, up to `max_retries` times.
+    """
+
+    TEXT = 0
+    UPLOAD = 1
+
+    def __init__(
+        self,
+        rate: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: int = 3,
+        max_retries: int = 3,
+    ):
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self._global = _TokenBucket(rate, rate, time.monotonic())
+        self._chats: dict[Hashable, _TokenBucket] = {}
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._wake_at: float | None = None
+
+    async def run(
+        self,
+        chat_id: Hashable,
+        call: Callable[[], Awaitable[T]],
+        priority: int = UPLOAD,
+        retries: int | None = None,
+    ) -> T:
+        """
+        Await `call()` once the limits allow a call to `chat_id`.
+
+        `retries` overrides `max_retries`; pass 0 for calls that cannot be
+        repeated (e.g. a streamed upload) — the chat is still paused.
+        """
+        retries = self.max_retries if retries is None else retries
+        while True:
+            await self._acquire(chat_id, priority)
+            try:
+                return await call()
+            except RetryAfter as e:
+                delay = _retry_seconds(e)
+                self.pause(chat_id, delay)
+                if retries <= 0:
+                    raise
+                retries -= 1
+                logging.warning("Flood limit for chat %s, retrying in %.0fs", chat_id, delay)
+
+    def pause(self, chat_id: Hashable, seconds: float) -> None:
+        """Hold back calls to `chat_id` for `seconds`."""
+        now = time.monotonic()
+        bucket = self._bucket(chat_id, now)
+        bucket.paused_until = max(bucket.paused_until, now + seconds)
+
+    async def _acquire(self, chat_id: Hashable, priority: int) -> None:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (priority, next(self._seq), chat_id, future))
+        self._dispatch()
+        await future
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        waiting = []
+        wake_at = None
+        while self._heap:
+            item = heapq.heappop(self._heap)
+            chat_id, future = item[2], item[3]
+            if future.done():
+                continue
+            chat = self._bucket(chat_id, now)
+            ready = max(chat.ready_at(now), self._global.ready_at(now))
+            if ready <= now:
+                chat.take()
+                self._global.take()
+                future.set_result(None)
+            else:
+                waiting.append(item)
+                wake_at = ready if wake_at is None else min(wake_at, ready)
+        for item in waiting:
+            heapq.heappush(self._heap, item)
+
+        # Chats that refilled completely behave like new ones; forget them.
+        queued = {item[2] for item in waiting}
+        for chat_id in [c for c, b in self._chats.items() if c not in queued and b.idle(now)]:
+            del self._chats[chat_id]
+
+        if wake_at is not None and (self._wake_at is None or wake_at < self._wake_at):
+            if self._timer is not None:
+                self._timer.cancel()
+            self._wake_at = wake_at
+            self._timer = asyncio.get_running_loop().call_later(wake_at - now, self._wake)
+
+    def _wake(self) -> None:
+        self._timer = self._wake_at = None
+        self._dispatch()
+
+    def _bucket(self, chat_id: Hashable, now: float) -> _TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = _TokenBucket(self.chat_rate, self.chat_burst, now)
+        return bucket
+
+
+def _retry_seconds(error: RetryAfter) -> float:
+    with warnings.catch_warnings():
+        # Reading retry_after as int is deprecated in favour of timedelta.
+        warnings.simplefilter("ignore", PTBDeprecationWarning)
+        delay = error.retry_after
+    return delay.total_seconds() if isinstance(delay, timedelta) else float(delay)
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Coroutine
+from dataclasses import dataclass
+from typing import NoReturn
+
+from platforms.telegram.exception import DeliveryRefusedError
+
+Discard = Callable[[], Awaitable[None]]
+
+
+@dataclass
+class DeliveryStats:
+    """Counters of a DeliveryTasks registry; times are in seconds."""
+
+    waiting: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    completed: int = 0
+    failed: int = 0
+    cancelled: int = 0
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+
+class DeliveryTasks:
+    """
+    Registry of background deliveries with a concurrency cap.
+
+    `spawn` waits while `max_running` deliveries are in flight, which holds
+    back the update handler that produced them, and then runs the coroutine
+    as a tracked task. On shutdown `drain` waits for the tasks and cancels
+    whatever is left after its timeout, so their cleanup (closing and removing
+    temporary files) still runs. A delivery that never gets to run, or is
+    cancelled, is handed to its `discard` callback instead. In-flight and
+    waiting counts, outcomes and wait times are tracked in `stats`.
+    """
+
+    def __init__(self, max_running: int = 8):
+        self.max_running = max_running
+        self.stats = DeliveryStats()
+        self._slots = asyncio.Semaphore(max_running)
+        # task -> its discard callback
+        self._tasks: dict[asyncio.Task, Discard | None] = {}
+        self._closed = False
+
+    async def spawn(self, coro: Coroutine, discard: Discard | None = None) -> asyncio.Task:
+        """
+        Start `coro` once a slot is free.
+
+        Raises DeliveryRefusedError after `drain` began. `discard` releases
+        what the delivery holds; it is awaited when the delivery is refused,
+        given up while waiting, or cancelled.
+        """
+        if self._closed:
+            await self._refuse(coro, discard)
+
+        queued_at = time.monotonic()
+        self.stats.waiting += 1
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            coro.close()
+            await self._discard(discard)
+            raise
+        finally:
+            self.stats.waiting -= 1
+        if self._closed:
+            self._slots.release()
+            await self._refuse(coro, discard)
+
+        waited = time.monotonic() - queued_at
+        self.stats.wait_seconds += waited
+        self.stats.max_wait_seconds = max(self.stats.max_wait_seconds, waited)
+        if waited >= 1:
+            logging.info("Delivery waited %.1fs for one of %d slots", waited, self.max_running)
+
+        task = asyncio.create_task(coro)
+        self._tasks[task] = discard
+        self.stats.in_flight += 1
+        self.stats.max_in_flight = max(self.stats.max_in_flight, self.stats.in_flight)
+        task.add_done_callback(self._done)
+        return task
+
+    async def drain(self, timeout: float) -> None:
+        """Refuse new deliveries, wait up to `timeout` seconds and cancel what is left."""
+        self._closed = True
+        if not self._tasks:
+            return
+
+        logging.info("Waiting up to %.0fs for %d deliveries", timeout, len(self._tasks))
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        if pending:
+            logging.warning("Cancelling %d deliveries still running at shutdown", len(pending))
+            # A task cancelled before its first step never runs its own cleanup.
+            discards = [self._tasks.get(task) for task in pending]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for discard in discards:
+                await self._discard(discard)
+        logging.info("Deliveries drained: %s", self.stats)
+
+    async def _refuse(self, coro: Coroutine, discard: Discard | None) -> NoReturn:
+        coro.close()
+        await self._discard(discard)
+        raise DeliveryRefusedError("Delivery tasks are shutting down")
+
+    @staticmethod
+    async def _discard(discard: Discard | None) -> None:
+        if discard is None:
+            return
+        try:
+            await discard()
+        except Exception:
+            logging.exception("Failed to discard a delivery")
+
+    def _done(self, task: asyncio.Task) -> None:
+        self._tasks.pop(task, None)
+        self._slots.release()
+        self.stats.in_flight -= 1
+        if task.cancelled():
+            self.stats.cancelled += 1
+        elif exc := task.exception():
+            self.stats.failed += 1
+            logging.error("Background send task failed", exc_info=exc)
+        else:
+            self.stats.completed += 1
@@ -0,0 +1,88 @@
+import asyncio
+import contextlib
+import logging
+import sys
+from collections.abc import AsyncIterator, Awaitable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+@dataclass
+class UpdateProcessorStats:
+    """Counters of a ChatOrderedUpdateProcessor."""
+
+    limit: int = 0
+    running: int = 0
+    waiting: int = 0
+    max_running: int = 0
+    processed: int = 0
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Process up to `max_concurrent_updates` updates at once, one chat at a time.
+
+    Updates from different chats run in parallel, while those from the same
+    chat wait for each other and run in arrival order, so a user's messages
+    are answered in the order they were sent. Updates without a chat (e.g.
+    inline queries) are never held back by others. An update takes one of
+    the slots only once it holds its chat, so a burst from one chat cannot
+    starve the rest. The limit, running and waiting updates are tracked in
+    `stats`.
+    """
+
+    __slots__ = ("_chats", "_slots", "limit", "stats")
+
+    def __init__(self, max_concurrent_updates: int):
+        # The base class takes its slot before do_process_update and so before
+        # the chat; its bound is made non-binding and the limit applied here.
+        super().__init__(sys.maxsize)
+        self.limit = max_concurrent_updates
+        self.stats = UpdateProcessorStats(limit=max_concurrent_updates)
+        self._slots = asyncio.Semaphore(max_concurrent_updates)
+        # chat id -> (lock, number of updates holding or waiting for it)
+        self._chats: dict[Hashable, tuple[asyncio.Lock, int]] = {}
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        chat = update.effective_chat if isinstance(update, Update) else None
+        async with contextlib.AsyncExitStack() as stack:
+            self.stats.waiting += 1
+            try:
+                if chat is not None:
+                    await stack.enter_async_context(self._chat_lock(chat.id))
+                await stack.enter_async_context(self._slots)
+            finally:
+                self.stats.waiting -= 1
+
+            self.stats.running += 1
+            self.stats.max_running = max(self.stats.max_running, self.stats.running)
+            try:
+                await coroutine
+            finally:
+                self.stats.running -= 1
+                self.stats.processed += 1
+
+    @contextlib.asynccontextmanager
+    async def _chat_lock(self, chat_id: Hashable) -> AsyncIterator[None]:
+        lock, users = self._chats.get(chat_id, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._chats[chat_id] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._chats[chat_id]
+            if users > 1:
+                self._chats[chat_id] = (lock, users - 1)
+            else:
+                del self._chats[chat_id]
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        logging.info("Update processing stats: %s", self.stats)
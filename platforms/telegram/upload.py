@@ -0,0 +1,81 @@
+import json
+import logging
+
+import aiohttp
+from telegram.error import RetryAfter
+
+from core.domain.entity import ByteStream, VideoMeta
+from infra.http.session import SharedSession, open_session
+from platforms.telegram.exception import UploadError
+
+DEFAULT_BASE_URL = "https://api.telegram.org/bot"
+
+
+class StreamingUploader:
+    """
+    Upload a ByteStream to the Bot API as a chunked multipart request.
+
+    python-telegram-bot reads file objects fully into memory before sending,
+    so passthrough media are posted directly, chunk by chunk, while they are
+    still being downloaded.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        base_url: str | None = None,
+        session: SharedSession | None = None,
+        timeout: int = 3600,
+    ):
+        self.endpoint = f"{base_url or DEFAULT_BASE_URL}{token}"
+        self.session = session
+        self.timeout = timeout
+
+    async def send_video(
+        self,
+        chat_id: int,
+        reply_to_message_id: int | None,
+        stream: ByteStream,
+        filename: str,
+        meta: VideoMeta | None = None,
+        caption: str | None = None,
+        parse_mode: str | None = None,
+    ) -> None:
+        """
+        Send `stream` as a video reply.
+
+        Raises RetryAfter on flood limits and UploadError if the Bot API refuses it.
+        """
+        form = aiohttp.FormData()
+        form.add_field("chat_id", str(chat_id))
+        if reply_to_message_id is not None:
+            form.add_field("reply_parameters", json.dumps({"message_id": reply_to_message_id}))
+        if caption:
+            form.add_field("caption", caption)
+            if parse_mode:
+                form.add_field("parse_mode", parse_mode)
+        form.add_field("supports_streaming", "true")
+        if meta:
+            for name in ("width", "height", "duration"):
+                if (value := getattr(meta, name)) is not None:
+                    form.add_field(name, str(value))
+        form.add_field(
+            "video",
+            stream.__aiter__(),
+            filename=filename,
+            content_type=stream.mime_type or "video/mp4",
+        )
+
+        logging.debug("Streaming %s to Telegram chat %s", filename, chat_id)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with open_session(self.session) as session:
+            async with session.post(
+                f"{self.endpoint}/sendVideo", data=form, timeout=timeout
+            ) as resp:
+                payload = await resp.json(content_type=None)
+
+        if not payload.get("ok"):
+            retry_after = (payload.get("parameters") or {}).get("retry_after")
+            if retry_after is not None:
+                raise RetryAfter(retry_after)
+            raise UploadError(payload.get("description") or f"HTTP {resp.status}")
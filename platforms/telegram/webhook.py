@@ -0,0 +1,107 @@
+import asyncio
+import hmac
+import logging
+import signal
+from urllib.parse import urlparse
+
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookServer:
+    """
+    Receive updates pushed by Telegram on an embedded aiohttp server.
+
+    Telegram is told to POST updates to `url` with `secret_token` in the
+    X-Telegram-Bot-Api-Secret-Token header; requests without it are refused
+    with 403 and bodies that are not an update with 400. An accepted update
+    is only queued for the application and acknowledged with 200 straight
+    away, so a slow handler never makes Telegram retry or back off. The
+    server listens on `listen`:`port` at the path of `url`; TLS is left to a
+    reverse proxy or load balancer in front.
+    """
+
+    def __init__(
+        self,
+        application: Application,
+        url: str,
+        secret_token: str,
+        listen: str = "0.0.0.0",
+        port: int = 8080,
+    ):
+        self.application = application
+        self.url = url
+        self.path = urlparse(url).path or "/"
+        self.secret_token = secret_token
+        self.listen = listen
+        self.port = port
+        self._runner: web.AppRunner | None = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        token = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token.encode(), self.secret_token.encode()):
+            logging.warning("Webhook request with a wrong secret token from %s", request.remote)
+            return web.Response(status=403)
+        try:
+            data = await request.json()
+            if not isinstance(data, dict):
+                raise ValueError(f"expected an object, got {type(data).__name__}")
+            update = Update.de_json(data, self.application.bot)
+        except (AttributeError, LookupError, TypeError, ValueError) as e:
+            logging.warning("Malformed webhook update from %s: %s", request.remote, e)
+            return web.Response(status=400)
+
+        await self.application.update_queue.put(update)
+        return web.Response()
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post(self.path, self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.listen, self.port).start()
+        logging.info("Listening for webhook updates on %s:%d%s", self.listen, self.port, self.path)
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def serve(self) -> None:
+        """
+        Run the application on webhook updates until SIGINT or SIGTERM.
+
+        Mirrors the lifecycle of `Application.run_polling`, including the
+        post_init, post_stop and post_shutdown hooks.
+        """
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        application = self.application
+        await application.initialize()
+        try:
+            if application.post_init:
+                await application.post_init(application)
+            await application.bot.set_webhook(
+                self.url, secret_token=self.secret_token, allowed_updates=Update.ALL_TYPES
+            )
+            await application.start()
+            try:
+                await self.start()
+                await stop.wait()
+                logging.info("Stopping webhook server")
+            finally:
+                await self.stop()
+                # Updates already acknowledged are still processed by stop().
+                await application.stop()
+                if application.post_stop:
+                    await application.post_stop(application)
+        finally:
+            await application.shutdown()
+            if application.post_shutdown:
+                await application.post_shutdown(application)
@@ -0,0 +1,78 @@
+"""
+Micro-benchmark: per-chunk aiofiles writes vs BufferedFileWriter.
+
+Downloads a payload from a local aiohttp server both ways and prints the
+timings and thread hops. Excluded from the default run; use
+``pytest -m benchmark -s tests/benchmarks``.
+"""
+
+import time
+
+import aiofiles
+import aiohttp
+import pytest
+from aiohttp import web
+
+from infra.files.downloader import MediaDownloader
+from infra.files.writer import open_writer
+
+PAYLOAD_BYTES = 256 * 1024 * 1024
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.enable_socket]
+
+
+@pytest.fixture
+async def server_url():
+    payload = b"\x00" * PAYLOAD_BYTES
+
+    async def handler(_):
+        return web.Response(body=payload, content_type="application/octet-stream")
+
+    app = web.Application()
+    app.router.add_get("/payload", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/payload"
+    await runner.cleanup()
+
+
+async def _per_chunk_download(url: str, dest) -> int:
+    """The previous MediaDownloader path: one aiofiles write per network chunk."""
+    writes = 0
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as resp:
+            async with aiofiles.open(dest, "wb") as fd:
+                async for chunk in resp.content.iter_chunked(MediaDownloader.CHUNK_SIZE):
+                    await fd.write(chunk)
+                    writes += 1
+    return writes
+
+
+async def _buffered_download(url: str, dest) -> int:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as resp:
+            async with open_writer(dest) as fd:
+                async for chunk in resp.content.iter_chunked(MediaDownloader.CHUNK_SIZE):
+                    await fd.write(chunk)
+    return fd.flushes
+
+
+@pytest.mark.asyncio
+async def test_buffered_writer_vs_per_chunk_writes(server_url, tmp_path):
+    results = {}
+    for name, download in (("aiofiles", _per_chunk_download), ("buffered", _buffered_download)):
+        dest = tmp_path / f"{name}.bin"
+        started = time.perf_counter()
+        writes = await download(server_url, dest)
+        elapsed = time.perf_counter() - started
+        assert dest.stat().st_size == PAYLOAD_BYTES
+        results[name] = (elapsed, writes)
+        print(
+            f"\n{name:>9}: {elapsed:.2f}s, {PAYLOAD_BYTES / elapsed / 2**20:.0f} MiB/s, "
+            f"{writes} writes"
+        )
+
+    assert results["buffered"][1] < results["aiofiles"][1]
@@ -0,0 +1,70 @@
+"""
+Micro-benchmark: in-process MP4 metadata reader vs an ffprobe subprocess.
+
+Fixture videos are encoded with ffmpeg (faststart and moov-at-end layouts);
+the comparison is skipped when ffmpeg/ffprobe are not installed. Excluded
+from the default run; use ``pytest -m benchmark -s tests/benchmarks``.
+"""
+
+import shutil
+import subprocess
+import time
+
+import ffmpeg
+import pytest
+
+from infra.media.mp4 import read_meta
+from tests.test_mp4 import hdlr, mp4_file, tkhd
+
+ROUNDS = 50
+
+pytestmark = pytest.mark.benchmark
+
+
+def _timed(func, path) -> float:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(path)
+    return (time.perf_counter() - started) / ROUNDS
+
+
+@pytest.fixture(scope="module")
+def fixture_videos(tmp_path_factory):
+    if not shutil.which("ffmpeg") or not shutil.which("ffprobe"):
+        pytest.skip("ffmpeg/ffprobe not installed")
+    root = tmp_path_factory.mktemp("videos")
+    videos = []
+    for name, flags in (("faststart", ["-movflags", "+faststart"]), ("moov_at_end", [])):
+        path = root / f"{name}.mp4"
+        subprocess.run(
+            ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "testsrc=size=1280x720:rate=30"]
+            + ["-f", "lavfi", "-i", "sine", "-t", "10", "-shortest", *flags, str(path)],
+            check=True,
+        )
+        videos.append(path)
+    return videos
+
+
+def test_read_meta_vs_ffprobe(fixture_videos):
+    for path in fixture_videos:
+        meta = read_meta(path)
+        probe = ffmpeg.probe(str(path))
+        video = next(s for s in probe["streams"] if s["codec_type"] == "video")
+        assert (meta.width, meta.height) == (video["width"], video["height"])
+        assert meta.duration == round(float(probe["format"]["duration"]))
+
+        ours = _timed(read_meta, path)
+        theirs = _timed(lambda p: ffmpeg.probe(str(p)), path)
+        print(
+            f"\n{path.name:>12}: read_meta {ours * 1e6:.0f}µs, "
+            f"ffprobe {theirs * 1e3:.1f}ms ({theirs / ours:.0f}x)"
+        )
+
+
+def test_read_meta_on_large_moov_at_end_file(tmp_path):
+    path = tmp_path / "large.mp4"
+    mp4_file(path, tkhd(1920, 1080) + hdlr(b"vide"), mdat_bytes=256 * 1024 * 1024)
+
+    elapsed = _timed(read_meta, path)
+
+    print(f"\n256 MiB moov-at-end skeleton: read_meta {elapsed * 1e6:.0f}µs")
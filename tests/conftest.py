@@ -17,7 +17,17 @@ def stub_config():
     return SimpleNamespace(
         version="test",
         parser_http_timeout=30,
-        telegram=SimpleNamespace(bot_token="test-token", base_url=None),
+        telegram=SimpleNamespace(
+            bot_token="test-token",
+            base_url=None,
+            local_mode=False,
+            send_rate=30.0,
+            chat_send_rate=1.0,
+            concurrent_updates=32,
+            max_deliveries=8,
+            drain_timeout=30.0,
+            webhook_url=None,
+        ),
         instagram=SimpleNamespace(
             parser_url="http://instagram-parser.test/parse",
             encryption_key="a" * 16,
@@ -39,4 +49,26 @@ def stub_config():
         tumblr=SimpleNamespace(api_key="tumblr-api-key"),
         vk=SimpleNamespace(thumbnail_url="https://vk.test/thumb.jpg"),
         youtube=SimpleNamespace(api_key="yt-api-key"),
+        files=SimpleNamespace(
+            head_check=False,
+            cache_dir=None,
+            cache_max_bytes=0,
+            download_connections=1,
+            bandwidth_limit=0,
+            memory_threshold=0,
+            passthrough_min_bytes=0,
+            remote_probe=False,
+            url_hosts=(),
+        ),
+        media=SimpleNamespace(
+            ffmpeg_workers=1,
+            ffmpeg_timeout=60,
+            faststart=False,
+            transcode=False,
+            transcode_timeout=60,
+            transcode_workers=1,
+            photo_optimize=False,
+            gif_to_mp4=False,
+            upload_limit=50 * 1024 * 1024,
+        ),
     )
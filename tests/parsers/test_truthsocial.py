@@ -0,0 +1,74 @@
+"""
+Tests for media extracted by the Truth Social parser.
+
+HTTP is mocked via `responses` — no real network access. The status is
+hand-crafted to mirror the Mastodon-style API fields the parser reads.
+"""
+
+import pytest
+import responses as responses_lib
+
+from core.domain.entity import Photo, Video
+from parsers.truthsocial.parser import Parser as TruthSocialParser
+
+POST_URL = "https://truthsocial.com/@someone/posts/114000000000000001"
+API_URL = "https://truthsocial.com/api/v1/statuses/114000000000000001"
+
+
+def _status(*attachments: dict) -> dict:
+    return {
+        "account": {
+            "url": "https://truthsocial.com/@someone",
+            "display_name": "Someone",
+            "username": "someone",
+        },
+        "content": "<p>Hello</p>",
+        "replies_count": 1,
+        "reblogs_count": 2,
+        "favourites_count": 3,
+        "created_at": "2026-01-02T03:04:05.000Z",
+        "url": POST_URL,
+        "media_attachments": list(attachments),
+    }
+
+
+@pytest.fixture
+def parser():
+    return TruthSocialParser("test-agent/1.0")
+
+
+@responses_lib.activate
+def test_video_metadata_and_variant_from_meta(parser):
+    attachment = {
+        "type": "video",
+        "url": "https://static.test/v.mp4",
+        "preview_url": "https://static.test/v.jpg",
+        "meta": {
+            "original": {"width": 1280, "height": 720, "duration": 61.4, "bitrate": 2_000_000}
+        },
+    }
+    responses_lib.add(responses_lib.GET, API_URL, json=_status(attachment))
+
+    video = parser.parse(POST_URL).media[0]
+
+    assert isinstance(video, Video)
+    assert (video.width, video.height, video.duration) == (1280, 720, 61)
+    assert video.variants[0].bitrate == 2_000_000
+    assert video.variants[0].estimated_size(video.duration) == 15_250_000
+
+
+@responses_lib.activate
+def test_video_without_meta(parser):
+    attachment = {"type": "gifv", "url": "https://static.test/g.mp4", "preview_url": None}
+    responses_lib.add(
+        responses_lib.GET,
+        API_URL,
+        json=_status(attachment, {"type": "image", "url": "https://static.test/p.jpg"}),
+    )
+
+    video, photo = parser.parse(POST_URL).media
+
+    assert video.resource_url == "https://static.test/g.mp4"
+    assert (video.width, video.height, video.duration) == (None, None, None)
+    assert video.variants[0].estimated_size(video.duration) is None
+    assert isinstance(photo, Photo)
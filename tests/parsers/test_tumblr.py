@@ -0,0 +1,95 @@
+"""
+Tests for media metadata extracted by the Tumblr parser.
+
+HTTP is mocked via `responses` — no real network access. Posts are
+hand-crafted to mirror the legacy API fields the parser reads.
+"""
+
+import pytest
+import responses as responses_lib
+
+from core.domain.entity import Photo, Video
+from parsers.tumblr.parser import Parser as TumblrParser
+
+POST_URL = "https://staff.tumblr.com/post/123456"
+API_URL = "https://api.tumblr.com/v2/blog/staff.tumblr.com/posts"
+
+NPF_VIDEO_BODY = (
+    '<figure class="tmblr-full" data-npf=\'{&quot;type&quot;:&quot;video&quot;,'
+    "&quot;media&quot;:{&quot;url&quot;:&quot;https://va.media.tumblr.com/v.mp4&quot;,"
+    "&quot;width&quot;:720,&quot;height&quot;:1280}}'>"
+    '<video controls="controls" poster="https://64.media.tumblr.com/poster.jpg">'
+    '<source src="https://va.media.tumblr.com/v.mp4" type="video/mp4"></video></figure>'
+)
+
+IMAGE_BODY = (
+    '<figure class="tmblr-full"><img src="https://64.media.tumblr.com/a.gif" '
+    'data-orig-height="270" data-orig-width="480"/></figure>'
+)
+
+
+def _post(**fields) -> dict:
+    post = {
+        "blog_name": "staff",
+        "post_url": POST_URL,
+        "date": "2026-01-02 03:04:05 GMT",
+        "note_count": 1,
+    }
+    post.update(fields)
+    return {"response": {"posts": [post]}}
+
+
+@pytest.fixture
+def parser():
+    return TumblrParser("api-key", "test-agent/1.0")
+
+
+@responses_lib.activate
+def test_photo_dimensions_from_original_size(parser):
+    original = {"url": "https://64.media.tumblr.com/p.jpg", "width": 1280, "height": 960}
+    responses_lib.add(
+        responses_lib.GET,
+        API_URL,
+        json=_post(photos=[{"original_size": original, "alt_sizes": [original]}]),
+    )
+
+    photo = parser.parse(POST_URL).media[0]
+
+    assert isinstance(photo, Photo)
+    assert (photo.width, photo.height) == (1280, 960)
+
+
+@responses_lib.activate
+def test_html_video_dimensions_from_npf(parser):
+    responses_lib.add(responses_lib.GET, API_URL, json=_post(body=NPF_VIDEO_BODY))
+
+    video = parser.parse(POST_URL).media[0]
+
+    assert isinstance(video, Video)
+    assert video.resource_url == "https://va.media.tumblr.com/v.mp4"
+    assert (video.width, video.height) == (720, 1280)
+
+
+@responses_lib.activate
+def test_npf_block_of_an_earlier_figure_is_not_used(parser):
+    body = NPF_VIDEO_BODY + (
+        '<video controls="controls">'
+        '<source src="https://va.media.tumblr.com/w.mp4" type="video/mp4"></video>'
+    )
+    responses_lib.add(responses_lib.GET, API_URL, json=_post(body=body))
+
+    first, second = parser.parse(POST_URL).media
+
+    assert (first.width, first.height) == (720, 1280)
+    assert second.resource_url == "https://va.media.tumblr.com/w.mp4"
+    assert (second.width, second.height) == (None, None)
+
+
+@responses_lib.activate
+def test_html_gif_dimensions_from_orig_attributes(parser):
+    responses_lib.add(responses_lib.GET, API_URL, json=_post(body=IMAGE_BODY))
+
+    gif = parser.parse(POST_URL).media[0]
+
+    assert gif.mime_type == "image/gif"
+    assert (gif.width, gif.height) == (480, 270)
@@ -12,6 +12,7 @@ Hand-crafted fixture kept for edge-case tests:
   twitter/crafted_photo_with_html.json — user_name with (@handle) suffix, HTML in text
 """
 
+import copy
 import json
 import pathlib
 from datetime import UTC, datetime
@@ -166,6 +167,48 @@ def test_video_has_thumbnail(parser):
     assert content.media[0].thumbnail_url == VIDEO_F["media_extended"][0]["thumbnail_url"]
 
 
+@responses_lib.activate
+def test_video_metadata_from_media_extended(parser):
+    responses_lib.add(responses_lib.GET, VIDEO_API, json=VIDEO_F, status=200)
+    content = parser.parse(VIDEO_URL)
+    video = content.media[0]
+    assert (video.width, video.height, video.duration) == (1080, 1920, 31)
+
+
+@responses_lib.activate
+def test_video_variants_ranked_by_bitrate(parser):
+    tweet = copy.deepcopy(VIDEO_F)
+    tweet["media_extended"][0]["variants"] = [
+        {"content_type": "video/mp4", "bitrate": 632000, "url": "https://video.test/320.mp4"},
+        {"content_type": "application/x-mpegURL", "url": "https://video.test/pl.m3u8"},
+        {"content_type": "video/mp4", "bitrate": 2176000, "url": "https://video.test/720.mp4"},
+    ]
+    responses_lib.add(responses_lib.GET, VIDEO_API, json=tweet, status=200)
+
+    video = parser.parse(VIDEO_URL).media[0]
+
+    assert video.resource_url == "https://video.test/720.mp4"
+    assert [(v.url, v.bitrate) for v in video.variants] == [
+        ("https://video.test/720.mp4", 2176000),
+        ("https://video.test/320.mp4", 632000),
+    ]
+
+
+@responses_lib.activate
+def test_video_without_variants_keeps_single_url(parser):
+    responses_lib.add(responses_lib.GET, VIDEO_API, json=VIDEO_F, status=200)
+    video = parser.parse(VIDEO_URL).media[0]
+    assert video.resource_url == VIDEO_F["media_extended"][0]["url"]
+    assert video.variants == []
+
+
+@responses_lib.activate
+def test_gallery_photo_dimensions(parser):
+    responses_lib.add(responses_lib.GET, GALLERY_API, json=GALLERY, status=200)
+    content = parser.parse(GALLERY_URL)
+    assert (content.media[0].width, content.media[0].height) == (4096, 2731)
+
+
 @responses_lib.activate
 def test_video_metrics(parser):
     # replies=50, retweets=808, likes=5318 → 5K
@@ -39,3 +39,29 @@ class TestLogLevelDefault:
             config = cfg_module.Config()
 
         assert config.log_level == logging.DEBUG
+
+
+class TestWebhookSecret:
+    def _missing(self, env):
+        with patch.dict(os.environ, env):
+            import core.config as cfg_module
+
+            reload(cfg_module)
+            try:
+                cfg_module.Config().validate()
+            except RuntimeError as e:
+                return str(e)
+            return ""
+
+    def test_required_with_webhook_url(self):
+        env = {
+            "TELEGRAM_WEBHOOK_URL": "https://bot.example.com/hook",
+            "TELEGRAM_WEBHOOK_SECRET": "",
+        }
+
+        assert "telegram.webhook_secret" in self._missing(env)
+
+    def test_optional_for_long_polling(self):
+        env = {"TELEGRAM_WEBHOOK_URL": "", "TELEGRAM_WEBHOOK_SECRET": ""}
+
+        assert "telegram.webhook_secret" not in self._missing(env)
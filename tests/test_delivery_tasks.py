@@ -0,0 +1,118 @@
+"""
+Tests for DeliveryTasks.
+
+Background deliveries are capped, tracked in stats and drained on shutdown;
+whatever outlives the drain timeout is cancelled so its cleanup still runs.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from platforms.telegram.exception import DeliveryRefusedError
+from platforms.telegram.tasks import DeliveryTasks
+
+
+class TestDeliveryTasks:
+    @pytest.mark.asyncio
+    async def test_spawn_waits_for_a_free_slot(self):
+        tasks = DeliveryTasks(max_running=1)
+        release = asyncio.Event()
+
+        await tasks.spawn(release.wait())
+        second = asyncio.create_task(tasks.spawn(asyncio.sleep(0)))
+        await asyncio.sleep(0.01)
+
+        assert not second.done()
+        assert tasks.stats.waiting == 1
+        assert tasks.stats.in_flight == 1
+
+        release.set()
+        await (await second)
+        assert tasks.stats.completed == 2
+        assert tasks.stats.max_in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_are_counted(self):
+        tasks = DeliveryTasks()
+
+        async def failing():
+            raise RuntimeError("deliberate explosion")
+
+        task = await tasks.spawn(failing())
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0)
+
+        assert tasks.stats.failed == 1
+        assert tasks.stats.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_drain_waits_for_running_deliveries(self):
+        tasks = DeliveryTasks()
+        finished = []
+
+        async def deliver():
+            await asyncio.sleep(0.01)
+            finished.append(True)
+
+        await tasks.spawn(deliver())
+        await tasks.drain(timeout=1)
+
+        assert finished == [True]
+        assert tasks.stats.completed == 1
+
+    @pytest.mark.asyncio
+    async def test_drain_cancels_after_timeout_and_cleanup_runs(self):
+        tasks = DeliveryTasks()
+        cleaned = []
+
+        async def deliver():
+            try:
+                await asyncio.sleep(10)
+            finally:
+                cleaned.append(True)
+
+        await tasks.spawn(deliver())
+        await tasks.drain(timeout=0.01)
+
+        assert cleaned == [True]
+        assert tasks.stats.cancelled == 1
+
+    @pytest.mark.asyncio
+    async def test_spawn_is_refused_after_drain(self):
+        tasks = DeliveryTasks()
+        await tasks.drain(timeout=1)
+
+        coro = asyncio.sleep(0)
+        discard = AsyncMock()
+        with pytest.raises(DeliveryRefusedError):
+            await tasks.spawn(coro, discard)
+        assert coro.cr_frame is None
+        discard.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_delivery_is_discarded(self):
+        tasks = DeliveryTasks()
+        discard = AsyncMock()
+
+        await tasks.spawn(asyncio.sleep(10), discard)
+        await tasks.drain(timeout=0)
+
+        discard.assert_awaited_once()
+        assert tasks.stats.cancelled == 1
+
+    @pytest.mark.asyncio
+    async def test_delivery_given_up_while_waiting_is_discarded(self):
+        tasks = DeliveryTasks(max_running=1)
+        await tasks.spawn(asyncio.sleep(10))
+        discard = AsyncMock()
+
+        waiting = asyncio.create_task(tasks.spawn(asyncio.sleep(0), discard))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        discard.assert_awaited_once()
+        await tasks.drain(timeout=0)
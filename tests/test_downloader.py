@@ -28,7 +28,9 @@ class TestMediaDownloaderConstructor:
 
 
 class TestMediaDownloaderStreamingLimit:
-    def _make_session_mock(self, chunks: list[bytes], status: int = 200):
+    def _make_session_mock(
+        self, chunks: list[bytes], status: int = 200, content_length: int | None = None
+    ):
         """Build an aiohttp session mock that streams the given chunks."""
 
         async def fake_iter_chunked(size):
@@ -37,6 +39,7 @@ class TestMediaDownloaderStreamingLimit:
 
         mock_resp = MagicMock()
         mock_resp.status = status
+        mock_resp.content_length = content_length
         mock_resp.content.iter_chunked = fake_iter_chunked
 
         mock_get_cm = MagicMock()
@@ -82,6 +85,24 @@ class TestMediaDownloaderStreamingLimit:
         assert written == 5
         assert os.path.exists(dest)
 
+    @pytest.mark.asyncio
+    async def test_file_linked_at_dest_is_replaced_not_overwritten(self, tmp_path):
+        from infra.files.downloader import MediaDownloader
+
+        dl = MediaDownloader("agent", timeout=30)
+        cached = tmp_path / "cached.bin"
+        cached.write_bytes(b"cached")
+        dest = tmp_path / "out.bin"
+        os.link(cached, dest)
+        session_mock = self._make_session_mock([b"hello"])
+
+        with patch("infra.files.downloader.aiohttp.ClientSession", return_value=session_mock):
+            await dl.download("http://example.com/small.bin", str(dest))
+
+        assert dest.read_bytes() == b"hello"
+        assert cached.read_bytes() == b"cached"
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["cached.bin", "out.bin"]
+
     @pytest.mark.asyncio
     async def test_zero_max_bytes_never_raises(self, tmp_path):
         """max_bytes=0 (default) disables the size check entirely."""
@@ -96,6 +117,451 @@ class TestMediaDownloaderStreamingLimit:
 
         assert written == 1024
 
+    @pytest.mark.asyncio
+    async def test_content_length_over_limit_aborts_before_reading_body(self, tmp_path):
+        from infra.files.downloader import MediaDownloader
+        from infra.files.exception import FileTooLargeError
+
+        dl = MediaDownloader("agent", timeout=30, max_bytes=10)
+        dest = str(tmp_path / "out.bin")
+        session_mock = self._make_session_mock([], content_length=11)
+
+        with patch("infra.files.downloader.aiohttp.ClientSession", return_value=session_mock):
+            with pytest.raises(FileTooLargeError):
+                await dl.download("http://example.com/big.bin", dest)
+
+        assert not os.path.exists(dest)
+
+    @pytest.mark.asyncio
+    async def test_per_call_max_bytes_overrides_instance_limit(self, tmp_path):
+        from infra.files.downloader import MediaDownloader
+        from infra.files.exception import FileTooLargeError
+
+        dl = MediaDownloader("agent", timeout=30, max_bytes=100)
+        dest = str(tmp_path / "out.bin")
+        session_mock = self._make_session_mock([b"x" * 20])
+
+        with patch("infra.files.downloader.aiohttp.ClientSession", return_value=session_mock):
+            with pytest.raises(FileTooLargeError):
+                await dl.download("http://example.com/big.bin", dest, max_bytes=10)
+
+
+class FakeRangeSession:
+    """Serves `payload` like a CDN advertising Accept-Ranges: bytes."""
+
+    def __init__(
+        self,
+        payload: bytes,
+        honor_ranges: bool = True,
+        drops: list[int] | None = None,
+        etags: list[str] | None = None,
+    ):
+        self.payload = payload
+        self.honor_ranges = honor_ranges
+        # Per request: number of body bytes served before the connection drops
+        self.drops = list(drops or [])
+        # Per request: ETag header value
+        self.etags = list(etags or [])
+        self.ranges = []
+        # Per request: responses still open when it was made
+        self.open_before = []
+        self._open = 0
+
+    def get(self, url, headers=None, **kwargs):
+        body, status, resp_headers = self.payload, 200, {"Accept-Ranges": "bytes"}
+        rng = (headers or {}).get("Range")
+        if rng and self.honor_ranges:
+            start, _, end = rng.removeprefix("bytes=").partition("-")
+            start, end = int(start), int(end) if end else len(self.payload) - 1
+            self.ranges.append((start, end))
+            body, status = self.payload[start : end + 1], 206
+            resp_headers = {"Content-Range": f"bytes {start}-{end}/{len(self.payload)}"}
+        if self.etags:
+            resp_headers["ETag"] = self.etags.pop(0)
+        drop_after = self.drops.pop(0) if self.drops else None
+
+        async def iter_chunked(size):
+            import aiohttp
+
+            for i in range(0, len(body), 4):
+                if drop_after is not None and i >= drop_after:
+                    raise aiohttp.ClientPayloadError("connection reset")
+                yield body[i : i + 4]
+
+        resp = MagicMock()
+        resp.status = status
+        resp.url = url
+        resp.headers = resp_headers
+        resp.content_length = len(body)
+        resp.content.iter_chunked = iter_chunked
+
+        async def enter():
+            self.open_before.append(self._open)
+            self._open += 1
+            return resp
+
+        async def exit_(*exc):
+            self._open -= 1
+            return False
+
+        cm = MagicMock()
+        cm.__aenter__ = AsyncMock(side_effect=enter)
+        cm.__aexit__ = AsyncMock(side_effect=exit_)
+        return cm
+
+
+class TestMediaDownloaderRanges:
+    def _downloader(self, session, **kwargs):
+        from infra.files.downloader import MediaDownloader
+        from infra.http.session import SharedSession
+
+        shared = SharedSession()
+        shared.get = MagicMock(return_value=session)
+        return MediaDownloader("agent", session=shared, split_min_bytes=8, backoff=0, **kwargs)
+
+    @pytest.mark.asyncio
+    async def test_large_file_is_fetched_as_parallel_ranges(self, tmp_path):
+        payload = bytes(range(50))
+        session = FakeRangeSession(payload)
+        dest = tmp_path / "out.bin"
+
+        written = await self._downloader(session, connections=4).download("http://cdn.test/v", dest)
+
+        assert written == 50
+        assert dest.read_bytes() == payload
+        assert session.ranges == [(13, 25), (26, 38), (39, 49)]
+
+    @pytest.mark.asyncio
+    async def test_single_connection_streams_whole_body(self, tmp_path):
+        payload = bytes(range(50))
+        session = FakeRangeSession(payload)
+        dest = tmp_path / "out.bin"
+
+        await self._downloader(session, connections=1).download("http://cdn.test/v", dest)
+
+        assert dest.read_bytes() == payload
+        assert session.ranges == []
+
+    @pytest.mark.asyncio
+    async def test_owner_throughput_is_logged(self, tmp_path, caplog):
+        from infra.files.bandwidth import BandwidthScheduler, download_owner
+
+        session = FakeRangeSession(bytes(range(50)))
+        downloader = self._downloader(session, scheduler=BandwidthScheduler(10**9, window=1.0))
+        token = download_owner.set(42)
+        try:
+            with caplog.at_level("INFO"):
+                await downloader.download("http://cdn.test/v", tmp_path / "out.bin")
+        finally:
+            download_owner.reset(token)
+
+        assert "for 42; owner throughput 50 B/s" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_unhonored_range_falls_back_to_single_stream(self, tmp_path):
+        payload = bytes(range(50))
+        session = FakeRangeSession(payload, honor_ranges=False)
+        dest = tmp_path / "out.bin"
+
+        written = await self._downloader(session, connections=4).download("http://cdn.test/v", dest)
+
+        assert written == 50
+        assert dest.read_bytes() == payload
+        # The first response is closed before the file is requested again.
+        assert session.open_before[-1] == 0
+
+
+class TestMediaDownloaderResume:
+    def _downloader(self, session, **kwargs):
+        from infra.files.downloader import MediaDownloader
+        from infra.http.session import SharedSession
+
+        shared = SharedSession()
+        shared.get = MagicMock(return_value=session)
+        kwargs.setdefault("backoff", 0)
+        return MediaDownloader("agent", session=shared, **kwargs)
+
+    @pytest.mark.asyncio
+    async def test_resumes_from_last_byte_after_connection_drop(self, tmp_path):
+        payload = bytes(range(40))
+        session = FakeRangeSession(payload, drops=[12, 8], etags=['"v1"', '"v1"', '"v1"'])
+        dest = tmp_path / "out.bin"
+
+        written = await self._downloader(session).download("http://cdn.test/v", dest)
+
+        assert written == 40
+        assert dest.read_bytes() == payload
+        assert session.ranges == [(12, 39), (20, 39)]
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_retry_budget(self, tmp_path):
+        import aiohttp
+
+        session = FakeRangeSession(bytes(range(40)), drops=[4, 4, 4])
+        dest = tmp_path / "out.bin"
+
+        with pytest.raises(aiohttp.ClientPayloadError):
+            await self._downloader(session, retries=2).download("http://cdn.test/v", dest)
+
+        assert not dest.exists()
+
+    @pytest.mark.asyncio
+    async def test_failed_reconnect_uses_next_attempt(self, tmp_path):
+        import aiohttp
+
+        payload = bytes(range(40))
+        session = FakeRangeSession(payload, drops=[12])
+        serve = session.get
+        calls = []
+
+        def get(url, headers=None, **kwargs):
+            calls.append(headers.get("Range"))
+            if len(calls) == 2:
+                raise aiohttp.ClientConnectionError("connection refused")
+            return serve(url, headers, **kwargs)
+
+        session.get = get
+        dest = tmp_path / "out.bin"
+
+        await self._downloader(session, backoff=0.01).download("http://cdn.test/v", dest)
+
+        assert dest.read_bytes() == payload
+        assert calls == [None, "bytes=12-", "bytes=12-"]
+
+    @pytest.mark.asyncio
+    async def test_changed_etag_aborts_resume(self, tmp_path):
+        from infra.files.exception import FileDownloadError
+
+        session = FakeRangeSession(bytes(range(40)), drops=[8], etags=['"v1"', '"v2"'])
+        dest = tmp_path / "out.bin"
+
+        with pytest.raises(FileDownloadError):
+            await self._downloader(session).download("http://cdn.test/v", dest)
+
+        assert not dest.exists()
+
+    @pytest.mark.asyncio
+    async def test_parallel_range_resumes_within_its_bounds(self, tmp_path):
+        payload = bytes(range(50))
+        session = FakeRangeSession(payload, drops=[None, 4])
+        dest = tmp_path / "out.bin"
+
+        await self._downloader(session, connections=2, split_min_bytes=8).download(
+            "http://cdn.test/v", dest
+        )
+
+        assert dest.read_bytes() == payload
+        assert session.ranges == [(25, 49), (29, 49)]
+
+
+class TestFileResolverHeadCheck:
+    def _make_resolver(self, tmp_path, head_check: bool):
+        from infra.files.resolver import FileResolver
+        from infra.files.storage import LocalStorage
+
+        validator = MagicMock()
+        validator.max_bytes = 10
+        validator.validate_size = AsyncMock()
+        downloader = MagicMock()
+        downloader.safe_filename = MagicMock(return_value="file.bin")
+        downloader.download = AsyncMock(return_value=5)
+        return FileResolver(validator, downloader, LocalStorage(tmp_path), head_check=head_check)
+
+    @pytest.mark.asyncio
+    async def test_head_check_validates_before_download(self, tmp_path):
+        resolver = self._make_resolver(tmp_path, head_check=True)
+
+        await resolver.resolve("http://example.com/file.bin")
+
+        resolver.validator.validate_size.assert_awaited_once()
+        assert resolver.downloader.download.call_args.kwargs["max_bytes"] is None
+
+    @pytest.mark.asyncio
+    async def test_known_size_skips_head(self, tmp_path):
+        resolver = self._make_resolver(tmp_path, head_check=True)
+
+        await resolver.resolve("http://example.com/file.bin", size=5)
+
+        resolver.validator.validate_size.assert_not_called()
+        assert resolver.downloader.download.call_args.kwargs["max_bytes"] == 10
+
+    @pytest.mark.asyncio
+    async def test_known_size_over_limit_is_rejected_without_download(self, tmp_path):
+        from infra.files.exception import FileTooLargeError
+
+        resolver = self._make_resolver(tmp_path, head_check=True)
+
+        with pytest.raises(FileTooLargeError):
+            await resolver.resolve("http://example.com/file.bin", size=11)
+
+        resolver.validator.validate_size.assert_not_called()
+        resolver.downloader.download.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_single_round_trip_skips_head_and_passes_limit(self, tmp_path):
+        resolver = self._make_resolver(tmp_path, head_check=False)
+
+        fi = await resolver.resolve("http://example.com/file.bin")
+
+        resolver.validator.validate_size.assert_not_called()
+        assert resolver.downloader.download.call_args.kwargs["max_bytes"] == 10
+        assert fi.size == 5
+
+
+class TestFileResolverRemote:
+    def _make_resolver(self, tmp_path, remote_size=None):
+        from infra.files.resolver import FileResolver
+        from infra.files.storage import LocalStorage
+
+        validator = MagicMock()
+        validator.max_bytes = 100
+        validator.validate_size = AsyncMock()
+        validator.remote_size = AsyncMock(return_value=remote_size)
+        downloader = MagicMock()
+        downloader.safe_filename = MagicMock(return_value="file.jpg")
+        downloader.download = AsyncMock(return_value=50)
+        return FileResolver(
+            validator,
+            downloader,
+            LocalStorage(tmp_path),
+            head_check=True,
+            remote_hosts=("twimg.com",),
+        )
+
+    @pytest.mark.asyncio
+    async def test_small_file_on_allowed_host_is_not_downloaded(self, tmp_path):
+        resolver = self._make_resolver(tmp_path)
+
+        fi = await resolver.resolve(
+            "https://pbs.twimg.com/media/a.jpg", size=40, remote_max_bytes=50
+        )
+
+        assert fi.remote
+        assert (fi.size, fi.original_url) == (40, "https://pbs.twimg.com/media/a.jpg")
+        resolver.validator.remote_size.assert_not_called()
+        resolver.downloader.download.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unknown_size_is_read_with_one_head_request(self, tmp_path):
+        resolver = self._make_resolver(tmp_path, remote_size=80)
+
+        fi = await resolver.resolve("https://pbs.twimg.com/media/a.jpg", remote_max_bytes=50)
+
+        # Too large to fetch by URL: downloaded, reusing the size instead of a second HEAD.
+        assert not fi.remote
+        resolver.validator.remote_size.assert_awaited_once()
+        resolver.validator.validate_size.assert_not_called()
+        resolver.downloader.download.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_other_hosts_are_downloaded(self, tmp_path):
+        resolver = self._make_resolver(tmp_path)
+
+        fi = await resolver.resolve("https://eviltwimg.com/a.jpg", size=10, remote_max_bytes=50)
+
+        assert not fi.remote
+        resolver.downloader.download.assert_awaited_once()
+
+
+class TestFileResolverBuffered:
+    @pytest.mark.asyncio
+    async def test_buffered_resolve_keeps_small_payload_in_memory(self, tmp_path):
+        from infra.files.resolver import FileResolver
+        from infra.files.storage import LocalStorage
+
+        async def fake_download_spooled(url, spool, max_bytes=None):
+            await spool.write(b"jpeg")
+            return 4
+
+        validator = MagicMock()
+        validator.validate_size = AsyncMock()
+        downloader = MagicMock()
+        downloader.safe_filename = MagicMock(return_value="photo.jpg")
+        downloader.download = AsyncMock()
+        downloader.download_spooled = AsyncMock(side_effect=fake_download_spooled)
+        resolver = FileResolver(validator, downloader, LocalStorage(tmp_path), memory_threshold=64)
+
+        fi = await resolver.resolve("http://cdn.test/photo.jpg", buffered=True)
+
+        downloader.download.assert_not_called()
+        assert fi.data == b"jpeg"
+        assert fi.size == 4
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_buffered_payload_is_not_cached(self, tmp_path):
+        from infra.files.cache import MediaCache
+        from infra.files.resolver import FileResolver
+        from infra.files.storage import LocalStorage
+
+        async def fake_download_spooled(url, spool, max_bytes=None):
+            await spool.write(b"jpeg")
+            return 4
+
+        downloader = MagicMock()
+        downloader.safe_filename = MagicMock(return_value="photo.jpg")
+        downloader.download_spooled = AsyncMock(side_effect=fake_download_spooled)
+        storage = tmp_path / "storage"
+        storage.mkdir()
+        cache = MediaCache(tmp_path / "cache", 1024)
+        resolver = FileResolver(
+            MagicMock(validate_size=AsyncMock()),
+            downloader,
+            LocalStorage(storage),
+            memory_threshold=64,
+            cache=cache,
+        )
+
+        for _ in range(2):
+            fi = await resolver.resolve("http://cdn.test/photo.jpg", buffered=True)
+            assert fi.data == b"jpeg"
+
+        assert downloader.download_spooled.await_count == 2
+        assert list((tmp_path / "cache").iterdir()) == []
+        assert list(storage.iterdir()) == []
+
+
+class TestFileResolverPassthrough:
+    def _make_resolver(self, tmp_path, payload: bytes):
+        from infra.files.downloader import MediaDownloader
+        from infra.files.resolver import FileResolver
+        from infra.files.storage import LocalStorage
+        from infra.http.session import SharedSession
+
+        shared = SharedSession()
+        shared.get = MagicMock(return_value=FakeRangeSession(payload))
+        downloader = MediaDownloader("agent", session=shared)
+        validator = MagicMock()
+        validator.max_bytes = 1000
+        return FileResolver(
+            validator,
+            downloader,
+            LocalStorage(tmp_path),
+            head_check=False,
+            passthrough_min_bytes=32,
+        )
+
+    @pytest.mark.asyncio
+    async def test_large_video_is_streamed_without_touching_disk(self, tmp_path):
+        payload = bytes(range(64))
+        resolver = self._make_resolver(tmp_path, payload)
+
+        fi = await resolver.resolve("http://cdn.test/video.mp4", streamable=True)
+
+        assert fi.stream is not None
+        assert fi.size == 64
+        assert list(tmp_path.iterdir()) == []
+        assert b"".join([chunk async for chunk in fi.stream]) == payload
+
+    @pytest.mark.asyncio
+    async def test_small_video_is_saved_to_storage(self, tmp_path):
+        resolver = self._make_resolver(tmp_path, b"small")
+
+        fi = await resolver.resolve("http://cdn.test/video.mp4", streamable=True)
+
+        assert fi.stream is None
+        assert fi.path.read_bytes() == b"small"
+
 
 class TestContainerWiresDownloaderCorrectly:
     def test_container_downloader_has_sane_timeout_and_nonzero_max_bytes(self, stub_config):
@@ -0,0 +1,61 @@
+"""
+Tests for SharedSession.
+
+One pooled aiohttp session is shared by the downloader, validators and
+analytics, so HEAD-then-GET to the same host reuses keep-alive connections.
+"""
+
+import pytest
+
+from infra.http.session import SharedSession, open_session
+
+
+class TestSharedSession:
+    @pytest.mark.asyncio
+    async def test_get_returns_same_session(self):
+        shared = SharedSession()
+        try:
+            assert shared.get() is shared.get()
+        finally:
+            await shared.close()
+
+    @pytest.mark.asyncio
+    async def test_connector_is_tuned(self):
+        shared = SharedSession(limit=5, limit_per_host=2)
+        try:
+            connector = shared.get().connector
+            assert connector.limit == 5
+            assert connector.limit_per_host == 2
+        finally:
+            await shared.close()
+
+    @pytest.mark.asyncio
+    async def test_close_closes_and_allows_recreation(self):
+        shared = SharedSession()
+        first = shared.get()
+        await shared.close()
+
+        assert first.closed
+        second = shared.get()
+        assert second is not first
+        await shared.close()
+
+    @pytest.mark.asyncio
+    async def test_close_without_session_is_noop(self):
+        await SharedSession().close()
+
+
+class TestOpenSession:
+    @pytest.mark.asyncio
+    async def test_yields_shared_session_without_closing_it(self):
+        shared = SharedSession()
+        async with open_session(shared) as session:
+            assert session is shared.get()
+        assert not session.closed
+        await shared.close()
+
+    @pytest.mark.asyncio
+    async def test_throwaway_session_is_closed_when_not_shared(self):
+        async with open_session(None) as session:
+            assert not session.closed
+        assert session.closed
@@ -0,0 +1,134 @@
+"""
+Tests for image header parsing and PhotoOptimizer.
+
+ffmpeg is replaced by a fake pool job that writes an output of a given size.
+"""
+
+import struct
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from core.domain.entity import FileInfo
+from infra.files.cache import MediaCache
+from infra.media.images import PhotoOptimizer, image_size
+
+URL = "https://cdn.test/photo.png"
+
+
+def png(width: int, height: int, size: int = 0) -> bytes:
+    head = b"\x89PNG\r\n\x1a\n" + struct.pack(">I4sII", 13, b"IHDR", width, height)
+    return head + b"\x00" * max(0, size - len(head))
+
+
+def jpeg(width: int, height: int) -> bytes:
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + bytes(9)
+    sof = b"\xff\xc2" + struct.pack(">HBHHB", 11, 8, height, width, 3) + bytes(3)
+    return b"\xff\xd8" + app0 + sof
+
+
+def webp_vp8x(width: int, height: int) -> bytes:
+    payload = bytes(4) + (width - 1).to_bytes(3, "little") + (height - 1).to_bytes(3, "little")
+    return b"RIFF" + struct.pack("<I", 30) + b"WEBPVP8X" + struct.pack("<I", 10) + payload
+
+
+def _optimizer(output_bytes: int, cache: MediaCache | None = None) -> PhotoOptimizer:
+    async def ffmpeg(*args, timeout=None, on_line=None):
+        Path(args[-1]).write_bytes(b"\xff" * output_bytes)
+        return b""
+
+    optimizer = PhotoOptimizer(MagicMock(), 2560, cache=cache, min_bytes=1000)
+    optimizer.pool.ffmpeg = AsyncMock(side_effect=ffmpeg)
+    return optimizer
+
+
+def _file(tmp_path: Path, data: bytes) -> FileInfo:
+    path = tmp_path / "photo.png"
+    path.write_bytes(data)
+    return FileInfo(path=path, size=len(data), original_url=URL)
+
+
+class TestImageSize:
+    def test_png(self):
+        assert image_size(png(4000, 3000)) == (4000, 3000)
+
+    def test_jpeg_skips_leading_segments(self):
+        assert image_size(jpeg(1280, 720)) == (1280, 720)
+
+    def test_webp_extended(self):
+        assert image_size(webp_vp8x(5000, 200)) == (5000, 200)
+
+    def test_unknown_format(self):
+        assert image_size(b"GIF89a" + bytes(20)) is None
+
+
+class TestPhotoOptimizer:
+    @pytest.mark.asyncio
+    async def test_small_photo_is_left_alone(self, tmp_path):
+        optimizer = _optimizer(10)
+        fi = _file(tmp_path, png(800, 600, size=500))
+
+        assert await optimizer.optimize(URL, fi) is None
+        optimizer.pool.ffmpeg.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_oversized_photo_is_replaced_by_jpeg(self, tmp_path):
+        optimizer = _optimizer(300)
+        fi = _file(tmp_path, png(6000, 4000, size=800))
+
+        result = await optimizer.optimize(URL, fi)
+
+        assert result.size == 300
+        assert result.mime_type == "image/jpeg"
+        assert result.original_url == URL
+        assert result.path.read_bytes() == b"\xff" * 300
+        assert not fi.path.exists()
+        assert "scale='min(2560,iw)':'min(2560,ih)'" in " ".join(
+            optimizer.pool.ffmpeg.call_args.args
+        )
+
+    @pytest.mark.asyncio
+    async def test_insufficient_saving_keeps_original_and_is_remembered(self, tmp_path):
+        optimizer = _optimizer(1950)
+        fi = _file(tmp_path, png(2000, 1000, size=2000))
+
+        assert await optimizer.optimize(URL, fi) is None
+        assert await optimizer.optimize(URL, fi) is None
+        assert optimizer.pool.ffmpeg.await_count == 1
+        assert [p.name for p in tmp_path.iterdir()] == ["photo.png"]
+
+    @pytest.mark.asyncio
+    async def test_in_memory_payload_is_spilled_for_encoding(self, tmp_path):
+        optimizer = _optimizer(100)
+        data = png(3000, 3000, size=1500)
+        fi = FileInfo(path=tmp_path / "photo.png", size=len(data), original_url=URL, data=data)
+
+        result = await optimizer.optimize(URL, fi)
+
+        assert result.size == 100
+        assert [p.name for p in tmp_path.iterdir()] == [result.path.name]
+
+    @pytest.mark.asyncio
+    async def test_failed_encode_keeps_original(self, tmp_path):
+        optimizer = _optimizer(100)
+        optimizer.pool.ffmpeg = AsyncMock(side_effect=RuntimeError("boom"))
+        fi = _file(tmp_path, png(3000, 3000, size=1500))
+
+        assert await optimizer.optimize(URL, fi) is None
+        assert fi.path.exists()
+
+    @pytest.mark.asyncio
+    async def test_optimized_photo_is_served_from_cache(self, tmp_path):
+        cache = MediaCache(tmp_path / "cache", 10_000)
+        storage = tmp_path / "storage"
+        storage.mkdir()
+        optimizer = _optimizer(300, cache=cache)
+
+        await optimizer.optimize(URL, _file(storage, png(6000, 4000, size=800)))
+        result = await optimizer.optimize(URL, _file(storage, png(6000, 4000, size=800)))
+
+        assert optimizer.pool.ffmpeg.await_count == 1
+        assert result.size == 300
+        assert result.original_url == URL
+        assert [p.name for p in storage.iterdir()] == [result.path.name]
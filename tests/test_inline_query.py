@@ -332,3 +332,137 @@ class TestInlineQueryLocale:
         results = update.inline_query.answer.call_args[0][0]
         msg_text = results[0].input_message_content.message_text
         assert "not responsible for its content" in msg_text
+
+
+class TestInlineQueryPagination:
+    def _gallery(self, count: int):
+        from core.domain.entity import Content, Photo
+
+        return Content(
+            backlink=MagicMock(url="https://example.com/post/1"),
+            media=[Photo(resource_url=f"http://cdn.test/{i}.jpg") for i in range(count)],
+        )
+
+    @pytest.mark.asyncio
+    async def test_first_page_validates_only_page_media_and_sets_next_offset(self):
+        from telegram import InlineQueryResultPhoto
+
+        handler = _make_handler()
+        handler.page_size = 3
+        handler.parser.parse = MagicMock(return_value=self._gallery(7))
+
+        update = _make_update_with_query("https://example.com/post/1")
+        update.inline_query.offset = ""
+        await handler.handle(update, None)
+
+        assert handler.file_validator.validate_size.await_count == 3
+        args, kwargs = update.inline_query.answer.call_args
+        photos = [r for r in args[0] if isinstance(r, InlineQueryResultPhoto)]
+        assert [p.photo_url for p in photos] == [f"http://cdn.test/{i}.jpg" for i in range(3)]
+        assert kwargs["next_offset"] == "3"
+
+    @pytest.mark.asyncio
+    async def test_follow_up_page_reuses_cached_content(self):
+        from telegram import InlineQueryResultArticle, InlineQueryResultPhoto
+
+        handler = _make_handler()
+        handler.page_size = 3
+        handler.parser.parse = MagicMock(return_value=self._gallery(7))
+
+        first = _make_update_with_query("https://example.com/post/1")
+        first.inline_query.offset = ""
+        await handler.handle(first, None)
+
+        last = _make_update_with_query("https://example.com/post/1")
+        last.inline_query.offset = "6"
+        await handler.handle(last, None)
+
+        handler.parser.parse.assert_called_once()
+        args, kwargs = last.inline_query.answer.call_args
+        assert not any(isinstance(r, InlineQueryResultArticle) for r in args[0])
+        photos = [r for r in args[0] if isinstance(r, InlineQueryResultPhoto)]
+        assert [p.photo_url for p in photos] == ["http://cdn.test/6.jpg"]
+        assert kwargs["next_offset"] == ""
+        assert handler.analytics.log.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_follow_up_page_reparses_on_cache_miss(self):
+        handler = _make_handler()
+        handler.page_size = 3
+        handler.parser.parse = MagicMock(return_value=self._gallery(5))
+
+        update = _make_update_with_query("https://example.com/post/1")
+        update.inline_query.offset = "3"
+        await handler.handle(update, None)
+
+        handler.parser.parse.assert_called_once()
+        assert update.inline_query.answer.call_args.kwargs["next_offset"] == ""
+
+    def test_content_cache_is_bounded(self):
+        handler = _make_handler()
+        handler.cache_size = 2
+
+        for i in range(3):
+            handler._remember_content(f"https://example.com/{i}", self._gallery(1))
+
+        assert list(handler._content_cache) == ["https://example.com/1", "https://example.com/2"]
+
+
+class TestInlineVideoVariants:
+    @pytest.mark.asyncio
+    async def test_video_uses_variant_under_inline_limit(self):
+        from telegram import InlineQueryResultVideo
+
+        from core.domain.entity import Content, Video, VideoVariant
+
+        handler = _make_handler()
+        handler.file_validator.max_bytes = 20 * 1024 * 1024
+        video = Video(
+            resource_url="http://cdn.test/1080.mp4",
+            mime_type="video/mp4",
+            thumbnail_url="http://cdn.test/thumb.jpg",
+            duration=60,
+            variants=[
+                VideoVariant("http://cdn.test/1080.mp4", bitrate=8_000_000),
+                VideoVariant("http://cdn.test/480.mp4", bitrate=1_000_000),
+            ],
+        )
+        content = Content(backlink=MagicMock(url="https://x.com/u/status/1"), media=[video])
+        handler.parser.parse = MagicMock(return_value=content)
+
+        update = _make_update_with_query("https://x.com/u/status/1")
+        update.inline_query.offset = ""
+        await handler.handle(update, None)
+
+        handler.file_validator.validate_size.assert_awaited_once_with("http://cdn.test/480.mp4")
+        results = update.inline_query.answer.call_args.args[0]
+        videos = [r for r in results if isinstance(r, InlineQueryResultVideo)]
+        assert [v.video_url for v in videos] == ["http://cdn.test/480.mp4"]
+
+    @pytest.mark.asyncio
+    async def test_reported_oversize_is_skipped_without_request(self):
+        from telegram import InlineQueryResultVideo
+
+        from core.domain.entity import Content, Video, VideoVariant
+
+        handler = _make_handler()
+        handler.file_validator.max_bytes = 20 * 1024 * 1024
+        video = Video(
+            resource_url="http://cdn.test/1080.mp4",
+            mime_type="video/mp4",
+            thumbnail_url="http://cdn.test/thumb.jpg",
+            duration=600,
+            variants=[
+                VideoVariant("http://cdn.test/1080.mp4", bitrate=8_000_000, size=600_000_000)
+            ],
+        )
+        content = Content(backlink=MagicMock(url="https://x.com/u/status/1"), media=[video])
+        handler.parser.parse = MagicMock(return_value=content)
+
+        update = _make_update_with_query("https://x.com/u/status/1")
+        update.inline_query.offset = ""
+        await handler.handle(update, None)
+
+        handler.file_validator.validate_size.assert_not_called()
+        results = update.inline_query.answer.call_args.args[0]
+        assert not any(isinstance(r, InlineQueryResultVideo) for r in results)
@@ -0,0 +1,164 @@
+"""
+Tests for MediaCache and its use by FileResolver.
+
+Cached files are handed out as links so TelegramDelivery can still unlink
+the returned path after sending without damaging the cache.
+"""
+
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from core.domain.entity import FileInfo, VideoMeta
+from infra.files.cache import MediaCache
+
+
+def _downloaded(tmp_path, name: str, size: int) -> FileInfo:
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return FileInfo(path=path, size=size)
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    cache_dir = tmp_path / "cache"
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+    return cache_dir, work_dir
+
+
+class TestMediaCache:
+    @pytest.mark.asyncio
+    async def test_miss_returns_none(self, dirs):
+        cache_dir, work_dir = dirs
+        cache = MediaCache(cache_dir, max_bytes=100)
+
+        assert await cache.get("http://cdn.test/a.jpg", work_dir / "a.jpg") is None
+
+    @pytest.mark.asyncio
+    async def test_hit_survives_unlink_of_handed_out_path(self, dirs):
+        cache_dir, work_dir = dirs
+        cache = MediaCache(cache_dir, max_bytes=100)
+        fi = _downloaded(work_dir, "a.jpg", 10)
+
+        await cache.put("http://cdn.test/a.jpg", fi)
+        fi.path.unlink()
+
+        hit = await cache.get("http://cdn.test/a.jpg", work_dir / "a.jpg")
+        assert hit is not None
+        assert hit.size == 10
+        assert hit.mime_type == "image/jpeg"
+        assert hit.path.read_bytes() == b"x" * 10
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used_over_budget(self, dirs):
+        cache_dir, work_dir = dirs
+        cache = MediaCache(cache_dir, max_bytes=25)
+
+        await cache.put("http://cdn.test/a", _downloaded(work_dir, "a", 10))
+        await cache.put("http://cdn.test/b", _downloaded(work_dir, "b", 10))
+        await cache.get("http://cdn.test/a", work_dir / "a2")
+        await cache.put("http://cdn.test/c", _downloaded(work_dir, "c", 10))
+
+        assert await cache.get("http://cdn.test/b", work_dir / "b2") is None
+        assert await cache.get("http://cdn.test/a", work_dir / "a3") is not None
+        assert cache.total_bytes == 20
+
+    @pytest.mark.asyncio
+    async def test_skips_files_larger_than_budget(self, dirs):
+        cache_dir, work_dir = dirs
+        cache = MediaCache(cache_dir, max_bytes=5)
+
+        await cache.put("http://cdn.test/a", _downloaded(work_dir, "a", 10))
+
+        assert cache.total_bytes == 0
+        assert list(cache_dir.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_janitor_restores_entries_and_removes_orphans(self, dirs):
+        cache_dir, work_dir = dirs
+        cache = MediaCache(cache_dir, max_bytes=100)
+        await cache.put("http://cdn.test/v.mp4", _downloaded(work_dir, "v.mp4", 10))
+        await cache.set_video_meta("http://cdn.test/v.mp4", VideoMeta(640, 480, 12))
+        orphan, dangling, leftover = (MediaCache.key(f"http://cdn.test/{n}") for n in "odl")
+        (cache_dir / f"{orphan}.bin").write_bytes(b"o")
+        (cache_dir / f"{dangling}.json").write_text("{}")
+        (cache_dir / f"{leftover}.tmp").write_text("")
+        (cache_dir / "notes.txt").write_text("not ours")
+
+        restored = MediaCache(cache_dir, max_bytes=100)
+        restored.janitor()
+
+        names = sorted(p.name for p in cache_dir.iterdir())
+        key = MediaCache.key("http://cdn.test/v.mp4")
+        assert names == sorted([f"{key}.bin", f"{key}.json", "notes.txt"])
+        hit = await restored.get("http://cdn.test/v.mp4", work_dir / "v2.mp4")
+        assert hit.video_meta == VideoMeta(640, 480, 12)
+
+
+class TestFileResolverCache:
+    @pytest.mark.asyncio
+    async def test_download_to_a_cached_path_leaves_the_cache_intact(self, dirs):
+        from infra.files.resolver import FileResolver
+        from infra.files.storage import LocalStorage
+
+        cache_dir, work_dir = dirs
+        payloads = {"http://a.test/DASH_720.mp4": b"first", "http://b.test/DASH_720.mp4": b"other"}
+
+        async def fake_download(url, dest, max_bytes=None):
+            tmp = f"{dest}.part"
+            with open(tmp, "wb") as f:
+                f.write(payloads[url])
+            os.replace(tmp, dest)
+            return len(payloads[url])
+
+        validator = MagicMock()
+        validator.validate_size = AsyncMock()
+        downloader = MagicMock()
+        downloader.safe_filename = MagicMock(return_value="DASH_720.mp4")
+        downloader.download = AsyncMock(side_effect=fake_download)
+        resolver = FileResolver(
+            validator,
+            downloader,
+            LocalStorage(work_dir),
+            cache=MediaCache(cache_dir, max_bytes=100),
+        )
+
+        await resolver.resolve("http://a.test/DASH_720.mp4")
+        await resolver.resolve("http://b.test/DASH_720.mp4")
+        hit = await resolver.resolve("http://a.test/DASH_720.mp4")
+
+        assert hit.path.read_bytes() == b"first"
+
+    @pytest.mark.asyncio
+    async def test_second_resolve_is_served_from_cache(self, dirs):
+        from infra.files.resolver import FileResolver
+        from infra.files.storage import LocalStorage
+
+        cache_dir, work_dir = dirs
+
+        async def fake_download(url, dest, max_bytes=None):
+            with open(dest, "wb") as f:
+                f.write(b"payload")
+            return 7
+
+        validator = MagicMock()
+        validator.validate_size = AsyncMock()
+        downloader = MagicMock()
+        downloader.safe_filename = MagicMock(return_value="file.jpg")
+        downloader.download = AsyncMock(side_effect=fake_download)
+        resolver = FileResolver(
+            validator,
+            downloader,
+            LocalStorage(work_dir),
+            cache=MediaCache(cache_dir, max_bytes=100),
+        )
+
+        first = await resolver.resolve("http://cdn.test/file.jpg")
+        first.path.unlink()
+        second = await resolver.resolve("http://cdn.test/file.jpg")
+
+        downloader.download.assert_awaited_once()
+        assert second.path.read_bytes() == b"payload"
+        assert second.size == 7
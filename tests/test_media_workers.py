@@ -0,0 +1,65 @@
+"""
+Tests for the bounded ffmpeg/ffprobe worker pool.
+
+The Python interpreter stands in for ffmpeg so the tests run without it.
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from infra.media.exception import MediaProcessError, MediaTimeoutError
+from infra.media.workers import MediaWorkerPool
+
+
+def _python(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+class TestMediaWorkerPool:
+    @pytest.mark.asyncio
+    async def test_returns_stdout(self):
+        pool = MediaWorkerPool()
+
+        assert await pool.run(_python("print('ok')")) == b"ok\n"
+        assert pool.stats.completed == 1
+
+    @pytest.mark.asyncio
+    async def test_hung_process_is_killed_on_timeout(self):
+        pool = MediaWorkerPool()
+
+        with pytest.raises(MediaTimeoutError):
+            await pool.run(_python("import time; time.sleep(30)"), timeout=0.2)
+
+        assert pool.stats.timed_out == 1
+        assert pool.stats.running == 0
+
+    @pytest.mark.asyncio
+    async def test_non_zero_exit_raises_with_stderr(self):
+        pool = MediaWorkerPool()
+
+        with pytest.raises(MediaProcessError, match="moov atom not found"):
+            await pool.run(_python("import sys; sys.exit('moov atom not found')"))
+
+        assert pool.stats.failed == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        pool = MediaWorkerPool(max_workers=2)
+        peak = 0
+
+        async def watch():
+            nonlocal peak
+            while True:
+                peak = max(peak, pool.stats.running)
+                await asyncio.sleep(0.01)
+
+        watcher = asyncio.create_task(watch())
+        await asyncio.gather(*[pool.run(_python("import time; time.sleep(0.2)")) for _ in range(4)])
+        watcher.cancel()
+
+        assert peak == 2
+        assert pool.stats.completed == 4
+        assert pool.stats.max_wait_seconds > 0.1
+        assert pool.stats.queued == 0
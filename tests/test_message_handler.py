@@ -10,19 +10,20 @@ exceptions inside _send_content are not silently swallowed.
 """
 
 import asyncio
+from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from core.domain.entity import GIF, Content, FileInfo, Link, Photo, PipelineResult
+from core.domain.entity import GIF, Content, FileInfo, Link, Photo, PipelineResult, Video
 from core.exceptions import InvalidUrlError, ParserNotFoundError
 from platforms.telegram.message import MessageHandler, TelegramDelivery
 
 
-def _make_delivery():
+def _make_delivery(**kwargs):
     from platforms.telegram.renderer import MessageRenderer
 
-    return TelegramDelivery(renderer=MessageRenderer())
+    return TelegramDelivery(renderer=MessageRenderer(), **kwargs)
 
 
 # ---------------------------------------------------------------------------
@@ -118,6 +119,40 @@ class TestGifSentSeparately:
         message.reply_media_group.assert_called_once()
         message.reply_animation.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_mp4_animation_joins_media_group(self, tmp_path):
+        photo_path = tmp_path / "photo.jpg"
+        gif_path = tmp_path / "anim.mp4"
+        photo_path.write_bytes(b"\xff\xd8\xff" + b"\x00" * 100)
+        gif_path.write_bytes(b"\x00" * 16)
+        gif = GIF(
+            resource_url="http://cdn.test/anim.gif",
+            mime_type="image/gif",
+            thumbnail_url="http://cdn.test/thumb.jpg",
+        )
+        photo = Photo(resource_url="http://cdn.test/photo.jpg")
+
+        delivery = _make_delivery()
+        result = PipelineResult(
+            content=Content(backlink=Link(url="https://x.com/u/status/1"), media=[photo, gif]),
+            resolved_media=[
+                (photo, FileInfo(path=photo_path, size=103, mime_type="image/jpeg")),
+                (gif, FileInfo(path=gif_path, size=16, mime_type="video/mp4")),
+            ],
+        )
+
+        message = MagicMock()
+        message.reply_media_group = AsyncMock()
+        message.reply_animation = AsyncMock()
+        message.reply_text = AsyncMock()
+
+        await delivery.send(message, result)
+
+        message.reply_animation.assert_not_called()
+        message.reply_media_group.assert_called_once()
+        group = message.reply_media_group.call_args.args[0]
+        assert [type(m).__name__ for m in group] == ["InputMediaPhoto", "InputMediaVideo"]
+
     @pytest.mark.asyncio
     async def test_caption_is_sent_even_when_only_gif(self, tmp_path):
         gif_path = tmp_path / "anim.mp4"
@@ -160,6 +195,255 @@ class TestGifSentSeparately:
         assert call_kwargs.get("caption") is not None
 
 
+class TestInMemoryMedia:
+    @pytest.mark.asyncio
+    async def test_photo_with_data_is_uploaded_from_memory(self, tmp_path):
+        delivery = _make_delivery()
+        photo = Photo(resource_url="http://cdn.test/photo.jpg")
+        missing_path = tmp_path / "photo.jpg"
+        result = PipelineResult(
+            content=Content(backlink=Link(url="https://x.com/u/status/1"), media=[photo]),
+            resolved_media=[
+                (photo, FileInfo(path=missing_path, size=4, data=b"jpeg")),
+            ],
+        )
+
+        message = MagicMock()
+        message.reply_media_group = AsyncMock()
+        message.reply_text = AsyncMock()
+
+        await delivery.send(message, result)
+
+        media = message.reply_media_group.call_args[0][0]
+        assert media[0].media.input_file_content == b"jpeg"
+        assert not missing_path.exists()
+
+
+class TestLocalMode:
+    @pytest.mark.asyncio
+    async def test_local_file_is_passed_by_path(self, tmp_path):
+        delivery = _make_delivery(local_mode=True)
+        photo = Photo(resource_url="http://cdn.test/photo.jpg")
+        path = tmp_path / "photo.jpg"
+        path.write_bytes(b"jpeg")
+        result = PipelineResult(
+            content=Content(backlink=Link(url="https://x.com/u/status/1"), media=[photo]),
+            resolved_media=[(photo, FileInfo(path=path, size=4))],
+        )
+
+        message = MagicMock()
+        message.reply_media_group = AsyncMock()
+        message.reply_text = AsyncMock()
+
+        with patch("builtins.open") as opened:
+            await delivery.send(message, result)
+
+        opened.assert_not_called()
+        media = message.reply_media_group.call_args[0][0]
+        assert media[0].media == path.absolute().as_uri()
+        assert not path.exists()
+
+
+class TestScheduledSends:
+    @pytest.mark.asyncio
+    @pytest.mark.filterwarnings("ignore::telegram.warnings.PTBDeprecationWarning")
+    async def test_flood_wait_is_retried(self):
+        from telegram.error import RetryAfter
+
+        from platforms.telegram.scheduler import SendScheduler
+
+        delivery = _make_delivery(scheduler=SendScheduler())
+        photo = Photo(resource_url="http://cdn.test/photo.jpg")
+        result = PipelineResult(
+            content=Content(backlink=Link(url="https://x.com/u/status/1"), media=[photo]),
+            resolved_media=[(photo, FileInfo(path=Path("photo.jpg"), size=4, data=b"jpeg"))],
+        )
+
+        message = MagicMock()
+        message.reply_media_group = AsyncMock(side_effect=[RetryAfter(0), None])
+        message.reply_text = AsyncMock()
+
+        await delivery.send(message, result)
+
+        assert message.reply_media_group.await_count == 2
+
+
+class TestRemoteMedia:
+    def _result(self):
+        photo = Photo(resource_url="https://pbs.twimg.com/media/a.jpg")
+        fi = FileInfo(
+            path=Path("/nonexistent/a.jpg"),
+            size=1000,
+            original_url=photo.resource_url,
+            remote=True,
+        )
+        return PipelineResult(
+            content=Content(backlink=Link(url="https://x.com/u/status/1"), media=[photo]),
+            resolved_media=[(photo, fi)],
+        )
+
+    @pytest.mark.asyncio
+    async def test_remote_photo_is_sent_by_url(self):
+        delivery = _make_delivery()
+        message = MagicMock()
+        message.reply_media_group = AsyncMock()
+        message.reply_text = AsyncMock()
+
+        await delivery.send(message, self._result())
+
+        media = message.reply_media_group.call_args[0][0]
+        assert media[0].media == "https://pbs.twimg.com/media/a.jpg"
+
+    @pytest.mark.asyncio
+    async def test_rejected_url_falls_back_to_upload(self, tmp_path):
+        from telegram.error import BadRequest
+
+        from platforms.telegram.renderer import MessageRenderer
+
+        downloaded = tmp_path / "a.jpg"
+        downloaded.write_bytes(b"jpeg")
+        resolver = MagicMock()
+        resolver.resolve = AsyncMock(return_value=FileInfo(path=downloaded, size=4))
+        delivery = TelegramDelivery(renderer=MessageRenderer(), resolver=resolver)
+        message = MagicMock()
+        message.reply_media_group = AsyncMock(
+            side_effect=[BadRequest("Failed to get HTTP URL content"), None]
+        )
+        message.reply_text = AsyncMock()
+
+        await delivery.send(message, self._result())
+
+        resolver.resolve.assert_awaited_once_with(
+            "https://pbs.twimg.com/media/a.jpg", buffered=True
+        )
+        assert message.reply_media_group.await_count == 2
+        retried = message.reply_media_group.call_args[0][0]
+        assert retried[0].media.filename == "a.jpg"
+        assert message.reply_media_group.call_args.kwargs["caption"] is not None
+        assert not downloaded.exists()
+
+    @pytest.mark.asyncio
+    async def test_other_bad_request_is_not_retried(self):
+        from telegram.error import BadRequest
+
+        from platforms.telegram.renderer import MessageRenderer
+
+        resolver = MagicMock()
+        resolver.resolve = AsyncMock()
+        delivery = TelegramDelivery(renderer=MessageRenderer(), resolver=resolver)
+        message = MagicMock()
+        message.reply_media_group = AsyncMock(side_effect=BadRequest("Message caption is too long"))
+        message.reply_text = AsyncMock()
+
+        await delivery.send(message, self._result())
+
+        resolver.resolve.assert_not_called()
+        assert message.reply_media_group.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_download_is_not_resent(self):
+        from telegram.error import BadRequest
+
+        from platforms.telegram.renderer import MessageRenderer
+
+        resolver = MagicMock()
+        resolver.resolve = AsyncMock(side_effect=RuntimeError("connection reset"))
+        delivery = TelegramDelivery(renderer=MessageRenderer(), resolver=resolver)
+        message = MagicMock()
+        message.reply_media_group = AsyncMock(
+            side_effect=BadRequest("Wrong file identifier/HTTP URL specified")
+        )
+        message.reply_text = AsyncMock()
+
+        await delivery.send(message, self._result())
+
+        resolver.resolve.assert_awaited_once()
+        assert message.reply_media_group.await_count == 1
+
+
+class TestStreamedMedia:
+    def _result(self, tmp_path, stream):
+        photo = Photo(resource_url="http://cdn.test/photo.jpg")
+        video = Video(
+            resource_url="http://cdn.test/video.mp4",
+            mime_type="video/mp4",
+            thumbnail_url="http://cdn.test/thumb.jpg",
+        )
+        photo_path = tmp_path / "photo.jpg"
+        photo_path.write_bytes(b"jpeg")
+        return PipelineResult(
+            content=Content(backlink=Link(url="https://x.com/u/status/1"), media=[photo, video]),
+            resolved_media=[
+                (photo, FileInfo(path=photo_path, size=4)),
+                (video, FileInfo(path=tmp_path / "video.mp4", size=1 << 30, stream=stream)),
+            ],
+        )
+
+    def _message(self):
+        message = MagicMock()
+        message.chat_id = 42
+        message.message_id = 7
+        message.reply_media_group = AsyncMock()
+        message.reply_text = AsyncMock()
+        return message
+
+    @pytest.mark.asyncio
+    async def test_streamed_video_goes_through_uploader_with_caption(self, tmp_path):
+        from platforms.telegram.renderer import MessageRenderer
+
+        uploader = MagicMock()
+        uploader.send_video = AsyncMock()
+        stream = MagicMock()
+        stream.close = AsyncMock()
+        delivery = TelegramDelivery(renderer=MessageRenderer(), uploader=uploader)
+        message = self._message()
+
+        await delivery.send(message, self._result(tmp_path, stream))
+
+        media = message.reply_media_group.call_args[0][0]
+        assert len(media) == 1
+        assert message.reply_media_group.call_args.kwargs["caption"] is None
+        args = uploader.send_video.call_args
+        assert args.args[:4] == (42, 7, stream, "video.mp4")
+        assert args.kwargs["caption"] is not None
+        stream.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_streamed_video_is_skipped_without_uploader(self, tmp_path):
+        stream = MagicMock()
+        stream.close = AsyncMock()
+        message = self._message()
+
+        await _make_delivery().send(message, self._result(tmp_path, stream))
+
+        assert message.reply_media_group.call_args.kwargs["caption"] is not None
+        stream.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_stream_is_closed_when_rendering_fails(self, tmp_path):
+        stream = MagicMock()
+        stream.close = AsyncMock()
+        delivery = _make_delivery()
+        delivery.renderer = MagicMock()
+        delivery.renderer.render_with_link.side_effect = ValueError("bad markup")
+
+        with pytest.raises(ValueError):
+            await delivery.send(self._message(), self._result(tmp_path, stream))
+
+        stream.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_discard_closes_streams_and_removes_files(self, tmp_path):
+        stream = MagicMock()
+        stream.close = AsyncMock()
+        result = self._result(tmp_path, stream)
+
+        await _make_delivery().discard(result)
+
+        stream.close.assert_awaited_once()
+        assert not (tmp_path / "photo.jpg").exists()
+
+
 # ---------------------------------------------------------------------------
 # task done-callback
 # ---------------------------------------------------------------------------
@@ -262,6 +546,53 @@ def _make_context():
 
 
 class TestMessageHandlerHandle:
+    @pytest.mark.asyncio
+    async def test_success_spawns_tracked_delivery(self):
+        from platforms.telegram.tasks import DeliveryTasks
+
+        handler = _make_handler(FakePipeline())
+        handler.tasks = DeliveryTasks(max_running=1)
+        update, msg = _make_update("https://example.com/post/1")
+
+        await handler.handle(update, _make_context())
+        await handler.tasks.drain(timeout=1)
+
+        handler.delivery.send.assert_awaited_once()
+        assert handler.tasks.stats.completed == 1
+        events = handler.analytics.log.call_args[0][0]
+        delivery = next(e for e in events if e.name == "delivery")
+        assert delivery["in_flight"] == 1
+        assert delivery["wait_msec"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_update_load_is_logged(self):
+        from platforms.telegram.updates import UpdateProcessorStats
+
+        handler = _make_handler(FakePipeline())
+        handler.updates = UpdateProcessorStats(limit=8, running=3, waiting=2)
+        update, msg = _make_update("https://example.com/post/1")
+
+        await handler.handle(update, _make_context())
+
+        events = handler.analytics.log.call_args[0][0]
+        updates = next(e for e in events if e.name == "updates")
+        assert (updates["running"], updates["waiting"]) == (3, 2)
+
+    @pytest.mark.asyncio
+    async def test_refused_delivery_is_discarded_without_reply(self):
+        from platforms.telegram.tasks import DeliveryTasks
+
+        handler = _make_handler(FakePipeline())
+        handler.delivery.discard = AsyncMock()
+        handler.tasks = DeliveryTasks()
+        await handler.tasks.drain(timeout=1)
+        update, msg = _make_update("https://example.com/post/1")
+
+        await handler.handle(update, _make_context())
+
+        handler.delivery.discard.assert_awaited_once_with(handler.pipeline.result)
+        msg.reply_text.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_invalid_url_replies_and_logs_exception_event(self):
         pipeline = FakeFailingPipeline(InvalidUrlError())
@@ -279,6 +610,25 @@ class TestMessageHandlerHandle:
         log_call = handler.analytics.log.call_args[0][0]
         assert any(e.name == "exception" for e in log_call)
 
+    @pytest.mark.asyncio
+    async def test_replies_and_typing_go_through_the_scheduler(self):
+        from platforms.telegram.scheduler import SendScheduler
+
+        handler = _make_handler(FakeFailingPipeline(InvalidUrlError()))
+        handler.scheduler = SendScheduler()
+        handler.scheduler.run = AsyncMock()
+        update, msg = _make_update("not a url")
+        update.effective_chat.id = 7
+        msg.chat_id = 7
+
+        await handler.handle(update, _make_context())
+        await asyncio.sleep(0)
+
+        calls = handler.scheduler.run.await_args_list
+        assert len(calls) == 2
+        assert all(c.args[0] == 7 and c.args[2] == SendScheduler.TEXT for c in calls)
+        msg.reply_text.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_parser_not_found_replies_and_logs_hostname(self):
         pipeline = FakeFailingPipeline(ParserNotFoundError("no parser"))
@@ -385,3 +735,22 @@ class TestMessageHandlerHandle:
         page_view_calls = [a for a in args if a[0][0].name == "page_view"]
         assert len(page_view_calls) == 1
         assert page_view_calls[0][0][0]["page_location"] == "https://example.com/post"
+
+    @pytest.mark.asyncio
+    async def test_pipeline_runs_with_user_as_download_owner(self):
+        from infra.files.bandwidth import download_owner
+
+        seen = []
+
+        class OwnerRecordingPipeline(FakePipeline):
+            async def run(self, url: str) -> PipelineResult:
+                seen.append(download_owner.get())
+                return self.result
+
+        handler = _make_handler(OwnerRecordingPipeline())
+        update, msg = _make_update("https://example.com/post")
+
+        await handler.handle(update, _make_context())
+
+        assert seen == [42]
+        assert download_owner.get() is None
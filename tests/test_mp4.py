@@ -0,0 +1,361 @@
+"""
+Tests for the ISO-BMFF (MP4) box reader, remote probing and the VideoProcessor fallback.
+
+Boxes are built by hand so the parser is checked without sample media.
+"""
+
+import struct
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from infra.media.entity import VideoMeta
+from infra.media.mp4 import find_moov, iter_boxes, moov_at_end, read_meta, read_meta_from_head
+
+
+def box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def mvhd(timescale: int, duration: int) -> bytes:
+    return box(
+        b"mvhd", bytes(4) + struct.pack(">III", 0, 0, timescale) + struct.pack(">I", duration)
+    )
+
+
+def tkhd(width: int, height: int) -> bytes:
+    # version/flags, times, track id, reserved, duration, reserved, layer..matrix
+    head = bytes(4) + bytes(20) + bytes(8 + 2 + 2 + 2 + 2 + 36)
+    return box(b"tkhd", head + struct.pack(">II", width << 16, height << 16))
+
+
+def hdlr(handler: bytes) -> bytes:
+    return box(b"mdia", box(b"hdlr", bytes(8) + handler + bytes(12)))
+
+
+def movie(*tracks: bytes, timescale: int = 1000, duration: int = 12_400) -> bytes:
+    return box(b"moov", mvhd(timescale, duration) + b"".join(box(b"trak", t) for t in tracks))
+
+
+def mp4_file(path, *tracks: bytes, mdat_bytes: int = 1024, moov_first: bool = False) -> None:
+    """Write an MP4 skeleton; the default layout puts moov after mdat like most cameras."""
+    moov = movie(*tracks)
+    mdat = box(b"mdat", b"\x00" * mdat_bytes)
+    ftyp = box(b"ftyp", b"isom\x00\x00\x02\x00")
+    path.write_bytes(ftyp + (moov + mdat if moov_first else mdat + moov))
+
+
+class TestIterBoxes:
+    def test_yields_top_level_boxes(self):
+        data = box(b"ftyp", b"isom") + box(b"free", b"") + box(b"mdat", b"xx")
+
+        assert [t for t, _, _ in iter_boxes(data)] == [b"ftyp", b"free", b"mdat"]
+
+    def test_stops_at_truncated_box(self):
+        data = box(b"ftyp", b"isom") + box(b"moov", b"x" * 32)[:20]
+
+        assert [t for t, _, _ in iter_boxes(data)] == [b"ftyp"]
+        assert find_moov(data) is None
+
+
+class TestReadMetaFromHead:
+    def test_reads_duration_and_video_track_dimensions(self):
+        data = box(b"ftyp", b"isom") + movie(tkhd(0, 0), tkhd(1280, 720)) + box(b"mdat", b"")
+
+        meta = read_meta_from_head(data)
+
+        assert (meta.width, meta.height, meta.duration) == (1280, 720, 12)
+
+    def test_moov_after_mdat_outside_head_is_not_found(self):
+        data = box(b"ftyp", b"isom") + box(b"mdat", b"\x00" * 64) + movie(tkhd(640, 360))
+
+        assert read_meta_from_head(data[:40]) is None
+
+
+class TestReadMeta:
+    def test_moov_after_mdat(self, tmp_path):
+        path = tmp_path / "v.mp4"
+        mp4_file(path, tkhd(0, 0) + hdlr(b"soun"), tkhd(1920, 1080) + hdlr(b"vide"))
+
+        assert read_meta(path) == VideoMeta(1920, 1080, 12)
+
+    def test_video_track_wins_over_other_sized_tracks(self, tmp_path):
+        path = tmp_path / "v.mov"
+        mp4_file(path, tkhd(640, 80) + hdlr(b"text"), tkhd(1280, 720) + hdlr(b"vide"))
+
+        assert read_meta(path) == VideoMeta(1280, 720, 12)
+
+    def test_fragmented_duration_is_unknown(self, tmp_path):
+        path = tmp_path / "v.mp4"
+        path.write_bytes(box(b"ftyp", b"iso5") + movie(tkhd(640, 360), duration=0))
+
+        assert read_meta(path).duration is None
+
+    def test_moov_position(self, tmp_path):
+        tail, head = tmp_path / "tail.mp4", tmp_path / "head.mp4"
+        mp4_file(tail, tkhd(640, 360))
+        mp4_file(head, tkhd(640, 360), moov_first=True)
+
+        assert moov_at_end(tail)
+        assert not moov_at_end(head)
+
+    def test_other_containers_are_not_read(self, tmp_path):
+        path = tmp_path / "v.webm"
+        path.write_bytes(b"\x1a\x45\xdf\xa3" + b"\x00" * 64)
+
+        assert read_meta(path) is None
+
+
+class TestVideoProcessor:
+    def _processor(self, tmp_path):
+        from infra.files.storage import LocalStorage
+        from infra.media.processor import VideoProcessor
+
+        return VideoProcessor(LocalStorage(tmp_path))
+
+    @pytest.mark.asyncio
+    async def test_mp4_is_read_without_ffprobe(self, tmp_path):
+        path = tmp_path / "v.mp4"
+        mp4_file(path, tkhd(1280, 720) + hdlr(b"vide"))
+
+        processor = self._processor(tmp_path)
+        with patch.object(processor.pool, "probe") as probe:
+            meta = await processor.process_video(path)
+
+        assert meta == VideoMeta(1280, 720, 12)
+        probe.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unreadable_container_falls_back_to_ffprobe(self, tmp_path):
+        path = tmp_path / "v.webm"
+        path.write_bytes(b"\x1a\x45\xdf\xa3" + b"\x00" * 64)
+        probe_result = {"streams": [{"codec_type": "video", "width": 320, "height": 240}]}
+
+        processor = self._processor(tmp_path)
+        with patch.object(processor.pool, "probe", AsyncMock(return_value=probe_result)) as probe:
+            meta = await processor.process_video(path)
+
+        assert meta == VideoMeta(320, 240, None)
+        probe.assert_awaited_once()
+
+
+class TestFaststart:
+    def _processor(self, tmp_path):
+        from infra.files.storage import LocalStorage
+        from infra.media.processor import VideoProcessor
+
+        return VideoProcessor(LocalStorage(tmp_path))
+
+    @pytest.mark.asyncio
+    async def test_tail_moov_is_remuxed_in_place(self, tmp_path):
+        path = tmp_path / "v.mp4"
+        mp4_file(path, tkhd(640, 360))
+        processor = self._processor(tmp_path)
+
+        async def fake_ffmpeg(*args, **kwargs):
+            assert "+faststart" in args and "copy" in args
+            mp4_file(Path(args[-1]), tkhd(640, 360), moov_first=True)
+            return b""
+
+        with patch.object(processor.pool, "ffmpeg", side_effect=fake_ffmpeg):
+            assert await processor.faststart(path)
+
+        assert not moov_at_end(path)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["v.mp4"]
+
+    @pytest.mark.asyncio
+    async def test_streamable_file_is_left_alone(self, tmp_path):
+        path = tmp_path / "v.mp4"
+        mp4_file(path, tkhd(640, 360), moov_first=True)
+        processor = self._processor(tmp_path)
+
+        with patch.object(processor.pool, "ffmpeg") as ffmpeg:
+            assert not await processor.faststart(path)
+
+        ffmpeg.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_remux_keeps_original(self, tmp_path):
+        from infra.media.exception import MediaTimeoutError
+
+        path = tmp_path / "v.mp4"
+        mp4_file(path, tkhd(640, 360))
+        original = path.read_bytes()
+        processor = self._processor(tmp_path)
+
+        async def hung_ffmpeg(*args, **kwargs):
+            Path(args[-1]).write_bytes(b"partial")
+            raise MediaTimeoutError("ffmpeg timed out")
+
+        with patch.object(processor.pool, "ffmpeg", side_effect=hung_ffmpeg):
+            assert not await processor.faststart(path)
+
+        assert path.read_bytes() == original
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["v.mp4"]
+
+
+class TestConvertGif:
+    def _processor(self, tmp_path):
+        from infra.files.storage import LocalStorage
+        from infra.media.processor import VideoProcessor
+
+        return VideoProcessor(LocalStorage(tmp_path))
+
+    @pytest.mark.asyncio
+    async def test_gif_is_replaced_by_mp4(self, tmp_path):
+        path = tmp_path / "anim.gif"
+        path.write_bytes(b"GIF89a" + bytes(100))
+        processor = self._processor(tmp_path)
+
+        async def fake_ffmpeg(*args, **kwargs):
+            assert "libx264" in args and "-an" in args
+            mp4_file(Path(args[-1]), tkhd(480, 270), moov_first=True)
+            return b""
+
+        with patch.object(processor.pool, "ffmpeg", side_effect=fake_ffmpeg):
+            converted = await processor.convert_gif(path)
+
+        assert converted == tmp_path / "anim.mp4"
+        assert read_meta(converted).width == 480
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["anim.mp4"]
+
+    @pytest.mark.asyncio
+    async def test_non_gif_is_left_alone(self, tmp_path):
+        path = tmp_path / "anim.gif"
+        mp4_file(path, tkhd(480, 270))
+        processor = self._processor(tmp_path)
+
+        with patch.object(processor.pool, "ffmpeg") as ffmpeg:
+            assert await processor.convert_gif(path) is None
+
+        ffmpeg.assert_not_called()
+
+
+class FakeRangeServer:
+    """aiohttp-like session serving `payload` with (or without) Range support."""
+
+    def __init__(
+        self, payload: bytes, honor_ranges: bool = True, shift: int = 0, to_end: bool = False
+    ):
+        self.payload = payload
+        self.honor_ranges = honor_ranges
+        # Serve ranges starting `shift` bytes off the requested start, or
+        # running on to the end of the payload with `to_end`.
+        self.shift = shift
+        self.to_end = to_end
+        self.ranges = []
+        self.reads = []
+
+    def get(self, url, headers=None, **kwargs):
+        start, _, end = headers["Range"].removeprefix("bytes=").partition("-")
+        start, end = int(start), int(end)
+        self.ranges.append((start, end))
+
+        resp = MagicMock()
+        if self.honor_ranges:
+            start += self.shift
+            if self.to_end:
+                end = len(self.payload) - 1
+            resp.status = 206
+            resp.headers = {"Content-Range": f"bytes {start}-{end}/{len(self.payload)}"}
+            resp.content.readexactly = AsyncMock(side_effect=lambda n: self._read(start, n))
+        else:
+            resp.status = 200
+            resp.headers = {}
+            resp.content.read = AsyncMock(return_value=self.payload)
+
+        cm = MagicMock()
+        cm.__aenter__ = AsyncMock(return_value=resp)
+        cm.__aexit__ = AsyncMock(return_value=False)
+        return cm
+
+    def _read(self, start, n):
+        self.reads.append(n)
+        return self.payload[start : start + n]
+
+
+class TestProbeRemote:
+    def _processor(self, tmp_path, server, transcoder=None):
+        from infra.files.storage import LocalStorage
+        from infra.http.session import SharedSession
+        from infra.media.processor import VideoProcessor
+
+        shared = SharedSession()
+        shared.get = MagicMock(return_value=server)
+        return VideoProcessor(
+            LocalStorage(tmp_path), "agent", session=shared, transcoder=transcoder
+        )
+
+    @pytest.mark.asyncio
+    async def test_moov_at_end_is_read_with_head_and_tail_requests(self, tmp_path):
+        path = tmp_path / "v.mp4"
+        mp4_file(path, tkhd(1280, 720) + hdlr(b"vide"), mdat_bytes=256 * 1024)
+        server = FakeRangeServer(path.read_bytes())
+
+        probe = await self._processor(tmp_path, server).probe_remote("http://cdn.test/v.mp4")
+
+        assert probe.meta == VideoMeta(1280, 720, 12)
+        assert probe.size == len(server.payload)
+        assert len(server.ranges) == 2
+        assert server.ranges[1][1] == len(server.payload) - 1
+
+    @pytest.mark.asyncio
+    async def test_faststart_needs_a_single_request(self, tmp_path):
+        path = tmp_path / "v.mp4"
+        mp4_file(path, tkhd(640, 360) + hdlr(b"vide"), mdat_bytes=256 * 1024, moov_first=True)
+        server = FakeRangeServer(path.read_bytes())
+
+        probe = await self._processor(tmp_path, server).probe_remote("http://cdn.test/v.mp4")
+
+        assert probe.meta == VideoMeta(640, 360, 12)
+        assert len(server.ranges) == 1
+
+    @pytest.mark.asyncio
+    async def test_server_without_ranges_is_not_downloaded(self, tmp_path):
+        path = tmp_path / "v.mp4"
+        mp4_file(path, tkhd(640, 360) + hdlr(b"vide"))
+        server = FakeRangeServer(path.read_bytes(), honor_ranges=False)
+
+        probe = await self._processor(tmp_path, server).probe_remote("http://cdn.test/v.mp4")
+
+        assert probe is None
+        assert len(server.ranges) == 1
+
+    @pytest.mark.asyncio
+    async def test_range_at_another_offset_is_rejected(self, tmp_path):
+        path = tmp_path / "v.mp4"
+        mp4_file(path, tkhd(640, 360) + hdlr(b"vide"), moov_first=True)
+        server = FakeRangeServer(path.read_bytes(), shift=8)
+
+        probe = await self._processor(tmp_path, server).probe_remote("http://cdn.test/v.mp4")
+
+        assert probe is None
+
+    @pytest.mark.asyncio
+    async def test_read_stops_at_the_requested_range(self, tmp_path):
+        path = tmp_path / "v.mp4"
+        mp4_file(path, tkhd(640, 360) + hdlr(b"vide"), mdat_bytes=256 * 1024, moov_first=True)
+        server = FakeRangeServer(path.read_bytes(), to_end=True)
+
+        probe = await self._processor(tmp_path, server).probe_remote("http://cdn.test/v.mp4")
+
+        assert probe.meta == VideoMeta(640, 360, 12)
+        assert server.reads == [64 * 1024]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("codec, needed", [(b"avc1", False), (b"hvc1", True)])
+    async def test_probe_tells_whether_a_transcode_is_needed(self, tmp_path, codec, needed):
+        from infra.media.transcoder import VideoTranscoder
+        from tests.test_transcoder import video_trak
+
+        path = tmp_path / "v.mp4"
+        mp4_file(path, video_trak(codec), moov_first=True)
+        server = FakeRangeServer(path.read_bytes())
+        transcoder = VideoTranscoder(MagicMock(), max_bytes=1_000_000)
+
+        probe = await self._processor(tmp_path, server, transcoder).probe_remote(
+            "http://cdn.test/v.mp4"
+        )
+
+        assert probe.needs_transcode is needed
@@ -5,11 +5,24 @@ Uses fakes for parser, file resolver, and video processor so no real
 network or filesystem I/O is exercised.
 """
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
-from core.domain.entity import GIF, Content, FileInfo, Link, Photo, PipelineResult, Video, VideoMeta
+from core.domain.entity import (
+    GIF,
+    Content,
+    FileInfo,
+    Link,
+    MediaType,
+    Photo,
+    PipelineResult,
+    RemoteProbe,
+    Video,
+    VideoMeta,
+    VideoVariant,
+)
 from core.exceptions import InvalidUrlError
 from core.pipeline import Pipeline
 
@@ -41,11 +54,17 @@ class FakeFailingParser:
 class FakeFileResolver:
     def __init__(self):
         self.resolve = AsyncMock()
+        self.remember_video_meta = AsyncMock()
+        self.max_bytes = None
 
 
 class FakeVideoProcessor:
     def __init__(self):
         self.process_video = AsyncMock()
+        self.probe_remote = AsyncMock(return_value=None)
+        self.faststart = AsyncMock(return_value=False)
+        self.transcode = AsyncMock(return_value=None)
+        self.convert_gif = AsyncMock(return_value=None)
 
 
 # ---------------------------------------------------------------------------
@@ -157,6 +176,76 @@ class TestPipelineFileResolution:
         assert result.resolved_media[0] == (content.media[0], fake_fi_1)
         assert result.resolved_media[1] == (content.media[1], fake_fi_2)
 
+    @pytest.mark.asyncio
+    async def test_resolves_best_video_variant_under_limit(self, tmp_path):
+        video = Video(
+            resource_url="https://cdn.test/1080.mp4",
+            mime_type="video/mp4",
+            thumbnail_url="https://cdn.test/thumb.jpg",
+            width=1920,
+            height=1080,
+            duration=100,
+            variants=[
+                VideoVariant("https://cdn.test/1080.mp4", bitrate=8_000_000),
+                VideoVariant("https://cdn.test/720.mp4", bitrate=2_000_000, width=1280, height=720),
+            ],
+        )
+        content = Content(backlink=Link(url="https://example.com"), media=[video])
+
+        resolver = FakeFileResolver()
+        resolver.max_bytes = 50_000_000
+        resolver.resolve = AsyncMock(return_value=FileInfo(path=tmp_path / "720.mp4", size=10))
+
+        pipeline = Pipeline(
+            parser=FakeParser(content),
+            file_resolver=resolver,
+            video_processor=FakeVideoProcessor(),
+        )
+        result = await pipeline.run("https://example.com/video")
+
+        assert resolver.resolve.call_args.args[0] == "https://cdn.test/720.mp4"
+        media, _ = result.resolved_media[0]
+        assert media.resource_url == "https://cdn.test/720.mp4"
+        assert result.video_meta[media.resource_url] == VideoMeta(1280, 720, 100)
+
+    @pytest.mark.asyncio
+    async def test_remote_media_is_neither_probed_nor_processed(self):
+        photo = Photo(resource_url="https://cdn.test/p.jpg")
+        video = Video(
+            resource_url="https://cdn.test/v.mp4",
+            mime_type="video/mp4",
+            thumbnail_url="https://cdn.test/thumb.jpg",
+        )
+        content = Content(backlink=Link(url="https://example.com"), media=[photo, video])
+
+        resolver = FakeFileResolver()
+        resolver.resolve = AsyncMock(
+            side_effect=[
+                FileInfo(path="/tmp/p.jpg", size=1000, remote=True),
+                FileInfo(path="/tmp/v.mp4", size=2000, remote=True),
+            ]
+        )
+        processor = FakeVideoProcessor()
+        photo_processor = MagicMock()
+        photo_processor.optimize = AsyncMock()
+
+        pipeline = Pipeline(
+            parser=FakeParser(content),
+            file_resolver=resolver,
+            video_processor=processor,
+            photo_processor=photo_processor,
+            faststart=True,
+            url_size_limits={MediaType.PHOTO: 5, MediaType.VIDEO: 20},
+        )
+        result = await pipeline.run("https://example.com/post")
+
+        limits = [c.kwargs["remote_max_bytes"] for c in resolver.resolve.call_args_list]
+        assert limits == [5, 20]
+        assert len(result.resolved_media) == 2
+        processor.process_video.assert_not_called()
+        processor.transcode.assert_not_called()
+        photo_processor.optimize.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_skips_failed_resolutions_gracefully(self):
         content = Content(
@@ -203,6 +292,80 @@ class TestPipelineFileResolution:
 
         assert result.resolved_media == []
 
+    @pytest.mark.asyncio
+    async def test_resolved_files_are_released_when_a_later_step_fails(self, tmp_path):
+        streamed = Video(
+            resource_url="https://cdn.test/a.mp4",
+            mime_type="video/mp4",
+            thumbnail_url="https://cdn.test/a.jpg",
+        )
+        downloaded = Video(
+            resource_url="https://cdn.test/b.webm",
+            mime_type="video/webm",
+            thumbnail_url="https://cdn.test/b.jpg",
+        )
+        content = Content(backlink=Link(url="https://example.com"), media=[streamed, downloaded])
+        stream = MagicMock(close=AsyncMock())
+        path = tmp_path / "b.webm"
+        path.write_bytes(b"x")
+
+        resolver = FakeFileResolver()
+        resolver.resolve = AsyncMock(
+            side_effect=[
+                FileInfo(path=tmp_path / "a.mp4", size=1, stream=stream),
+                FileInfo(path=path, size=1, mime_type="video/webm"),
+            ]
+        )
+        processor = FakeVideoProcessor()
+        processor.process_video = AsyncMock(return_value=VideoMeta(640, 360, 10))
+        processor.transcode = AsyncMock(side_effect=RuntimeError("ffmpeg crashed"))
+
+        pipeline = Pipeline(
+            parser=FakeParser(content),
+            file_resolver=resolver,
+            video_processor=processor,
+        )
+        with pytest.raises(RuntimeError):
+            await pipeline.run("https://example.com/gallery")
+
+        stream.close.assert_awaited()
+        assert not path.exists()
+
+    @pytest.mark.asyncio
+    async def test_resolved_files_are_released_when_cancelled(self, tmp_path):
+        content = Content(
+            backlink=Link(url="https://example.com"),
+            media=[
+                Photo(resource_url="https://cdn.test/fast.jpg"),
+                Photo(resource_url="https://cdn.test/slow.jpg"),
+            ],
+        )
+        path = tmp_path / "fast.jpg"
+        path.write_bytes(b"x")
+
+        slow_started = asyncio.Event()
+
+        async def resolve(url, **kwargs):
+            if url.endswith("slow.jpg"):
+                slow_started.set()
+                await asyncio.Event().wait()
+            return FileInfo(path=path, size=1)
+
+        resolver = FakeFileResolver()
+        resolver.resolve = resolve
+        pipeline = Pipeline(
+            parser=FakeParser(content),
+            file_resolver=resolver,
+            video_processor=FakeVideoProcessor(),
+        )
+        task = asyncio.create_task(pipeline.run("https://example.com/gallery"))
+        await slow_started.wait()
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert not path.exists()
+
 
 # ---------------------------------------------------------------------------
 # Video processing
@@ -241,6 +404,293 @@ class TestPipelineVideoProcessing:
         assert result.video_meta["https://cdn.test/video.mp4"] is fake_meta
         processor.process_video.assert_called_once_with(fake_fi.path)
 
+    @pytest.mark.asyncio
+    async def test_uses_cached_video_meta_without_probing(self):
+        content = Content(
+            backlink=Link(url="https://example.com"),
+            media=[
+                Video(
+                    resource_url="https://cdn.test/video.mp4",
+                    mime_type="video/mp4",
+                    thumbnail_url="https://cdn.test/thumb.jpg",
+                ),
+            ],
+        )
+        cached_meta = VideoMeta(width=1280, height=720, duration=30)
+        fake_fi = FileInfo(path="/tmp/video.mp4", size=5000, video_meta=cached_meta)
+
+        resolver = FakeFileResolver()
+        resolver.resolve = AsyncMock(return_value=fake_fi)
+        processor = FakeVideoProcessor()
+
+        pipeline = Pipeline(
+            parser=FakeParser(content),
+            file_resolver=resolver,
+            video_processor=processor,
+        )
+        result = await pipeline.run("https://example.com/video")
+
+        assert result.video_meta["https://cdn.test/video.mp4"] is cached_meta
+        processor.process_video.assert_not_called()
+        resolver.remember_video_meta.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_uses_parser_metadata_without_probing(self):
+        video = Video(
+            resource_url="https://cdn.test/video.mp4",
+            mime_type="video/mp4",
+            thumbnail_url="https://cdn.test/thumb.jpg",
+            width=1080,
+            height=1920,
+            duration=31,
+            size=4096,
+        )
+        content = Content(backlink=Link(url="https://example.com"), media=[video])
+
+        resolver = FakeFileResolver()
+        resolver.resolve = AsyncMock(return_value=FileInfo(path="/tmp/video.mp4", size=4096))
+        processor = FakeVideoProcessor()
+
+        pipeline = Pipeline(
+            parser=FakeParser(content),
+            file_resolver=resolver,
+            video_processor=processor,
+        )
+        result = await pipeline.run("https://example.com/video")
+
+        assert result.video_meta["https://cdn.test/video.mp4"] == VideoMeta(1080, 1920, 31)
+        assert resolver.resolve.call_args.kwargs["size"] == 4096
+        processor.process_video.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_missing_duration_is_probed_from_the_file(self):
+        video = Video(
+            resource_url="https://cdn.test/video.mp4",
+            mime_type="video/mp4",
+            thumbnail_url="https://cdn.test/thumb.jpg",
+            width=1080,
+            height=1920,
+        )
+        content = Content(backlink=Link(url="https://example.com"), media=[video])
+
+        resolver = FakeFileResolver()
+        resolver.resolve = AsyncMock(return_value=FileInfo(path="/tmp/video.mp4", size=4096))
+        processor = FakeVideoProcessor()
+        processor.process_video = AsyncMock(return_value=VideoMeta(None, None, 31))
+
+        pipeline = Pipeline(
+            parser=FakeParser(content),
+            file_resolver=resolver,
+            video_processor=processor,
+        )
+        result = await pipeline.run("https://example.com/video")
+
+        assert result.video_meta["https://cdn.test/video.mp4"] == VideoMeta(1080, 1920, 31)
+        processor.process_video.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_remote_probe_replaces_local_probe(self):
+        video = Video(
+            resource_url="https://cdn.test/video.mp4",
+            mime_type="video/mp4",
+            thumbnail_url="https://cdn.test/thumb.jpg",
+        )
+        content = Content(backlink=Link(url="https://example.com"), media=[video])
+        remote_meta = VideoMeta(width=1280, height=720, duration=30)
+
+        resolver = FakeFileResolver()
+        resolver.resolve = AsyncMock(return_value=FileInfo(path="/tmp/video.mp4", size=5000))
+        processor = FakeVideoProcessor()
+        processor.probe_remote = AsyncMock(return_value=RemoteProbe(remote_meta, size=5000))
+
+        pipeline = Pipeline(
+            parser=FakeParser(content),
+            file_resolver=resolver,
+            video_processor=processor,
+            remote_probe=True,
+        )
+        result = await pipeline.run("https://example.com/video")
+
+        assert result.video_meta["https://cdn.test/video.mp4"] is remote_meta
+        processor.probe_remote.assert_awaited_once_with("https://cdn.test/video.mp4")
+        processor.process_video.assert_not_called()
+        resolver.remember_video_meta.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_remote_probe_drives_size_check_and_streaming(self):
+        video = Video(
+            resource_url="https://cdn.test/video.webm",
+            mime_type="video/webm",
+            thumbnail_url="https://cdn.test/thumb.jpg",
+        )
+        content = Content(backlink=Link(url="https://example.com"), media=[video])
+
+        resolver = FakeFileResolver()
+        resolver.resolve = AsyncMock(return_value=FileInfo(path="/tmp/video.webm", size=7000))
+        processor = FakeVideoProcessor()
+        processor.probe_remote = AsyncMock(
+            return_value=RemoteProbe(None, size=7000, needs_transcode=True)
+        )
+
+        pipeline = Pipeline(
+            parser=FakeParser(content),
+            file_resolver=resolver,
+            video_processor=processor,
+            remote_probe=True,
+        )
+        await pipeline.run("https://example.com/video")
+
+        kwargs = resolver.resolve.call_args.kwargs
+        assert kwargs["size"] == 7000
+        assert kwargs["streamable"] is False
+
+    @pytest.mark.asyncio
+    async def test_incomplete_remote_probe_falls_back_to_local_probe(self):
+        video = Video(
+            resource_url="https://cdn.test/video.mp4",
+            mime_type="video/mp4",
+            thumbnail_url="https://cdn.test/thumb.jpg",
+        )
+        content = Content(backlink=Link(url="https://example.com"), media=[video])
+        local_meta = VideoMeta(width=1280, height=720, duration=30)
+
+        resolver = FakeFileResolver()
+        resolver.resolve = AsyncMock(return_value=FileInfo(path="/tmp/video.mp4", size=5000))
+        processor = FakeVideoProcessor()
+        processor.probe_remote = AsyncMock(return_value=RemoteProbe(VideoMeta(1280, 720, None)))
+        processor.process_video = AsyncMock(return_value=local_meta)
+
+        pipeline = Pipeline(
+            parser=FakeParser(content),
+            file_resolver=resolver,
+            video_processor=processor,
+            remote_probe=True,
+        )
+        result = await pipeline.run("https://example.com/video")
+
+        assert result.video_meta["https://cdn.test/video.mp4"] is local_meta
+
+    @pytest.mark.asyncio
+    async def test_faststart_remux_updates_file_size(self, tmp_path):
+        video = Video(
+            resource_url="https://cdn.test/video.mp4",
+            mime_type="video/mp4",
+            thumbnail_url="https://cdn.test/thumb.jpg",
+            width=640,
+            height=360,
+        )
+        content = Content(backlink=Link(url="https://example.com"), media=[video])
+        path = tmp_path / "video.mp4"
+        path.write_bytes(b"x" * 10)
+
+        resolver = FakeFileResolver()
+        resolver.resolve = AsyncMock(return_value=FileInfo(path=path, size=12))
+        processor = FakeVideoProcessor()
+        processor.faststart = AsyncMock(return_value=True)
+
+        pipeline = Pipeline(
+            parser=FakeParser(content),
+            file_resolver=resolver,
+            video_processor=processor,
+            faststart=True,
+        )
+        result = await pipeline.run("https://example.com/video")
+
+        processor.faststart.assert_awaited_once_with(path)
+        assert result.resolved_media[0][1].size == 10
+
+    @pytest.mark.asyncio
+    async def test_transcoded_video_replaces_file(self, tmp_path):
+        video = Video(
+            resource_url="https://cdn.test/video.webm",
+            mime_type="video/webm",
+            thumbnail_url="https://cdn.test/thumb.jpg",
+            width=640,
+            height=360,
+            duration=10,
+        )
+        content = Content(backlink=Link(url="https://example.com"), media=[video])
+        source = tmp_path / "video.webm"
+        transcoded = tmp_path / "video.mp4"
+        transcoded.write_bytes(b"x" * 7)
+
+        resolver = FakeFileResolver()
+        resolver.resolve = AsyncMock(
+            return_value=FileInfo(path=source, size=100, mime_type="video/webm")
+        )
+        processor = FakeVideoProcessor()
+        processor.transcode = AsyncMock(return_value=transcoded)
+
+        pipeline = Pipeline(
+            parser=FakeParser(content),
+            file_resolver=resolver,
+            video_processor=processor,
+            faststart=True,
+        )
+        result = await pipeline.run("https://example.com/video")
+
+        processor.transcode.assert_awaited_once_with(source, VideoMeta(640, 360, 10))
+        processor.faststart.assert_not_called()
+        fi = result.resolved_media[0][1]
+        assert (fi.path, fi.mime_type, fi.size) == (transcoded, "video/mp4", 7)
+
+    @pytest.mark.asyncio
+    async def test_photo_processor_replaces_photo_file(self, tmp_path):
+        photo = Photo(resource_url="https://cdn.test/photo.png")
+        content = Content(backlink=Link(url="https://example.com"), media=[photo])
+        original = FileInfo(path=tmp_path / "photo.png", size=100)
+        optimized = FileInfo(path=tmp_path / "photo.photo.jpg", size=10, mime_type="image/jpeg")
+
+        resolver = FakeFileResolver()
+        resolver.resolve = AsyncMock(return_value=original)
+        photo_processor = MagicMock()
+        photo_processor.optimize = AsyncMock(return_value=optimized)
+
+        pipeline = Pipeline(
+            parser=FakeParser(content),
+            file_resolver=resolver,
+            video_processor=FakeVideoProcessor(),
+            photo_processor=photo_processor,
+        )
+        result = await pipeline.run("https://example.com/photo")
+
+        photo_processor.optimize.assert_awaited_once_with(photo.resource_url, original)
+        assert result.resolved_media[0][1] is optimized
+
+    @pytest.mark.asyncio
+    async def test_gif_is_downloaded_and_converted_to_mp4(self, tmp_path):
+        video = Video(
+            resource_url="https://cdn.test/anim.gif",
+            mime_type="image/gif",
+            thumbnail_url="https://cdn.test/anim.gif",
+        )
+        content = Content(backlink=Link(url="https://example.com"), media=[video])
+        converted = tmp_path / "anim.mp4"
+        converted.write_bytes(b"x" * 5)
+        meta = VideoMeta(width=480, height=270, duration=3)
+
+        resolver = FakeFileResolver()
+        resolver.resolve = AsyncMock(return_value=FileInfo(path=tmp_path / "anim.gif", size=50))
+        processor = FakeVideoProcessor()
+        processor.convert_gif = AsyncMock(return_value=converted)
+        processor.process_video = AsyncMock(return_value=meta)
+
+        pipeline = Pipeline(
+            parser=FakeParser(content),
+            file_resolver=resolver,
+            video_processor=processor,
+            remote_probe=True,
+            gif_to_mp4=True,
+        )
+        result = await pipeline.run("https://example.com/gif")
+
+        assert resolver.resolve.call_args.kwargs["streamable"] is False
+        processor.probe_remote.assert_not_called()
+        processor.process_video.assert_awaited_once_with(converted)
+        fi = result.resolved_media[0][1]
+        assert (fi.path, fi.mime_type, fi.size) == (converted, "video/mp4", 5)
+        assert result.video_meta[video.resource_url] == meta
+
     @pytest.mark.asyncio
     async def test_skips_video_processing_on_non_video_media(self):
         content = Content(
@@ -0,0 +1,91 @@
+"""
+Tests for SendScheduler.
+
+Bot API calls share a global and a per-chat call budget; text replies are
+granted before uploads and flood waits (RetryAfter) are retried.
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+from telegram.error import RetryAfter
+
+from platforms.telegram.scheduler import SendScheduler
+
+# RetryAfter itself reads its deprecated int `retry_after` when constructed.
+pytestmark = pytest.mark.filterwarnings("ignore::telegram.warnings.PTBDeprecationWarning")
+
+
+class TestSendScheduler:
+    @pytest.mark.asyncio
+    async def test_paces_calls_to_one_chat(self):
+        scheduler = SendScheduler(rate=1000, chat_rate=20, chat_burst=1)
+        call = AsyncMock()
+
+        started = time.monotonic()
+        for _ in range(3):
+            await scheduler.run(1, call)
+
+        # The first call uses the burst, the other two wait ~0.05s each.
+        assert time.monotonic() - started >= 0.09
+        assert call.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_busy_chat_does_not_hold_up_others(self):
+        scheduler = SendScheduler(rate=1000, chat_rate=1, chat_burst=1)
+        await scheduler.run(1, AsyncMock())
+
+        waiting = asyncio.create_task(scheduler.run(1, AsyncMock()))
+        await asyncio.wait_for(scheduler.run(2, AsyncMock()), 0.1)
+
+        assert not waiting.done()
+        waiting.cancel()
+
+    @pytest.mark.asyncio
+    async def test_refilled_chats_are_forgotten(self):
+        scheduler = SendScheduler(rate=1000, chat_rate=100, chat_burst=1)
+        await scheduler.run(1, AsyncMock())
+        await asyncio.sleep(0.02)
+
+        await scheduler.run(2, AsyncMock())
+
+        assert list(scheduler._chats) == [2]
+
+    @pytest.mark.asyncio
+    async def test_text_is_granted_before_uploads(self):
+        scheduler = SendScheduler(rate=50, chat_rate=1000, chat_burst=1000)
+        scheduler._global.tokens = 0
+        order = []
+
+        async def send(name, priority):
+            await scheduler.run(name, AsyncMock(), priority)
+            order.append(name)
+
+        await asyncio.gather(
+            send("upload", SendScheduler.UPLOAD),
+            send("text", SendScheduler.TEXT),
+        )
+
+        assert order == ["text", "upload"]
+
+    @pytest.mark.asyncio
+    async def test_retry_after_is_retried(self):
+        scheduler = SendScheduler(rate=1000, chat_rate=1000, chat_burst=10)
+        call = AsyncMock(side_effect=[RetryAfter(0), "sent"])
+
+        assert await scheduler.run(1, call) == "sent"
+        assert call.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses_chat_when_not_retried(self):
+        scheduler = SendScheduler(rate=1000, chat_rate=1000, chat_burst=10)
+        call = AsyncMock(side_effect=RetryAfter(5))
+
+        with pytest.raises(RetryAfter):
+            await scheduler.run(1, call, retries=0)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(scheduler.run(1, AsyncMock()), 0.05)
+        assert call.await_count == 1
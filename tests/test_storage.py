@@ -0,0 +1,47 @@
+"""
+Tests for LocalStorage spooling.
+
+Small payloads stay in memory; only those past the threshold touch the disk.
+"""
+
+import pytest
+
+from infra.files.storage import LocalStorage
+
+
+class TestSpooledFile:
+    @pytest.mark.asyncio
+    async def test_small_payload_stays_in_memory(self, tmp_path):
+        storage = LocalStorage(tmp_path)
+
+        async with storage.spool("photo.jpg", max_memory=10) as spool:
+            await spool.write(b"abc")
+            await spool.write(b"def")
+
+        assert spool.data == b"abcdef"
+        assert spool.path is None
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_large_payload_spills_to_disk(self, tmp_path):
+        storage = LocalStorage(tmp_path)
+
+        async with storage.spool("photo.jpg", max_memory=4) as spool:
+            await spool.write(b"abc")
+            await spool.write(b"def")
+            await spool.write(b"ghi")
+
+        assert spool.data is None
+        assert spool.path == tmp_path / "photo.jpg"
+        assert spool.path.read_bytes() == b"abcdefghi"
+
+    @pytest.mark.asyncio
+    async def test_discard_removes_spilled_file(self, tmp_path):
+        storage = LocalStorage(tmp_path)
+
+        async with storage.spool("photo.jpg", max_memory=1) as spool:
+            await spool.write(b"abc")
+            await spool.discard()
+
+        assert spool.data is None
+        assert not (tmp_path / "photo.jpg").exists()
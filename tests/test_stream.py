@@ -0,0 +1,84 @@
+"""
+Tests for MediaStream passthrough.
+
+Peeked chunks must still reach the consumer, and download errors must surface
+to whoever is iterating.
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from tests.test_downloader import FakeRangeSession
+
+
+def _downloader(session, **kwargs):
+    from infra.files.downloader import MediaDownloader
+    from infra.http.session import SharedSession
+
+    shared = SharedSession()
+    shared.get = MagicMock(return_value=session)
+    return MediaDownloader("agent", session=shared, **kwargs)
+
+
+async def _collect(stream) -> bytes:
+    return b"".join([chunk async for chunk in stream])
+
+
+class TestMediaStream:
+    @pytest.mark.asyncio
+    async def test_peeked_bytes_are_not_lost(self):
+        payload = bytes(range(40))
+        stream = await _downloader(FakeRangeSession(payload)).open_stream("http://cdn.test/v")
+
+        assert stream.size == 40
+        assert await stream.peek(10) == payload[:10]
+        assert await _collect(stream) == payload
+
+    @pytest.mark.asyncio
+    async def test_stall_timeout_starts_with_the_consumer(self):
+        payload = bytes(range(40))
+        stream = await _downloader(FakeRangeSession(payload)).open_stream(
+            "http://cdn.test/v", buffer_bytes=1
+        )
+        stream._stall_timeout = 0.01
+
+        # The upload is queued behind other sends for longer than the stall timeout.
+        await asyncio.sleep(0.05)
+
+        assert await _collect(stream) == payload
+
+    @pytest.mark.asyncio
+    async def test_stream_can_only_be_consumed_once(self):
+        stream = await _downloader(FakeRangeSession(b"abcd")).open_stream("http://cdn.test/v")
+        await _collect(stream)
+
+        with pytest.raises(RuntimeError):
+            await _collect(stream)
+
+    @pytest.mark.asyncio
+    async def test_dropped_connection_raises_in_consumer(self):
+        import aiohttp
+
+        session = FakeRangeSession(bytes(range(40)), drops=[8])
+        stream = await _downloader(session).open_stream("http://cdn.test/v")
+
+        with pytest.raises(aiohttp.ClientPayloadError):
+            await _collect(stream)
+
+    @pytest.mark.asyncio
+    async def test_oversized_response_is_rejected_before_streaming(self):
+        from infra.files.exception import FileTooLargeError
+
+        session = FakeRangeSession(bytes(range(40)))
+
+        with pytest.raises(FileTooLargeError):
+            await _downloader(session).open_stream("http://cdn.test/v", max_bytes=10)
+
+    @pytest.mark.asyncio
+    async def test_save_drains_to_file(self, tmp_path):
+        stream = await _downloader(FakeRangeSession(b"abcdef")).open_stream("http://cdn.test/v")
+
+        assert await stream.save(tmp_path / "out.bin") == 6
+        assert (tmp_path / "out.bin").read_bytes() == b"abcdef"
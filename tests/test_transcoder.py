@@ -0,0 +1,113 @@
+"""
+Tests for VideoTranscoder decisions and ffmpeg job handling.
+
+ffmpeg itself is replaced by a fake pool job that writes the output file and
+emits ``-progress`` lines.
+"""
+
+import logging
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from infra.media.entity import VideoMeta
+from infra.media.mp4 import video_codec
+from infra.media.transcoder import VideoTranscoder
+from tests.test_mp4 import box, mp4_file, tkhd
+
+
+def video_trak(codec: bytes, width: int = 640, height: int = 360) -> bytes:
+    entry = box(codec, bytes(8))
+    stsd = box(b"stsd", bytes(4) + (1).to_bytes(4, "big") + entry)
+    hdlr = box(b"hdlr", bytes(8) + b"vide" + bytes(12))
+    mdia = box(b"mdia", hdlr + box(b"minf", box(b"stbl", stsd)))
+    return tkhd(width, height) + mdia
+
+
+def _transcoder(max_bytes: int = 10_000_000) -> VideoTranscoder:
+    return VideoTranscoder(MagicMock(), max_bytes)
+
+
+def _fake_ffmpeg(output_bytes: int = 100):
+    async def ffmpeg(*args, timeout=None, on_line=None):
+        for us in (2_500_000, 5_000_000, 10_000_000):
+            on_line(f"out_time_us={us}\n".encode())
+        Path(args[-1]).write_bytes(b"\x00" * output_bytes)
+        return b""
+
+    return AsyncMock(side_effect=ffmpeg)
+
+
+class TestVideoCodec:
+    def test_reads_video_sample_entry(self, tmp_path):
+        path = tmp_path / "v.mp4"
+        mp4_file(path, video_trak(b"hvc1"))
+
+        assert video_codec(path) == "hvc1"
+
+
+class TestVideoTranscoder:
+    def test_bitrate_fits_duration_into_limit(self):
+        transcoder = _transcoder(max_bytes=50 * 1024 * 1024)
+
+        kbps = transcoder.video_kbps(60)
+
+        assert (kbps + transcoder.audio_kbps) * 1000 / 8 * 60 < 50 * 1024 * 1024
+        assert kbps > 6000
+
+    @pytest.mark.asyncio
+    async def test_playable_mp4_is_left_alone(self, tmp_path):
+        path = tmp_path / "v.mp4"
+        mp4_file(path, video_trak(b"avc1"))
+        transcoder = _transcoder()
+        transcoder.pool.ffmpeg = AsyncMock()
+
+        assert await transcoder.transcode_if_needed(path, VideoMeta(640, 360, 10)) is None
+        transcoder.pool.ffmpeg.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_webm_is_transcoded_to_mp4_with_progress(self, tmp_path, caplog):
+        path = tmp_path / "v.webm"
+        path.write_bytes(b"\x1a\x45\xdf\xa3" + b"\x00" * 64)
+        transcoder = _transcoder()
+        transcoder.pool.ffmpeg = _fake_ffmpeg()
+
+        with caplog.at_level(logging.INFO):
+            result = await transcoder.transcode_if_needed(path, VideoMeta(640, 360, 10))
+
+        assert result == tmp_path / "v.mp4"
+        assert result.stat().st_size == 100
+        assert not path.exists()
+        logged = [r.getMessage() for r in caplog.records if r.getMessage().endswith("%")]
+        assert logged == [
+            "Transcoding v.webm: 25%",
+            "Transcoding v.webm: 50%",
+            "Transcoding v.webm: 100%",
+        ]
+        args = transcoder.pool.ffmpeg.call_args.args
+        assert "libx264" in args and "+faststart" in args
+        assert args[args.index("-vf") + 1] == "scale=trunc(iw/2)*2:trunc(ih/2)*2"
+
+    @pytest.mark.asyncio
+    async def test_oversized_without_duration_is_kept(self, tmp_path):
+        path = tmp_path / "v.mp4"
+        mp4_file(path, video_trak(b"avc1"), mdat_bytes=2000)
+        transcoder = _transcoder(max_bytes=1000)
+        transcoder.pool.ffmpeg = AsyncMock()
+
+        assert await transcoder.transcode_if_needed(path, VideoMeta(640, 360, None)) is None
+        transcoder.pool.ffmpeg.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_output_over_limit_is_discarded(self, tmp_path):
+        path = tmp_path / "v.mp4"
+        mp4_file(path, video_trak(b"hvc1"))
+        original = path.read_bytes()
+        transcoder = _transcoder(max_bytes=len(original) + 10)
+        transcoder.min_video_kbps = 0
+        transcoder.pool.ffmpeg = _fake_ffmpeg(output_bytes=len(original) + 50)
+
+        assert await transcoder.transcode_if_needed(path, VideoMeta(640, 360, 10)) is None
+        assert path.read_bytes() == original
+        assert [p.name for p in tmp_path.iterdir()] == ["v.mp4"]
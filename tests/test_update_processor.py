@@ -0,0 +1,94 @@
+"""
+Tests for ChatOrderedUpdateProcessor.
+
+Updates of different chats run concurrently; updates of one chat run one at
+a time in arrival order.
+"""
+
+import asyncio
+
+import pytest
+from telegram import Update
+
+from platforms.telegram.updates import ChatOrderedUpdateProcessor
+
+UPDATE_ID = iter(range(1, 1000))
+
+
+def _update(chat_id: int | None) -> Update:
+    if chat_id is None:
+        data = {
+            "update_id": next(UPDATE_ID),
+            "inline_query": {
+                "id": "1",
+                "from": {"id": 1, "is_bot": False, "first_name": "u"},
+                "query": "",
+                "offset": "",
+            },
+        }
+    else:
+        data = {
+            "update_id": next(UPDATE_ID),
+            "message": {"message_id": 1, "date": 0, "chat": {"id": chat_id, "type": "private"}},
+        }
+    return Update.de_json(data, None)
+
+
+class TestChatOrderedUpdateProcessor:
+    @pytest.fixture
+    def processor(self):
+        return ChatOrderedUpdateProcessor(8)
+
+    @pytest.mark.asyncio
+    async def test_same_chat_runs_in_order(self, processor):
+        log = []
+
+        async def handle(name, delay):
+            log.append(f"{name} start")
+            await asyncio.sleep(delay)
+            log.append(f"{name} end")
+
+        await asyncio.gather(
+            processor.process_update(_update(1), handle("a", 0.02)),
+            processor.process_update(_update(1), handle("b", 0)),
+        )
+
+        assert log == ["a start", "a end", "b start", "b end"]
+        assert processor._chats == {}
+
+    @pytest.mark.asyncio
+    async def test_other_chats_and_inline_queries_run_concurrently(self, processor):
+        release = asyncio.Event()
+
+        slow = asyncio.create_task(processor.process_update(_update(1), release.wait()))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(processor.process_update(_update(2), asyncio.sleep(0)), 0.1)
+        await asyncio.wait_for(processor.process_update(_update(None), asyncio.sleep(0)), 0.1)
+
+        assert processor.stats.running == 1
+        release.set()
+        await slow
+        assert processor.stats.processed == 3
+        assert processor.stats.max_running == 2
+        assert processor.stats.limit == 8
+
+    @pytest.mark.asyncio
+    async def test_busy_chat_does_not_hold_slots(self):
+        processor = ChatOrderedUpdateProcessor(2)
+        release = asyncio.Event()
+
+        busy = [
+            asyncio.create_task(processor.process_update(_update(1), release.wait()))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+
+        # Two updates of chat 1 wait for their chat, not for a slot.
+        assert processor.stats.running == 1
+        assert processor.stats.waiting == 2
+        await asyncio.wait_for(processor.process_update(_update(2), asyncio.sleep(0)), 0.1)
+
+        release.set()
+        await asyncio.gather(*busy)
+        assert processor.stats.processed == 4
+        assert processor.stats.waiting == 0
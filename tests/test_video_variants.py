@@ -0,0 +1,69 @@
+"""Tests for Video.best_variant selection under a size limit."""
+
+from core.domain.entity import Video, VideoVariant
+
+HIGH = VideoVariant("https://v.test/1080.mp4", bitrate=8_000_000, width=1920, height=1080)
+MID = VideoVariant("https://v.test/720.mp4", bitrate=2_000_000, width=1280, height=720)
+LOW = VideoVariant("https://v.test/360.mp4", bitrate=500_000, width=640, height=360)
+
+
+def _video(*variants: VideoVariant, duration: int | None = 100) -> Video:
+    return Video(
+        resource_url=variants[0].url,
+        mime_type="video/mp4",
+        thumbnail_url="https://v.test/thumb.jpg",
+        width=variants[0].width,
+        height=variants[0].height,
+        duration=duration,
+        variants=list(variants),
+    )
+
+
+def test_best_variant_that_fits_is_chosen():
+    # 100s at 8 Mbit/s = 100 MB, at 2 Mbit/s = 25 MB
+    chosen = _video(HIGH, MID, LOW).best_variant(50_000_000)
+
+    assert chosen.resource_url == MID.url
+    assert (chosen.width, chosen.height) == (1280, 720)
+
+
+def test_top_variant_kept_when_it_fits():
+    video = _video(HIGH, MID)
+    assert video.best_variant(2 * 1024**3).resource_url == HIGH.url
+
+
+def test_reported_size_beats_bitrate_estimate():
+    high = VideoVariant(HIGH.url, bitrate=HIGH.bitrate, size=40_000_000)
+
+    chosen = _video(high, MID).best_variant(50_000_000)
+
+    assert chosen.resource_url == HIGH.url
+    assert chosen.size == 40_000_000
+
+
+def test_smallest_is_chosen_without_estimated_size_when_none_fits():
+    chosen = _video(HIGH, MID, LOW).best_variant(1_000_000)
+
+    # The 6.25 MB estimate only ranks the variants; the remote check decides.
+    assert chosen.resource_url == LOW.url
+    assert chosen.size is None
+
+
+def test_reported_size_is_kept_when_none_fits():
+    low = VideoVariant(LOW.url, bitrate=LOW.bitrate, size=3_000_000)
+
+    chosen = _video(HIGH, MID, low).best_variant(1_000_000)
+
+    assert chosen.resource_url == LOW.url
+    assert chosen.size == 3_000_000
+
+
+def test_unknown_duration_treats_variants_as_fitting():
+    chosen = _video(HIGH, LOW, duration=None).best_variant(1_000_000)
+    assert chosen.resource_url == HIGH.url
+    assert chosen.size is None
+
+
+def test_video_without_variants_is_unchanged():
+    video = Video(resource_url="https://v.test/v.mp4", mime_type="video/mp4", thumbnail_url="t")
+    assert video.best_variant(10) is video
@@ -0,0 +1,72 @@
+"""
+Tests for WebhookServer.
+
+Pushed updates are checked against the secret token, queued for the
+application and acknowledged at once.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from telegram import Bot, Update
+
+from platforms.telegram.webhook import SECRET_HEADER, WebhookServer
+
+UPDATE = {
+    "update_id": 1,
+    "message": {
+        "message_id": 7,
+        "date": 0,
+        "chat": {"id": 42, "type": "private"},
+        "text": "https://example.com",
+    },
+}
+
+
+def _server():
+    application = SimpleNamespace(bot=Bot("123:abc"), update_queue=asyncio.Queue())
+    return WebhookServer(application, "https://bot.example.com/telegram/hook", "s3cret")
+
+
+def _request(token=None, data=UPDATE):
+    headers = {SECRET_HEADER: token} if token is not None else {}
+    json = AsyncMock(side_effect=ValueError()) if data is None else AsyncMock(return_value=data)
+    return SimpleNamespace(headers=headers, json=json, remote="127.0.0.1")
+
+
+class TestWebhookServer:
+    def test_listens_on_url_path(self):
+        assert _server().path == "/telegram/hook"
+
+    @pytest.mark.asyncio
+    async def test_update_is_queued_and_acknowledged(self):
+        server = _server()
+
+        response = await server.handle(_request("s3cret"))
+
+        assert response.status == 200
+        update = server.application.update_queue.get_nowait()
+        assert isinstance(update, Update)
+        assert update.message.text == "https://example.com"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("token", [None, "wrong"])
+    async def test_wrong_secret_is_refused(self, token):
+        server = _server()
+
+        response = await server.handle(_request(token))
+
+        assert response.status == 403
+        assert server.application.update_queue.empty()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("data", [None, [UPDATE], "update", {}, {"update_id": 1, "message": 5}])
+    async def test_malformed_body_is_rejected(self, data):
+        server = _server()
+
+        response = await server.handle(_request("s3cret", data=data))
+
+        assert response.status == 400
+        assert server.application.update_queue.empty()
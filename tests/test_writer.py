@@ -0,0 +1,54 @@
+"""
+Tests for BufferedFileWriter.
+
+Many small writes must reach the disk as a few large ones, and positioned
+writes (ranged downloads) must land at the right offsets.
+"""
+
+import pytest
+
+from infra.files.writer import BufferedFileWriter, open_writer
+
+
+class TestBufferedFileWriter:
+    @pytest.mark.asyncio
+    async def test_small_chunks_are_coalesced(self, tmp_path):
+        path = tmp_path / "out.bin"
+        payload = bytes(range(256)) * 64
+
+        async with open_writer(path, min_flush_bytes=4096, max_flush_bytes=4096) as fd:
+            for i in range(0, len(payload), 16):
+                await fd.write(payload[i : i + 16])
+
+        assert path.read_bytes() == payload
+        assert fd.flushes == len(payload) // 4096
+
+    @pytest.mark.asyncio
+    async def test_seek_flushes_and_writes_at_offset(self, tmp_path):
+        path = tmp_path / "out.bin"
+        async with open_writer(path) as fd:
+            await fd.truncate(8)
+        async with open_writer(path, "r+b") as fd:
+            await fd.seek(4)
+            await fd.write(b"efgh")
+            await fd.seek(0)
+            await fd.write(b"abcd")
+
+        assert path.read_bytes() == b"abcdefgh"
+
+    def test_flush_size_adapts_within_bounds(self, tmp_path):
+        writer = BufferedFileWriter(
+            str(tmp_path / "out.bin"), min_flush_bytes=1024, max_flush_bytes=8192
+        )
+
+        writer._adapt(1024, 0.0001)
+        assert writer.flush_bytes == 2048
+        for _ in range(10):
+            writer._adapt(writer.flush_bytes, 0.0001)
+        assert writer.flush_bytes == 8192
+
+        writer._adapt(8192, 10)
+        assert writer.flush_bytes == 4096
+        for _ in range(10):
+            writer._adapt(writer.flush_bytes, 10)
+        assert writer.flush_bytes == 1024